@@ -3,4 +3,4 @@ Author: sg.kim
 Date: 2025-04-24
 Description:
 """
-from .settings import Settings, DatabaseSettings
\ No newline at end of file
+from .settings import Settings, DatabaseSettings, IngestionSettings, PollingSettings
\ No newline at end of file
@@ -3,12 +3,54 @@ Author: sg.kim
 Date: 2025-04-24
 Description:
 """
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     youtube_api_base_url: str
-    youtube_api_key: str
+    youtube_api_key: Optional[str] = None
+    # 여러 키를 쓸 때는 콤마로 구분 (youtube_api_key 와 합쳐서 키 풀 구성)
+    youtube_api_keys: str = ""
+
+    # 공유 HTTP 클라이언트 (keep-alive pool) 설정
+    http2: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 10.0
+    http_connect_timeout: float = 5.0
+
+    # ETag 조건부 요청 캐시 (SQLite 파일 경로, 비어 있으면 사용 안 함)
+    cache_path: Optional[str] = None
+    cache_max_entries: int = 10000
+
+    # 원본 응답 아카이브 (gzip NDJSON 디렉터리, 비어 있으면 사용 안 함) / segment 최대 크기 (압축 후 byte)
+    # 아카이브를 켜면 수집 경로도 fields= 없이 전체 응답을 요청 (replay 에서 지금 저장하지 않는 필드도 쓸 수 있도록, 응답 크기 약 2배)
+    archive_path: Optional[str] = None
+    archive_segment_bytes: int = 64 * 1024 * 1024
+
+    # 쿼터 / 호출 속도 제한
+    rate_limit_per_second: float = 10.0
+    rate_limit_burst: int = 10
+    daily_quota: int = 10000  # 키 1개당 일일 unit
+    # 채널 간 round-robin 으로 나눠 쓰는 동시 API 호출 수
+    api_concurrency: int = 16
+
+    # 호출 안정화: 재시도 (jitter backoff) / endpoint 별 timeout (초, JSON) / hedging / circuit breaker
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 30.0
+    endpoint_timeouts: Dict[str, float] = {"/commentThreads": 20.0, "/comments": 20.0}
+    hedge_requests: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+
+    # 핸들 → 채널ID / 업로드 플레이리스트 캐시 유효 시간 (초)
+    channel_cache_ttl: int = 7 * 24 * 60 * 60
 
     model_config = SettingsConfigDict(
         case_sensitive=False,
@@ -17,6 +59,75 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
+    def get_api_keys(self) -> List[str]:
+        keys = [self.youtube_api_key] if self.youtube_api_key else []
+        keys += [k.strip() for k in self.youtube_api_keys.split(",") if k.strip()]
+        return list(dict.fromkeys(keys))
+
+class IngestionSettings(BaseSettings):
+    """
+    채널 수집 파이프라인 설정 (INGEST_ 접두사 환경변수)
+    - queue_size: 단계 사이 큐의 최대 길이 (가득 차면 앞 단계가 대기 → backpressure)
+    - *_workers: 단계별 동시 작업자 수
+    - comment_max_pages / comment_max_threads: 영상당 댓글 수집 상한 (None 이면 전체)
+    - reply_workers: 누락된 답글(comments.list) 동시 조회 수
+    - comment_delta_sync: 저장된 가장 최신 댓글보다 오래된 댓글에 도달하면 paging 중단 (full_resync 포함)
+    - comment_refresh_days / comment_refresh_max_videos: 수집할 때마다 최근 comment_refresh_days 일 안에 게시된
+      저장된 영상 (최신 순 최대 comment_refresh_max_videos 개) 의 메타 / 새 댓글도 다시 수집 (0 이면 사용 안 함)
+    - batch_channel_workers: 여러 채널 일괄 수집 시 동시에 수집하는 채널 수
+    - batch_job_history: 메모리에 보관하는 일괄 수집 작업 수
+    - bulk_load_threshold: 한 번에 저장할 댓글이 이 수 이상이면 COPY + staging 테이블 경로로 적재
+      (writer 는 큐에 쌓인 batch 를 이 수까지 모아서 저장)
+    """
+
+    queue_size: int = 100
+    metadata_workers: int = 4
+    comment_workers: int = 8
+    writer_workers: int = 2
+    reply_workers: int = 4
+    comment_delta_sync: bool = True
+    comment_max_pages: Optional[int] = None
+    comment_max_threads: Optional[int] = None
+    comment_refresh_days: int = 7
+    comment_refresh_max_videos: int = 20
+    batch_channel_workers: int = 8
+    batch_job_history: int = 50
+    bulk_load_threshold: int = 2000
+
+    model_config = SettingsConfigDict(
+        case_sensitive=False,
+        env_prefix="INGEST_",
+        env_file=".env",
+        extra="ignore",
+    )
+
+class PollingSettings(BaseSettings):
+    """
+    watch list 채널 자동 수집 스케줄러 설정 (POLL_ 접두사 환경변수)
+    - 주기 = min(video_target / 시간당 업로드 수, comment_target / 시간당 댓글 수), [min_interval, max_interval] 로 제한
+    - 업로드 속도는 video_window_days, 댓글 속도는 comment_window_days 동안의 저장된 데이터로 계산
+    - 실패한 채널은 failure_retry 초 뒤에 다시 시도
+    """
+
+    enabled: bool = True
+    tick_seconds: float = 60.0
+    max_channels_per_tick: int = 50
+    page_limit: int = 1
+    min_interval: int = 15 * 60
+    max_interval: int = 24 * 60 * 60
+    failure_retry: int = 30 * 60
+    video_target: float = 1.0
+    comment_target: float = 200.0
+    video_window_days: int = 30
+    comment_window_days: int = 7
+
+    model_config = SettingsConfigDict(
+        case_sensitive=False,
+        env_prefix="POLL_",
+        env_file=".env",
+        extra="ignore",
+    )
+
 class DatabaseSettings(BaseSettings):
 
     DBAPI: str = "postgresql+asyncpg"
@@ -26,6 +137,38 @@ class DatabaseSettings(BaseSettings):
     postgres_user: str
     postgres_password: str
 
+    # 앱 시작 시 schema migration 적용 (끄면 python -m app.database.migrations upgrade 로 실행)
+    migrate_on_startup: bool = True
+
+    # engine / connection pool (수집 writer + NLP 작업자 동시 실행 수에 맞춰 조정, /database/pool 참고)
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 30 * 60  # 초, -1 이면 사용 안 함
+    pool_pre_ping: bool = True
+
+    # asyncpg prepared statement 캐시 (connection 당, pgbouncer transaction 모드에서는 0)
+    prepared_statement_cache_size: int = 100
+    # 세션 기본 statement_timeout (ms, 0 이면 제한 없음) / asyncpg 명령 timeout (초)
+    statement_timeout: int = 60_000
+    command_timeout: Optional[float] = None
+
+    # 읽기 전용 replica (콤마로 구분, database_url 과 같은 host:port 형식, 계정 / DB 이름은 primary 와 동일)
+    # replica connection 실패 시 retry_after 초 동안 primary 에서 읽음 / health check 주기, connect 제한 시간 (초)
+    replica_urls: str = ""
+    replica_retry_after: float = 30.0
+    replica_health_interval: float = 10.0
+    replica_connect_timeout: float = 2.0
+
+    # youtube_comment 월 단위 partition: 미리 만들어 둘 개월 수 / 보관 개월 수 (None 이면 계속 보관)
+    # 보관 기간이 지난 partition 은 detach (별도 테이블로 남김), comment_retention_drop 이면 drop / 점검 주기 (초)
+    # 보관 기간보다 오래된 댓글은 다시 수집해도 저장하지 않음 (default partition 에 쌓이지 않도록)
+    comment_partitions_ahead: int = 3
+    comment_retention_months: Optional[int] = None
+    comment_retention_drop: bool = False
+    partition_maintenance_interval: float = 6 * 60 * 60
+
     model_config = SettingsConfigDict(
         case_sensitive=False,
         env_file=".env",
@@ -33,4 +176,31 @@ class DatabaseSettings(BaseSettings):
     )
 
     def get_connect_url(self):
-        return f"{self.DBAPI}://{self.postgres_user}:{self.postgres_password}@{self.database_url}/{self.postgres_db}"
\ No newline at end of file
+        return f"{self.DBAPI}://{self.postgres_user}:{self.postgres_password}@{self.database_url}/{self.postgres_db}"
+
+    def get_replica_connect_urls(self) -> Dict[str, str]:
+        """replica host → connect url"""
+        hosts = [h.strip() for h in self.replica_urls.split(",") if h.strip()]
+        return {
+            host: f"{self.DBAPI}://{self.postgres_user}:{self.postgres_password}@{host}/{self.postgres_db}"
+            for host in dict.fromkeys(hosts)
+        }
+
+    def get_engine_options(self) -> Dict:
+        """create_async_engine 인자 (pool + asyncpg connect 옵션)"""
+        connect_args = {
+            "prepared_statement_cache_size": self.prepared_statement_cache_size,
+            "server_settings": {"statement_timeout": str(self.statement_timeout)},
+        }
+        if self.command_timeout is not None:
+            connect_args["command_timeout"] = self.command_timeout
+
+        return {
+            "echo": self.echo,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "connect_args": connect_args,
+        }
\ No newline at end of file
@@ -3,4 +3,5 @@ Author: sg.kim
 Date: 2025-04-24
 Description:
 """
-from .database import get_async_database, dispose_async_database, start_async_database
\ No newline at end of file
+from .database import get_async_database, get_read_database, get_async_engine, dispose_async_database, start_async_database, get_pool_metrics, get_partition_maintenance
+from .routing import primary_reads, retry_on_primary
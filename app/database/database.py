@@ -5,22 +5,35 @@ Description:
 """
 import logging
 from functools import lru_cache
+from typing import Dict
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
-from sqlmodel import SQLModel
 
 from app.config import DatabaseSettings
-from app.schema.public import metadata
+from app.database.migrations import upgrade
+from app.database.partitions import PartitionMaintenance
+from app.database.pool import InstrumentedAsyncPool, pool_status
+from app.database.routing import ReadSessionRouter
 
 database_settings = DatabaseSettings()
 
 
-_async_engine = create_async_engine(
-    database_settings.get_connect_url(),
-    echo=True,
-    future=True,
-)
+def create_engine_from_settings(settings: DatabaseSettings, url: str = None) -> AsyncEngine:
+    """DatabaseSettings 의 pool / asyncpg 옵션으로 engine 생성 (pool 은 대기 시간 계측)"""
+    return create_async_engine(
+        url or settings.get_connect_url(),
+        poolclass=InstrumentedAsyncPool,
+        **settings.get_engine_options(),
+    )
+
+_async_engine = create_engine_from_settings(database_settings)
+
+def get_async_engine() -> AsyncEngine:
+    return _async_engine
+
+def get_pool_metrics() -> Dict:
+    return pool_status(_async_engine)
 
 @lru_cache()
 def get_async_database() -> async_sessionmaker[AsyncSession]:
@@ -33,8 +46,36 @@ def get_async_database() -> async_sessionmaker[AsyncSession]:
 
     return AsyncSessionLocal
 
+@lru_cache()
+def get_read_database() -> ReadSessionRouter:
+    """읽기 전용 session factory (replica 가 없으면 primary)"""
+    replicas = {
+        host: create_engine_from_settings(database_settings, url)
+        for host, url in database_settings.get_replica_connect_urls().items()
+    }
+    return ReadSessionRouter(
+        get_async_database(),
+        replicas,
+        retry_after=database_settings.replica_retry_after,
+        health_interval=database_settings.replica_health_interval,
+        connect_timeout=database_settings.replica_connect_timeout,
+    )
+
+@lru_cache()
+def get_partition_maintenance() -> PartitionMaintenance:
+    """youtube_comment partition 생성 / 보관 기간 정리"""
+    return PartitionMaintenance(
+        _async_engine,
+        months_ahead=database_settings.comment_partitions_ahead,
+        retention_months=database_settings.comment_retention_months,
+        drop=database_settings.comment_retention_drop,
+        interval=database_settings.partition_maintenance_interval,
+    )
+
 
 async def dispose_async_database() -> bool:
+    await get_partition_maintenance().stop()
+    await get_read_database().dispose()
     if _async_engine:
         await _async_engine.dispose()
     return True
@@ -59,8 +100,23 @@ async def start_async_database():
         logger.error(f"db connection test failed: {e}")
         raise e
 
-    # create all
-    if _async_engine:
-        async with _async_engine.begin() as conn:
-            # await conn.run_sync(metadata.drop_all)
-            await conn.run_sync(metadata.create_all)
\ No newline at end of file
+    # schema migration (python -m app.database.migrations 로 따로 실행할 수도 있음)
+    if database_settings.migrate_on_startup:
+        applied = await upgrade(_async_engine)
+        if applied:
+            logger.info(f"applied schema migrations: {applied}")
+
+    # 다음 달 partition 미리 생성 / 보관 기간 지난 partition 정리
+    maintenance = get_partition_maintenance()
+    try:
+        result = await maintenance.run_once()
+        if any(result.values()):
+            logger.info(f"comment partition maintenance: {result}")
+    except Exception as e:
+        logger.error(f"comment partition maintenance failed: {e}")
+    maintenance.start()
+
+    # read replica health check
+    read_router = get_read_database()
+    await read_router.check_health()
+    read_router.start()
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 버전 관리되는 스키마 migration (python -m app.database.migrations upgrade | status)
+"""
+from .runner import upgrade, status
+from .versions import MIGRATIONS, Migration
@@ -0,0 +1,37 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: migration CLI
+    python -m app.database.migrations upgrade [--target VERSION]
+    python -m app.database.migrations status
+"""
+import argparse
+import asyncio
+import logging
+
+from app.database.database import dispose_async_database, get_async_engine
+from app.database.migrations import status, upgrade
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = get_async_engine()
+    try:
+        if args.command == "upgrade":
+            applied = await upgrade(engine, args.target)
+            print(f"applied: {applied or 'nothing (up to date)'}")
+        else:
+            for row in await status(engine):
+                print(f"{row['version']:04d}_{row['name']:<24} {row['applied_at'] or 'pending'}")
+    finally:
+        await dispose_async_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.database.migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("--target", type=int, default=None, help="stop after this version")
+    sub.add_parser("status", help="list migrations and when they were applied")
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
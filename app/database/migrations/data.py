@@ -0,0 +1,74 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: SQL 문장만으로 처리할 수 없는 data migration (Migration.run)
+    version 기록과 같은 트랜잭션에서 실행되므로 DB 마다 한 번만 적용됩니다.
+    모델이 나중에 바뀌어도 그대로 동작하도록 ORM 모델 대신 필요한 컬럼만 table() 로 선언해서 사용합니다.
+"""
+import logging
+from typing import Sequence
+
+from sqlalchemy import String, and_, bindparam, column, or_, select, table, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.utils.text import TextUtils
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+async def unescape_text(conn: AsyncConnection) -> None:
+    """
+    예전 형식(unicode_escape ASCII)으로 저장된 제목 / 설명 / 댓글 본문을 UTF-8 원문으로 되돌립니다 (in-place).
+    - 다시 실행하면 원래 '\\n' / '\\uXXXX' 문자열이던 텍스트까지 바뀌므로 migration 으로 한 번만 실행
+    - 내용은 같으므로 extract_yn / sentiment 는 그대로 둠
+    """
+    videos = await _unescape_columns(conn, "youtube_video", ("video_id",), ("title", "description"))
+    comments = await _unescape_columns(conn, "youtube_comment", ("comment_id", "published_at"), ("text_display",))
+    logger.info("converted escaped text to UTF-8: %d videos, %d comments", videos, comments)
+
+
+async def _unescape_columns(
+    conn: AsyncConnection, table_name: str, pk: Sequence[str], columns: Sequence[str]
+) -> int:
+    # pk[0] 으로 keyset, PK 전체 (partition key 포함) 로 UPDATE
+    tbl = table(table_name, *(column(c) for c in pk), *(column(c, String) for c in columns), schema="public")
+    pk_column = tbl.c[pk[0]]
+    text_columns = [tbl.c[c] for c in columns]
+    stmt_update = (
+        update(tbl)
+        .where(and_(*(tbl.c[c] == bindparam(f"b_{c}") for c in pk)))
+        .values({c: bindparam(f"b_{c}") for c in columns})
+    )
+    last_pk, updated = None, 0
+
+    while True:
+        # 1) 백슬래시가 있는 row 만 keyset 으로 조회
+        stmt = select(*(tbl.c[c] for c in pk), *text_columns).where(
+            or_(*(c.contains("\\", autoescape=True) for c in text_columns))
+        )
+        if last_pk is not None:
+            stmt = stmt.where(pk_column > last_pk)
+        rows = (await conn.execute(stmt.order_by(pk_column).limit(BATCH_SIZE))).all()
+        if not rows:
+            return updated
+
+        # 2) escape 된 값만 복원
+        changes = []
+        for row in rows:
+            keys, values = row[:len(pk)], row[len(pk):]
+            if any(TextUtils.is_escaped_text(v) for v in values):
+                changes.append({
+                    **{f"b_{c}": k for c, k in zip(pk, keys)},
+                    **{
+                        f"b_{c}": TextUtils.unescape_control_chars(v) if TextUtils.is_escaped_text(v) else v
+                        for c, v in zip(columns, values)
+                    },
+                })
+
+        # 3) PK 기준 bulk UPDATE (executemany)
+        if changes:
+            await conn.execute(stmt_update, changes)
+            updated += len(changes)
+        last_pk = rows[-1][0]
@@ -0,0 +1,88 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 스키마 migration 실행기
+    적용된 version 은 public.schema_migrations 에 기록하고, 동시에 여러 프로세스가 시작해도
+    advisory lock 으로 한 곳에서만 실행되도록 합니다.
+"""
+import logging
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .versions import MIGRATIONS, Migration
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock 키 (schema migration 전용)
+MIGRATION_LOCK_KEY = 72_616_001
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS public.schema_migrations (
+    version INTEGER NOT NULL PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+)
+"""
+
+
+async def upgrade(engine: AsyncEngine, target: Optional[int] = None) -> List[int]:
+    """
+    아직 적용하지 않은 migration 을 version 순서로 적용하고, 이번에 적용한 version 목록을 반환합니다.
+    - transactional migration: 문장들과 version 기록을 한 트랜잭션으로
+    - non-transactional migration: autocommit 으로 문장별 실행 후 version 기록
+    - run 이 있으면 문장들 다음에 같은 connection 으로 실행
+    """
+    applied_now: List[int] = []
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        # CREATE INDEX CONCURRENTLY 등 오래 걸리는 DDL 은 engine 기본 statement_timeout 을 적용하지 않음
+        await lock_conn.execute(text("SET statement_timeout = 0"))
+        try:
+            await lock_conn.execute(text(SCHEMA_MIGRATIONS_DDL))
+            applied = await _applied_versions(lock_conn)
+
+            for migration in MIGRATIONS:
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                logger.info("applying schema migration %04d_%s", migration.version, migration.name)
+                if migration.transactional:
+                    async with engine.begin() as conn:
+                        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+                        await _apply(conn, migration)
+                else:
+                    await _apply(lock_conn, migration)
+                applied_now.append(migration.version)
+        finally:
+            await lock_conn.execute(text("RESET statement_timeout"))
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    return applied_now
+
+
+async def status(engine: AsyncEngine) -> List[Dict]:
+    """migration 별 적용 여부 / 적용 시각"""
+    async with engine.begin() as conn:
+        await conn.execute(text(SCHEMA_MIGRATIONS_DDL))
+        rows = (await conn.execute(text("SELECT version, applied_at FROM public.schema_migrations"))).all()
+    applied_at = {version: at for version, at in rows}
+    return [
+        {"version": m.version, "name": m.name, "applied_at": applied_at.get(m.version)}
+        for m in MIGRATIONS
+    ]
+
+
+async def _applied_versions(conn: AsyncConnection) -> Set[int]:
+    return set((await conn.execute(text("SELECT version FROM public.schema_migrations"))).scalars().all())
+
+
+async def _apply(conn: AsyncConnection, migration: Migration) -> None:
+    for statement in migration.statements:
+        await conn.execute(text(statement))
+    if migration.run is not None:
+        await migration.run(conn)
+    await conn.execute(
+        text("INSERT INTO public.schema_migrations (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
@@ -0,0 +1,260 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 스키마 migration 목록 (version 오름차순, 한 번 배포된 migration 은 수정하지 않고 새 version 을 추가)
+"""
+from typing import Awaitable, Callable, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .data import unescape_text
+
+
+class Migration(BaseModel):
+    version: int
+    name: str
+    statements: List[str]
+    # False 이면 트랜잭션 밖에서 실행 (CREATE INDEX CONCURRENTLY 등). 각 문장은 다시 실행해도 안전해야 함
+    transactional: bool = True
+    # statements 다음에 같은 connection 으로 실행하는 Python data migration (data.py)
+    run: Optional[Callable[[AsyncConnection], Awaitable[None]]] = None
+
+
+MIGRATIONS: List[Migration] = [
+    # 1) baseline: 기존 metadata.create_all 과 같은 테이블 (이미 있는 DB 는 그대로 두고 빠진 컬럼만 추가)
+    Migration(
+        version=1,
+        name="baseline",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS public.youtube_video (
+                video_id VARCHAR NOT NULL,
+                published_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                channel_id VARCHAR NOT NULL,
+                title VARCHAR,
+                description VARCHAR,
+                channel_title VARCHAR,
+                live_broadcast_content VARCHAR,
+                default_language VARCHAR,
+                view_count VARCHAR,
+                like_count VARCHAR,
+                comment_count VARCHAR,
+                korean_wave_yn VARCHAR,
+                identify_reason VARCHAR,
+                PRIMARY KEY (video_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS public.youtube_comment (
+                comment_id VARCHAR NOT NULL,
+                video_id VARCHAR NOT NULL,
+                parent_comment_id VARCHAR,
+                etag VARCHAR,
+                author_display_name VARCHAR,
+                author_channel_id VARCHAR,
+                text_display VARCHAR,
+                published_at TIMESTAMP WITHOUT TIME ZONE,
+                updated_at TIMESTAMP WITHOUT TIME ZONE,
+                viewer_rating VARCHAR,
+                like_count INTEGER,
+                sentiment VARCHAR,
+                key_words VARCHAR,
+                extract_yn VARCHAR NOT NULL,
+                PRIMARY KEY (comment_id),
+                FOREIGN KEY (video_id) REFERENCES public.youtube_video (video_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS public.youtube_channel_sync (
+                channel_id VARCHAR NOT NULL,
+                handle VARCHAR,
+                last_video_id VARCHAR,
+                last_published_at TIMESTAMP WITHOUT TIME ZONE,
+                last_synced_at TIMESTAMP WITHOUT TIME ZONE,
+                PRIMARY KEY (channel_id)
+            )
+            """,
+            "ALTER TABLE public.youtube_channel_sync ADD COLUMN IF NOT EXISTS next_poll_at TIMESTAMP WITHOUT TIME ZONE",
+            "ALTER TABLE public.youtube_channel_sync ADD COLUMN IF NOT EXISTS poll_interval INTEGER",
+            """
+            CREATE TABLE IF NOT EXISTS public.youtube_channel (
+                channel_id VARCHAR NOT NULL,
+                handle VARCHAR,
+                uploads_playlist_id VARCHAR,
+                title VARCHAR,
+                description VARCHAR,
+                country VARCHAR,
+                published_at TIMESTAMP WITHOUT TIME ZONE,
+                resolved_at TIMESTAMP WITHOUT TIME ZONE,
+                watch_yn VARCHAR NOT NULL,
+                PRIMARY KEY (channel_id)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_public_youtube_channel_handle ON public.youtube_channel (handle)",
+        ],
+    ),
+    # 2) 작업 큐 조회용 partial index + 댓글 FK(video_id) index
+    #    - SearchBusinessService.get_videos: korean_wave_yn IS NULL ORDER BY video_id
+    #    - SearchBusinessService.get_comments_for_video: extract_yn = 'N' ORDER BY comment_id + 한류 영상 join
+    #    중간에 실패해 INVALID 로 남은 index 는 DROP INDEX 후 다시 실행
+    Migration(
+        version=2,
+        name="work_queue_indexes",
+        transactional=False,
+        statements=[
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_video_korean_wave_pending "
+            "ON public.youtube_video (video_id) WHERE korean_wave_yn IS NULL",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_video_korean_wave_y "
+            "ON public.youtube_video (video_id) WHERE korean_wave_yn = 'Y'",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_comment_extract_pending "
+            "ON public.youtube_comment (comment_id) WHERE extract_yn = 'N'",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_comment_video_id "
+            "ON public.youtube_comment (video_id, published_at)",
+        ],
+    ),
+    # 3) 영상 통계 문자열 → BIGINT + 통계 snapshot 테이블 (조회수 / 좋아요 증가 속도 계산용)
+    #    - ALTER COLUMN TYPE 은 youtube_video 를 한 번 다시 쓰고 그동안 ACCESS EXCLUSIVE lock (세 컬럼을 한 문장으로)
+    #    - 숫자가 아닌 값은 NULL
+    #    - 현재 값을 첫 snapshot 으로 복사
+    Migration(
+        version=3,
+        name="video_stats_bigint",
+        statements=[
+            """
+            ALTER TABLE public.youtube_video
+                ALTER COLUMN view_count TYPE BIGINT
+                    USING CASE WHEN view_count ~ '^[0-9]+$' THEN view_count::BIGINT END,
+                ALTER COLUMN like_count TYPE BIGINT
+                    USING CASE WHEN like_count ~ '^[0-9]+$' THEN like_count::BIGINT END,
+                ALTER COLUMN comment_count TYPE BIGINT
+                    USING CASE WHEN comment_count ~ '^[0-9]+$' THEN comment_count::BIGINT END
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS public.youtube_video_stats (
+                video_id VARCHAR NOT NULL,
+                captured_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                view_count BIGINT,
+                like_count BIGINT,
+                comment_count BIGINT,
+                PRIMARY KEY (video_id, captured_at)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_youtube_video_stats_captured_at "
+            "ON public.youtube_video_stats USING brin (captured_at)",
+            """
+            INSERT INTO public.youtube_video_stats (video_id, captured_at, view_count, like_count, comment_count)
+            SELECT video_id, now() AT TIME ZONE 'utc', view_count, like_count, comment_count
+            FROM public.youtube_video
+            WHERE view_count IS NOT NULL OR like_count IS NOT NULL OR comment_count IS NOT NULL
+            ON CONFLICT DO NOTHING
+            """,
+        ],
+    ),
+    # 4) youtube_comment → published_at 월 단위 range partition (youtube_comment_yYYYYmMM + default)
+    #    - 기존 테이블을 옮겨 두고 partitioned table 로 다시 만든 뒤 전체 복사 (한 트랜잭션, 댓글 수에 비례해 오래 걸림)
+    #    - partition key 는 PK 에 포함되어야 하므로 PK = (comment_id, published_at), published_at NOT NULL
+    #      (published_at 이 없던 row 는 updated_at → 1970-01-01 순서로 채움, 범위 밖의 값은 default partition)
+    #    - 가장 오래된 댓글의 달부터 3개월 뒤까지 partition 생성, 이후는 app/database/partitions.py 가 유지
+    #    - index 는 복사 후에 parent 에 만들어 모든 partition 에 전파
+    Migration(
+        version=4,
+        name="comment_partitions",
+        statements=[
+            "ALTER TABLE public.youtube_comment RENAME TO youtube_comment_unpartitioned",
+            """
+            CREATE TABLE public.youtube_comment (
+                comment_id VARCHAR NOT NULL,
+                video_id VARCHAR NOT NULL,
+                parent_comment_id VARCHAR,
+                etag VARCHAR,
+                author_display_name VARCHAR,
+                author_channel_id VARCHAR,
+                text_display VARCHAR,
+                published_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                updated_at TIMESTAMP WITHOUT TIME ZONE,
+                viewer_rating VARCHAR,
+                like_count INTEGER,
+                sentiment VARCHAR,
+                key_words VARCHAR,
+                extract_yn VARCHAR NOT NULL,
+                FOREIGN KEY (video_id) REFERENCES public.youtube_video (video_id)
+            ) PARTITION BY RANGE (published_at)
+            """,
+            "CREATE TABLE public.youtube_comment_default PARTITION OF public.youtube_comment DEFAULT",
+            """
+            DO $$
+            DECLARE
+                this_month DATE := date_trunc('month', now() AT TIME ZONE 'utc');
+                month DATE;
+            BEGIN
+                SELECT date_trunc('month', min(published_at)) INTO month FROM public.youtube_comment_unpartitioned;
+                month := LEAST(COALESCE(month, this_month), this_month);
+                WHILE month <= this_month + INTERVAL '3 months' LOOP
+                    EXECUTE format(
+                        'CREATE TABLE public.%I PARTITION OF public.youtube_comment FOR VALUES FROM (%L) TO (%L)',
+                        'youtube_comment_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                        month,
+                        (month + INTERVAL '1 month')::DATE
+                    );
+                    month := month + INTERVAL '1 month';
+                END LOOP;
+            END $$
+            """,
+            """
+            INSERT INTO public.youtube_comment (
+                comment_id, video_id, parent_comment_id, etag, author_display_name, author_channel_id,
+                text_display, published_at, updated_at, viewer_rating, like_count, sentiment, key_words, extract_yn
+            )
+            SELECT
+                comment_id, video_id, parent_comment_id, etag, author_display_name, author_channel_id,
+                text_display, COALESCE(published_at, updated_at, TIMESTAMP '1970-01-01'), updated_at,
+                viewer_rating, like_count, sentiment, key_words, extract_yn
+            FROM public.youtube_comment_unpartitioned
+            """,
+            "DROP TABLE public.youtube_comment_unpartitioned",
+            "ALTER TABLE public.youtube_comment ADD PRIMARY KEY (comment_id, published_at)",
+            "CREATE INDEX ix_youtube_comment_extract_pending "
+            "ON public.youtube_comment (comment_id) WHERE extract_yn = 'N'",
+            "CREATE INDEX ix_youtube_comment_video_id ON public.youtube_comment (video_id, published_at)",
+            "ANALYZE public.youtube_comment",
+        ],
+    ),
+    # 5) 예전 unicode_escape (ASCII) 형식으로 저장된 텍스트를 UTF-8 원문으로 변환
+    #    - 같은 텍스트를 두 번 변환하면 원래 '\n' 문자열이던 값이 깨지므로 version 기록과 같은 트랜잭션에서 한 번만
+    #    - 한 트랜잭션 (변환 중 실패하면 전체 rollback 후 다음 upgrade 에서 처음부터)
+    Migration(
+        version=5,
+        name="utf8_text",
+        statements=[],
+        run=unescape_text,
+    ),
+    # 6) 댓글 단계가 실패한 영상 목록 (watermark 가 지나가도 다음 수집에서 다시 수집)
+    Migration(
+        version=6,
+        name="channel_sync_retry_videos",
+        statements=[
+            "ALTER TABLE public.youtube_channel_sync ADD COLUMN IF NOT EXISTS retry_video_ids VARCHAR",
+        ],
+    ),
+    # 7) 채널별 최근 영상 조회 (SearchBusinessService.get_recent_video_ids / get_channel_activity)
+    Migration(
+        version=7,
+        name="video_channel_published_index",
+        transactional=False,
+        statements=[
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_video_channel_published "
+            "ON public.youtube_video (channel_id, published_at)",
+        ],
+    ),
+    # 8) page_limit 에서 멈춘 증분 수집을 다음 수집에서 이어서 paging (watermark 는 끝까지 내려간 뒤 이동)
+    Migration(
+        version=8,
+        name="channel_sync_resume",
+        statements=[
+            "ALTER TABLE public.youtube_channel_sync ADD COLUMN IF NOT EXISTS resume_page_token VARCHAR",
+            "ALTER TABLE public.youtube_channel_sync ADD COLUMN IF NOT EXISTS pending_video_id VARCHAR",
+            "ALTER TABLE public.youtube_channel_sync ADD COLUMN IF NOT EXISTS pending_published_at TIMESTAMP WITHOUT TIME ZONE",
+        ],
+    ),
+]
@@ -0,0 +1,203 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: youtube_comment 월 단위 partition 관리 (migration 0004 이후)
+    - 앞으로 쓸 달의 partition 을 미리 생성 (없으면 default partition 으로 들어가고, 나중에 그 달 partition 을 만들 때
+      default 를 scan 해야 함)
+    - 보관 기간이 지난 partition 은 DETACH (별도 테이블로 남음) 또는 DROP: 대량 DELETE 없이 metadata 변경만으로 처리
+      (보관 기간이 지난 댓글은 저장 경로(TransactionBusinessService)에서 걸러서 default partition 에 쌓이지 않게 함)
+    - 만들 달의 row 가 이미 default partition 에 있으면 같은 트랜잭션에서 새 partition 으로 옮김
+"""
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+COMMENT_TABLE = "youtube_comment"
+DEFAULT_PARTITION = f"{COMMENT_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{COMMENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# DETACH / DROP 이 긴 조회 뒤에서 parent lock 을 기다리며 다른 쿼리를 막지 않도록
+LOCK_TIMEOUT = "5s"
+
+_PARTITIONS_SQL = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+WHERE ns.nspname = 'public' AND parent.relname = :table AND parent.relkind = 'p'
+"""
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{COMMENT_TABLE}_y{month.year}m{month.month:02d}"
+
+def partition_month(name: str) -> Optional[date]:
+    """partition 이름 → 달 (default partition 등 규칙에 맞지 않으면 None)"""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+def retention_cutoff(keep_months: Optional[int], today: Optional[date] = None) -> Optional[date]:
+    """이번 달 포함 keep_months 개월 중 가장 오래된 달 (이보다 오래된 댓글은 보관하지 않음, None 이면 계속 보관)"""
+    if not keep_months:
+        return None
+    return add_months(month_start(today or _today()), -(keep_months - 1))
+
+
+async def list_comment_partitions(engine: AsyncEngine) -> List[str]:
+    """youtube_comment 의 partition 이름 (partitioned table 이 아니면 빈 목록)"""
+    async with engine.connect() as conn:
+        return sorted((await conn.execute(text(_PARTITIONS_SQL), {"table": COMMENT_TABLE})).scalars().all())
+
+
+async def ensure_comment_partitions(
+    engine: AsyncEngine, months_ahead: int, today: Optional[date] = None
+) -> List[str]:
+    """
+    이번 달 ~ months_ahead 개월 뒤 partition 중 없는 것을 만들고 그 이름을 반환
+    그 달의 row 가 default partition 에 있으면 (partition 이 없던 사이에 저장된 댓글) 같은 트랜잭션에서 옮긴 뒤 생성
+    실패한 달은 로그만 남기고 건너뜀 (다음 점검에서 다시 시도, 다른 달 생성은 계속)
+    """
+    existing = await list_comment_partitions(engine)
+    if not existing:
+        logger.warning("%s is not partitioned yet (run schema migrations)", COMMENT_TABLE)
+        return []
+
+    this_month = month_start(today or _today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                moved = await _create_partition(conn, name, month, DEFAULT_PARTITION in existing)
+        except Exception as e:
+            logger.exception("creating comment partition %s failed: %r", name, e)
+            continue
+        if moved:
+            logger.info("moved %d comments from %s into %s", moved, DEFAULT_PARTITION, name)
+        created.append(name)
+    return created
+
+
+async def _create_partition(conn, name: str, month: date, has_default: bool) -> int:
+    """
+    partition 생성 → default partition 에서 옮긴 row 수
+    default 에 그 달의 row 가 남아 있으면 CREATE ... PARTITION OF 가 default 의 constraint 위반으로 실패하므로
+    임시 테이블로 옮겨 두고 지운 뒤 partition 을 만들고 다시 넣음
+    """
+    bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    in_month = f"published_at >= '{month.isoformat()}' AND published_at < '{add_months(month, 1).isoformat()}'"
+    moved = 0
+    if has_default:
+        moved = (await conn.execute(text(
+            f"SELECT count(*) FROM public.{DEFAULT_PARTITION} WHERE {in_month}"
+        ))).scalar()
+    if moved:
+        stage = f"moving_{name}"
+        await conn.execute(text(
+            f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT * FROM public.{DEFAULT_PARTITION} WHERE {in_month}"
+        ))
+        await conn.execute(text(f"DELETE FROM public.{DEFAULT_PARTITION} WHERE {in_month}"))
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS public.{name} PARTITION OF public.{COMMENT_TABLE} FOR VALUES {bounds}"
+    ))
+    if moved:
+        await conn.execute(text(f"INSERT INTO public.{name} SELECT * FROM {stage}"))
+    return moved
+
+
+async def retire_comment_partitions(
+    engine: AsyncEngine, keep_months: int, drop: bool = False, today: Optional[date] = None
+) -> List[str]:
+    """
+    이번 달 포함 keep_months 개월보다 오래된 partition 을 detach (drop=True 이면 detach 후 drop) 하고 그 이름을 반환
+    detach 한 테이블은 public.youtube_comment_yYYYYmMM 로 남으므로 백업 / 이관 후 직접 삭제
+    """
+    oldest_kept = retention_cutoff(keep_months, today)
+    if oldest_kept is None:
+        return []
+    retired = []
+    for name in await list_comment_partitions(engine):
+        month = partition_month(name)
+        if month is None or month >= oldest_kept:
+            continue
+        async with engine.begin() as conn:
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            await conn.execute(text(f"ALTER TABLE public.{COMMENT_TABLE} DETACH PARTITION public.{name}"))
+            if drop:
+                await conn.execute(text(f"DROP TABLE public.{name}"))
+        logger.info("%s comment partition %s", "dropped" if drop else "detached", name)
+        retired.append(name)
+    return retired
+
+
+class PartitionMaintenance:
+    """
+    start_async_database 에서 한 번 실행 후 interval 마다 반복합니다.
+    - months_ahead: 미리 만들어 둘 개월 수
+    - retention_months: 보관 개월 수 (None 이면 오래된 partition 을 그대로 둠)
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        months_ahead: int = 3,
+        retention_months: Optional[int] = None,
+        drop: bool = False,
+        interval: float = 6 * 60 * 60,
+    ):
+        self.engine = engine
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.drop = drop
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, today: Optional[date] = None) -> Dict[str, List[str]]:
+        result = {"created": await ensure_comment_partitions(self.engine, self.months_ahead, today)}
+        if self.retention_months:
+            result["dropped" if self.drop else "detached"] = await retire_comment_partitions(
+                self.engine, self.retention_months, self.drop, today
+            )
+        return result
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception("comment partition maintenance failed: %r", e)
@@ -0,0 +1,86 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: connection pool 계측
+    checkout 대기 시간 / timeout 횟수를 기록하는 AsyncAdaptedQueuePool 과 pool 상태 snapshot.
+    수집 파이프라인 / NLP 작업자 수에 맞춰 pool_size, max_overflow 를 정할 때 사용합니다.
+"""
+import time
+from typing import Dict
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.resilience import LatencyTracker
+
+# 대기 시간 분위수를 계산할 최근 checkout 수
+WAIT_WINDOW = 1000
+
+
+class PoolStats:
+    """checkout 횟수 / 대기 시간 / timeout 누적값"""
+
+    def __init__(self, window: int = WAIT_WINDOW):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent = LatencyTracker(window)
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self._recent.record("checkout", seconds)
+
+    def snapshot(self) -> Dict:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_p95_ms": round((self._recent.quantile("checkout", 0.95, 1) or 0.0) * 1000, 3),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    _do_get (pool 에서 connection 을 꺼내는 구간) 의 소요 시간을 기록
+    - 남은 connection 이 없으면 pool_timeout 까지 대기하므로 이 값이 길어지면 pool 이 작은 것
+    - 새 connection 을 여는 시간도 포함됨
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return conn
+
+
+def pool_status(engine: AsyncEngine) -> Dict:
+    """pool 현재 상태 (+ InstrumentedAsyncPool 이면 대기 시간 통계)"""
+    pool = engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() 는 pool 이 다 차기 전에는 음수
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    if isinstance(pool, InstrumentedAsyncPool):
+        status.update(pool.stats.snapshot())
+    return status
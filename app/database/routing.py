@@ -0,0 +1,228 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 읽기 전용 쿼리의 read replica 라우팅
+    SearchBusinessService 처럼 읽기만 하는 서비스가 async_sessionmaker 대신 사용하는 session factory 입니다.
+    - 정상 replica 를 round-robin 으로 골라 그 replica 의 connection 에 묶인 session 을 돌려줌
+    - replica connection 을 얻지 못하면 down 으로 표시하고 다음 replica → primary 순으로 대체
+    - 쿼리 도중 replica connection 이 끊기면 down 으로 표시하고, retry_on_primary 를 붙인 메서드는 primary 에서 한 번 더 실행
+    - down 된 replica 는 주기적인 health check (SELECT 1) 또는 retry_after 이후 첫 사용에서 다시 사용
+    - primary_reads() 안에서는 (하위 task 포함) 항상 primary 에서 읽음 (방금 쓴 데이터를 다시 읽어야 하는 경로)
+"""
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.pool import pool_status
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# True 이면 replica 대신 primary 에서 읽음 (read-your-writes)
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """이 블록 (과 여기서 만든 task) 의 읽기를 primary 로 보냄"""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def _is_connection_error(e: BaseException) -> bool:
+    """replica 를 down 으로 표시할 오류 (쿼리 오류는 제외)"""
+    if isinstance(e, (OSError, TimeoutError)):
+        return True
+    return isinstance(e, exc.DBAPIError) and (e.connection_invalidated or isinstance(e, exc.InterfaceError))
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.retry_at = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.healthy or now >= self.retry_at
+
+
+class ReadSessionRouter:
+    """
+    async_sessionmaker 처럼 router() 로 호출해 async with 로 사용합니다.
+    replica 가 없으면 항상 primary session 을 돌려줍니다.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: Optional[Dict[str, AsyncEngine]] = None,
+        retry_after: float = 30.0,
+        health_interval: float = 10.0,
+        connect_timeout: float = 2.0,
+    ):
+        self.primary = primary
+        self.replicas = [Replica(name, engine) for name, engine in (replicas or {}).items()]
+        self.retry_after = retry_after
+        self.health_interval = health_interval
+        self.connect_timeout = connect_timeout
+        self.primary_fallbacks = 0
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __call__(self) -> "_RoutedSession":
+        return _RoutedSession(self)
+
+    def candidates(self) -> List[Replica]:
+        """사용 가능한 replica (round-robin 순서, 호출마다 시작 위치가 하나씩 이동)"""
+        if not self.replicas:
+            return []
+        start = self._next % len(self.replicas)
+        self._next += 1
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [r for r in ordered if r.available(now)]
+
+    def mark_down(self, replica: Replica, e: BaseException) -> None:
+        if replica.healthy:
+            logger.warning("read replica %s marked down: %r", replica.name, e)
+        replica.healthy = False
+        replica.failures += 1
+        replica.last_error = repr(e)
+        replica.retry_at = time.monotonic() + self.retry_after
+
+    def mark_up(self, replica: Replica) -> None:
+        if not replica.healthy:
+            logger.info("read replica %s is back", replica.name)
+        replica.healthy = True
+        replica.last_error = None
+
+    async def check_health(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with asyncio.timeout(self.connect_timeout):
+                    async with replica.engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+            except Exception as e:
+                self.mark_down(replica, e)
+            else:
+                self.mark_up(replica)
+
+    def start(self) -> None:
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def dispose(self) -> None:
+        await self.stop()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def status(self) -> Dict:
+        return {
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [
+                {
+                    "name": r.name,
+                    "healthy": r.healthy,
+                    "failures": r.failures,
+                    "last_error": r.last_error,
+                    "pool": pool_status(r.engine),
+                }
+                for r in self.replicas
+            ],
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.exception("read replica health check failed: %r", e)
+
+    async def _connect(self, replica: Replica) -> Optional[AsyncConnection]:
+        """replica connection checkout (pool_pre_ping 으로 끊긴 connection 도 여기서 걸러짐)"""
+        try:
+            async with asyncio.timeout(self.connect_timeout):
+                conn = await replica.engine.connect()
+        except Exception as e:
+            self.mark_down(replica, e)
+            return None
+        self.mark_up(replica)
+        return conn
+
+
+class _RoutedSession:
+    def __init__(self, router: ReadSessionRouter):
+        self._router = router
+        self._session: Optional[AsyncSession] = None
+        self._replica: Optional[Replica] = None
+        self._connection: Optional[AsyncConnection] = None
+
+    async def __aenter__(self) -> AsyncSession:
+        if not _primary_reads.get():
+            for replica in self._router.candidates():
+                conn = await self._router._connect(replica)
+                if conn is None:
+                    continue
+                self._replica, self._connection = replica, conn
+                self._session = AsyncSession(bind=conn, expire_on_commit=False)
+                return await self._session.__aenter__()
+
+            if self._router.replicas:
+                self._router.primary_fallbacks += 1
+
+        self._session = self._router.primary()
+        return await self._session.__aenter__()
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        try:
+            return await self._session.__aexit__(exc_type, exc_value, tb)
+        finally:
+            if self._connection is not None:
+                await self._connection.close()
+            if self._replica is not None and exc_value is not None and _is_connection_error(exc_value):
+                self._router.mark_down(self._replica, exc_value)
+
+
+def retry_on_primary(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    읽기 전용 서비스 메서드용: replica 에서 쿼리 도중 connection 오류가 나면 primary_reads() 안에서 메서드 전체를 한 번 다시 실행
+    - session 을 self._session_factory (ReadSessionRouter) 로 만드는 메서드에만 사용 (다시 실행해도 결과가 같아야 함)
+    - 이미 primary 에서 읽는 중이거나 replica 가 없으면 그대로 실행
+    """
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+        router = getattr(self, "_session_factory", None)
+        if _primary_reads.get() or not isinstance(router, ReadSessionRouter) or not router.replicas:
+            return await method(self, *args, **kwargs)
+        try:
+            return await method(self, *args, **kwargs)
+        except Exception as e:
+            if not _is_connection_error(e):
+                raise
+            logger.warning("%s failed on a read replica, retrying on primary: %r", method.__qualname__, e)
+            router.primary_fallbacks += 1
+        with primary_reads():
+            return await method(self, *args, **kwargs)
+    return wrapper
@@ -1,28 +1,30 @@
-from typing import Any, AsyncGenerator
+from fastapi import Request
 
 from app.database import get_async_database, dispose_async_database
+from app.service.business.channel import ChannelBusinessService
 from app.service.business.youtube import YouTubeBusinessService
 from app.service.end_point.youtube import YouTubeEndPointService
 
-async def get_youtube_business_service() -> AsyncGenerator[YouTubeBusinessService, Any]:
+def get_youtube_business_service(request: Request) -> YouTubeBusinessService:
     """
     Dependency injector for YouTubeBusinessService
+    - lifespan(app/event.py) 에서 생성한 공유 인스턴스를 반환합니다.
     """
-    service = YouTubeBusinessService()
-    try:
-        yield service
-    finally:
-        await service.close()
+    return request.app.state.youtube_business_service
 
-async def get_youtube_endpoint_service() -> AsyncGenerator[YouTubeEndPointService, Any]:
+def get_channel_business_service(request: Request) -> ChannelBusinessService:
+    """
+    Dependency injector for ChannelBusinessService
+    - lifespan(app/event.py) 에서 생성한 공유 인스턴스를 반환합니다.
+    """
+    return request.app.state.youtube_channel_service
+
+def get_youtube_endpoint_service(request: Request) -> YouTubeEndPointService:
     """
     Dependency injector for YouTubeEndPointService
+    - lifespan(app/event.py) 에서 생성한 공유 인스턴스를 반환합니다.
     """
-    service = YouTubeEndPointService()
-    try:
-        yield service
-    finally:
-        await service.close()
+    return request.app.state.youtube_endpoint_service
 
 
 async def get_async_session():
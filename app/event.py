@@ -8,6 +8,20 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.database import start_async_database, dispose_async_database
+from app.service.business.youtube import (
+    YouTubeBusinessService,
+    create_archive,
+    create_http_client,
+    create_key_pool,
+    create_rate_limiter,
+    create_resilient_caller,
+    create_scheduler,
+    settings,
+)
+from app.service.business.channel import ChannelBusinessService
+from app.service.end_point.scheduler import PollingScheduler
+from app.service.end_point.youtube import YouTubeEndPointService
+from app.utils.cache import EtagCache
 
 
 @asynccontextmanager
@@ -26,10 +40,49 @@ async def start(app: FastAPI):
 
     # start database
     await start_async_database()
+
+    # shared http client & services (요청마다 생성하지 않고 앱 수명 동안 재사용)
+    app.state.youtube_client = create_http_client()
+    app.state.youtube_cache = (
+        EtagCache(settings.cache_path, settings.cache_max_entries) if settings.cache_path else None
+    )
+    app.state.youtube_rate_limiter = create_rate_limiter()
+    app.state.youtube_key_pool = create_key_pool()
+    app.state.youtube_scheduler = create_scheduler()
+    app.state.youtube_archive = create_archive()
+    app.state.youtube_business_service = YouTubeBusinessService(
+        client=app.state.youtube_client,
+        cache=app.state.youtube_cache,
+        rate_limiter=app.state.youtube_rate_limiter,
+        key_pool=app.state.youtube_key_pool,
+        scheduler=app.state.youtube_scheduler,
+        resilience=create_resilient_caller(),
+        archive=app.state.youtube_archive,
+    )
+    app.state.youtube_channel_service = ChannelBusinessService(app.state.youtube_business_service)
+    app.state.youtube_endpoint_service = YouTubeEndPointService(
+        business_service=app.state.youtube_business_service,
+        channel_service=app.state.youtube_channel_service,
+    )
+
+    # watch list 자동 수집 (POLL_ENABLED)
+    app.state.youtube_poller = PollingScheduler(app.state.youtube_endpoint_service)
+    app.state.youtube_poller.start()
     pass
 
 async def close(app: FastAPI):
 
+    # stop polling scheduler & running batch ingestion jobs
+    await app.state.youtube_poller.stop()
+    await app.state.youtube_endpoint_service.close()
+
+    # close shared http client & cache & archive
+    await app.state.youtube_client.aclose()
+    if app.state.youtube_cache:
+        app.state.youtube_cache.close()
+    if app.state.youtube_archive:
+        app.state.youtube_archive.close()
+
     # dispose database
     await dispose_async_database()
     pass
\ No newline at end of file
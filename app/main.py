@@ -3,12 +3,13 @@ from fastapi import Depends, FastAPI
 from .advice import register_exception_handlers
 from .event import lifespan
 from .middleware import LoggingMiddleware
-from .routers import youtube
+from .routers import database, youtube
 
 app = FastAPI(lifespan=lifespan)
 
 app.include_router(youtube.business_router)
 app.include_router(youtube.end_point_router)
+app.include_router(database.status_router)
 
 app.add_middleware(LoggingMiddleware)
 
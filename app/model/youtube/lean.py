@@ -0,0 +1,106 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 수집(ingestion) 경로 전용 slim 응답 모델과 fields= partial response 파라미터
+             - fields= 로 줄어든 응답은 response.py 모델의 필수 필드(kind, etag 등)가 빠져 있어 그 모델로는 파싱 불가
+               → 이 모델은 파싱 속도가 아니라 줄어든 응답을 받기 위해 사용 (benchmarks/decode_comment_threads.py)
+             - response.py 와 같은 속성 이름을 사용하므로 pipeline 의 매핑 함수를 그대로 사용
+             - 저장하지 않는 필드(thumbnails 등)는 정의하지 않음 (파싱 시 무시됨)
+"""
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+# 1. playlistItems.list
+PLAYLIST_ITEMS_FIELDS = "nextPageToken,items(contentDetails(videoId,videoPublishedAt))"
+
+class LeanPlaylistItemContentDetails(BaseModel):
+    videoId: str
+    videoPublishedAt: Optional[str] = None
+
+class LeanPlaylistItem(BaseModel):
+    contentDetails: LeanPlaylistItemContentDetails
+
+class LeanPlaylistItemsListResponse(BaseModel):
+    items: List[LeanPlaylistItem] = []
+    nextPageToken: Optional[str] = None
+
+
+# 2. videos.list
+VIDEOS_PART = "snippet,statistics"
+VIDEOS_FIELDS = (
+    "items(id,"
+    "snippet(publishedAt,channelId,title,description,channelTitle,liveBroadcastContent,defaultLanguage),"
+    "statistics(viewCount,likeCount,commentCount))"
+)
+
+class LeanVideoStatistics(BaseModel):
+    viewCount: Optional[str] = None
+    likeCount: Optional[str] = None
+    commentCount: Optional[str] = None
+
+class LeanVideoSnippet(BaseModel):
+    publishedAt: str
+    channelId: str
+    title: str
+    description: str = ""
+    channelTitle: Optional[str] = None
+    liveBroadcastContent: Optional[str] = None
+    defaultLanguage: Optional[str] = None
+
+class LeanVideoItem(BaseModel):
+    id: str
+    snippet: LeanVideoSnippet
+    statistics: Optional[LeanVideoStatistics] = None
+
+class LeanVideosListResponse(BaseModel):
+    items: List[LeanVideoItem] = []
+
+
+# 3. commentThreads.list / comments.list
+_COMMENT_FIELDS = (
+    "id,etag,"
+    "snippet(authorDisplayName,authorChannelId,textDisplay,viewerRating,likeCount,publishedAt,updatedAt)"
+)
+COMMENT_THREADS_FIELDS = (
+    "nextPageToken,"
+    f"items(id,etag,snippet(videoId,totalReplyCount,topLevelComment({_COMMENT_FIELDS})),"
+    f"replies(comments({_COMMENT_FIELDS})))"
+)
+COMMENTS_FIELDS = f"nextPageToken,items({_COMMENT_FIELDS})"
+
+class LeanCommentSnippet(BaseModel):
+    authorDisplayName: Optional[str] = None
+    authorChannelId: dict = {}
+    textDisplay: str = ""
+    viewerRating: Optional[str] = None
+    likeCount: Optional[int] = None
+    publishedAt: str
+    updatedAt: str
+
+class LeanComment(BaseModel):
+    id: str
+    etag: Optional[str] = None
+    snippet: LeanCommentSnippet
+
+class LeanCommentThreadSnippet(BaseModel):
+    videoId: str
+    topLevelComment: LeanComment
+    totalReplyCount: int = 0
+
+class LeanCommentReplies(BaseModel):
+    comments: List[LeanComment] = []
+
+class LeanCommentThreadItem(BaseModel):
+    id: str
+    etag: Optional[str] = None
+    snippet: LeanCommentThreadSnippet
+    replies: Optional[LeanCommentReplies] = None
+
+class LeanCommentThreadsListResponse(BaseModel):
+    items: List[LeanCommentThreadItem] = []
+    nextPageToken: Optional[str] = None
+
+class LeanCommentsListResponse(BaseModel):
+    items: List[LeanComment] = []
+    nextPageToken: Optional[str] = None
@@ -0,0 +1,19 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description:
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+# 1. 여러 채널 일괄 수집 요청 (handles 가 없으면 watch list 사용)
+class BatchIngestionRequest(BaseModel):
+    handles: Optional[List[str]] = None
+    page_limit: int = Field(5, ge=1)
+    full_resync: bool = False
+
+
+# 2. watch list 추가 / 제거
+class WatchListRequest(BaseModel):
+    handles: List[str] = Field(..., min_length=1)
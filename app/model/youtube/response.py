@@ -18,6 +18,7 @@ class ChannelSnippet(BaseModel):
     description: Optional[str] = None
     publishedAt: Optional[str] = None
     country: Optional[str] = None
+    customUrl: Optional[str] = None
 
 class ChannelItem(BaseModel):
     id: str
@@ -160,3 +161,12 @@ class CommentThreadsListResponse(BaseModel):
     nextPageToken: Optional[str] = None
     prevPageToken: Optional[str] = None
     pageInfo: Optional[dict] = None
+
+
+# 5. comments.list response (parentId 로 답글 조회)
+class CommentsListResponse(BaseModel):
+    kind: Optional[str] = None
+    etag: Optional[str] = None
+    items: Optional[List[CommentReply]] = None
+    nextPageToken: Optional[str] = None
+    pageInfo: Optional[dict] = None
@@ -0,0 +1,6 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description:
+"""
+from .database_status import router as status_router
@@ -0,0 +1,54 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description:
+"""
+from typing import Dict, List
+
+from fastapi import APIRouter
+
+from app.database import get_async_engine, get_partition_maintenance, get_pool_metrics, get_read_database
+from app.database.partitions import list_comment_partitions
+
+
+router = APIRouter(
+    prefix="/database",
+    tags=["database"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get(
+    "/pool",
+    summary="Database Connection Pool Metrics",
+)
+async def get_pool_status() -> dict:
+    """Return the live pool size, checked-out / overflow connections and checkout wait times."""
+    return get_pool_metrics()
+
+@router.get(
+    "/replicas",
+    summary="Read Replica Routing Status",
+)
+async def get_replica_status() -> dict:
+    """Return the health, failure count and pool metrics of each read replica."""
+    return get_read_database().status()
+
+@router.get(
+    "/partitions",
+    summary="Comment Table Partitions",
+)
+async def get_comment_partitions() -> List[str]:
+    """Return the names of the monthly youtube_comment partitions."""
+    return await list_comment_partitions(get_async_engine())
+
+@router.post(
+    "/partitions/maintenance",
+    summary="Run Comment Partition Maintenance",
+)
+async def run_partition_maintenance() -> Dict[str, List[str]]:
+    """
+    Create the upcoming monthly partitions now and detach (or drop) the ones older than the
+    retention window, instead of waiting for the periodic run.
+    """
+    return await get_partition_maintenance().run_once()
@@ -6,13 +6,14 @@ Description:
 from fastapi import APIRouter
 from fastapi.params import Depends, Query
 
-from app.dependencies import get_youtube_business_service
+from app.dependencies import get_youtube_business_service, get_channel_business_service
 from app.model.youtube.response import (
     ChannelItem,
     PlaylistItemsListResponse,
     VideosListResponse,
     CommentThreadsListResponse,
 )
+from app.service.business.channel import ChannelBusinessService
 from app.service.business.youtube import YouTubeBusinessService
 
 
@@ -33,9 +34,9 @@ router = APIRouter(
 )
 async def get_channel(
     handle: str,
-    service: YouTubeBusinessService = Depends(get_youtube_business_service),
+    service: ChannelBusinessService = Depends(get_channel_business_service),
 ) -> ChannelItem:
-    """Retrieve channel information using its handle (e.g., @BandJannabi)."""
+    """Retrieve channel information using its handle (e.g., @BandJannabi). Served from the channel cache."""
     return await service.get_channel_by_handle(handle)
 
 @router.get(
@@ -45,9 +46,9 @@ async def get_channel(
 )
 async def get_uploads_playlist(
     channel_id: str,
-    service: YouTubeBusinessService = Depends(get_youtube_business_service),
+    service: ChannelBusinessService = Depends(get_channel_business_service),
 ) -> str:
-    """Return the uploads playlist ID for a given channel ID."""
+    """Return the uploads playlist ID for a given channel ID. Served from the channel cache."""
     return await service.get_uploads_playlist_id(channel_id)
 
 @router.get(
@@ -90,6 +91,26 @@ async def list_comments(
     """Fetch top-level comment threads for a given video ID."""
     return await service.get_comment_threads(video_id, page_token, max_results)
 
+@router.get(
+    "/quota",
+    summary="YouTube API Quota Status",
+)
+async def get_quota_status(
+    service: YouTubeBusinessService = Depends(get_youtube_business_service),
+) -> dict:
+    """Return the remaining daily quota and per-endpoint unit usage."""
+    return service.quota_status()
+
+@router.get(
+    "/resilience",
+    summary="YouTube API Client Resilience Status",
+)
+async def get_resilience_status(
+    service: YouTubeBusinessService = Depends(get_youtube_business_service),
+) -> dict:
+    """Return the circuit breaker state and retry / timeout / hedge counters."""
+    return service.resilience_status()
+
 # Root endpoint health check
 @router.get("/", summary="Health Check")
 def root():
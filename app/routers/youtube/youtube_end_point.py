@@ -4,12 +4,19 @@ Date: 2025-04-24
 Description:
 """
 import traceback
+from datetime import date
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_youtube_endpoint_service
+from app.model.youtube.request import BatchIngestionRequest, WatchListRequest
+from app.schema.public import YoutubeChannel
+from app.service.end_point.batch import BatchJob
+from app.service.business.search import VideoVelocity
+from app.service.end_point.replay import ReplayStats
 from app.service.end_point.youtube import YouTubeEndPointService
 
 router = APIRouter(
@@ -23,13 +30,15 @@ router = APIRouter(
 async def get_videos_with_comments(
     handle: str,
     page_limit: int,
+    full_resync: bool = Query(False, description="Ignore the stored watermark and re-page from the top"),
     service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
 ) -> JSONResponse:
     """
-    Fetch all videos and top 100 comments for the given channel handle.
+    Fetch new videos and their comment threads for the given channel handle.
+    Paging stops at the first already-ingested video unless full_resync is set.
     """
     try:
-        data = await service.fetch_all_videos_with_comments(handle, page_limit)
+        data = await service.fetch_all_videos_with_comments(handle, page_limit, full_resync)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"handle": handle, "results": data},
@@ -39,8 +48,78 @@ async def get_videos_with_comments(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/batch", response_model=BatchJob, status_code=status.HTTP_202_ACCEPTED)
+async def start_batch_ingestion(
+    request: BatchIngestionRequest,
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+) -> BatchJob:
+    """
+    Ingest many channels in the background (the stored watch list when no handles are given).
+    Channels share one bounded worker pool and API calls are granted round-robin across channels.
+    Poll GET /batch/{job_id} for per-channel progress and throughput.
+    """
+    return await service.start_batch_ingestion(request.handles, request.page_limit, request.full_resync)
+
+@router.get("/batch/{job_id}", response_model=BatchJob)
+async def get_batch_ingestion(
+    job_id: str,
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+) -> BatchJob:
+    """Per-channel progress and throughput of a batch ingestion job."""
+    return service.get_batch_job(job_id)
+
+@router.get("/watch-list", response_model=List[YoutubeChannel])
+async def get_watch_list(
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+) -> List[YoutubeChannel]:
+    """Channels ingested by a batch job started without handles."""
+    return await service.get_watch_list()
+
+@router.put("/watch-list", response_model=List[YoutubeChannel])
+async def add_to_watch_list(
+    request: WatchListRequest,
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+) -> List[YoutubeChannel]:
+    """Add channel handles to the watch list."""
+    return await service.update_watch_list(request.handles, watch=True)
+
+@router.delete("/watch-list", response_model=List[YoutubeChannel])
+async def remove_from_watch_list(
+    request: WatchListRequest,
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+) -> List[YoutubeChannel]:
+    """Remove channel handles from the watch list."""
+    return await service.update_watch_list(request.handles, watch=False)
+
+@router.post("/archive/replay", response_model=ReplayStats)
+async def replay_archive(
+    since: Optional[date] = Query(None, description="first archive day (inclusive)"),
+    until: Optional[date] = Query(None, description="last archive day (inclusive)"),
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+) -> ReplayStats:
+    """
+    Re-decode archived raw API responses and upsert them again without calling the API
+    (videos first, then comment threads, then replies). Requires YOUTUBE_ARCHIVE_PATH.
+    """
+    return await service.replay_archive(since, until)
+
+@router.get("/trending", response_model=List[VideoVelocity])
+async def get_trending_videos(
+    hours: int = Query(24, ge=1, description="look-back window in hours"),
+    limit: int = Query(50, ge=1, le=500),
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+) -> List[VideoVelocity]:
+    """
+    Videos ranked by view velocity (views per hour) over the window, computed from the
+    per-crawl statistics snapshots. Videos need at least two snapshots in the window.
+    """
+    return await service.get_trending_videos(hours, limit)
+
 @router.get("/process_korean_wave/{page_size}", summary="Process Korean Wave status for stored videos")
-async def process_korean_wave_endpoint(page_size: int = 50):
+async def process_korean_wave_endpoint(
+    page_size: int = 50,
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+):
     """
     Endpoint to trigger batch processing of videos:
     - Fetch videos in pages
@@ -50,19 +129,20 @@ async def process_korean_wave_endpoint(page_size: int = 50):
     Optional query param:
     - page_size: number of videos per page (default: 50)
     """
-    service = YouTubeEndPointService()
     try:
         result = await service.process_korean_wave_status(page_size)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await service.close()
 
     return result
 
 
 @router.get("/process_sentiment_comment/{page_size}", summary="Process Sentiment analysis comment")
-async def process_sentiment_comment(page_size: int = 50):
+async def process_sentiment_comment(
+    page_size: int = 50,
+    since_days: Optional[int] = Query(None, ge=1, description="only comments published in the last N days"),
+    service: YouTubeEndPointService = Depends(get_youtube_endpoint_service),
+):
     """
     Endpoint to trigger batch processing of videos:
     - Fetch videos in pages
@@ -71,13 +151,11 @@ async def process_sentiment_comment(page_size: int = 50):
 
     Optional query param:
     - page_size: number of videos per page (default: 50)
+    - since_days: limit the scan to recent comment partitions
     """
-    service = YouTubeEndPointService()
     try:
-        result = await service.process_sentiment_for_comment(page_size)
+        result = await service.process_sentiment_for_comment(page_size, since_days)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await service.close()
 
     return result
\ No newline at end of file
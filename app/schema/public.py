@@ -7,14 +7,21 @@ Description:
 from typing import Optional, List
 from datetime import datetime
 
-from sqlalchemy import MetaData
+from sqlalchemy import BigInteger, Index, MetaData, text
 from sqlmodel import Field, SQLModel, Relationship
 
 metadata = MetaData(schema="public")
 
 class YoutubeVideo(SQLModel, table=True):
     __tablename__ = "youtube_video"
-    __table_args__ = {"comment": "youtube video"}  # 테이블 주석
+    __table_args__ = (
+        # 작업 큐 partial index (app/database/migrations/versions.py 0002)
+        Index("ix_youtube_video_korean_wave_pending", "video_id", postgresql_where=text("korean_wave_yn IS NULL")),
+        Index("ix_youtube_video_korean_wave_y", "video_id", postgresql_where=text("korean_wave_yn = 'Y'")),
+        # 채널의 최근 영상 (댓글 갱신 대상 / 자동 수집 주기 계산, 0007)
+        Index("ix_youtube_video_channel_published", "channel_id", "published_at"),
+        {"comment": "youtube video"},  # 테이블 주석
+    )
 
     metadata = metadata
 
@@ -54,16 +61,19 @@ class YoutubeVideo(SQLModel, table=True):
         None,
         sa_column_kwargs={"comment":"video 리소스의 snippet.title 및 snippet.description 텍스트의 언어"}
     )
-    view_count: Optional[str] = Field(
+    view_count: Optional[int] = Field(
         None,
+        sa_type=BigInteger,
         sa_column_kwargs={"comment": "동영상의 조회수입니다."}  # COMMENT ON COLUMN ... IS '동영상의 조회수입니다.';
     )
-    like_count: Optional[str] = Field(
+    like_count: Optional[int] = Field(
         None,
+        sa_type=BigInteger,
         sa_column_kwargs={"comment": "동영상에 좋아요를 표시한 사용자 수입니다."}  # COMMENT ON COLUMN ... IS '동영상에 좋아요를 표시한 사용자 수입니다.';
     )
-    comment_count: Optional[str] = Field(
+    comment_count: Optional[int] = Field(
         None,
+        sa_type=BigInteger,
         sa_column_kwargs={"comment": "동영상의 댓글 수입니다."}  # COMMENT ON COLUMN ... IS '동영상의 댓글 수입니다.';
     )
     korean_wave_yn: Optional[str] = Field(
@@ -81,9 +91,53 @@ class YoutubeVideo(SQLModel, table=True):
     def __repr__(self):
         return f"<YoutubeVideo(video_id='{self.video_id}', title='{self.title}')>"
 
+class YoutubeVideoStats(SQLModel, table=True):
+    __tablename__ = "youtube_video_stats"
+    __table_args__ = (
+        # append-only 이므로 captured_at 이 물리 순서와 거의 같음 → 작은 BRIN 으로 시간 범위 scan
+        Index("ix_youtube_video_stats_captured_at", "captured_at", postgresql_using="brin"),
+        {"comment": "영상 통계 snapshot (수집할 때마다 영상당 1 row, append-only)"},
+    )
+
+    metadata = metadata
+
+    video_id: str = Field(
+        ...,
+        primary_key=True,
+        sa_column_kwargs={"comment": "비디오ID"}
+    )
+    captured_at: datetime = Field(
+        ...,
+        primary_key=True,
+        sa_column_kwargs={"comment": "수집 시각 (UTC)"}
+    )
+    view_count: Optional[int] = Field(
+        None,
+        sa_type=BigInteger,
+        sa_column_kwargs={"comment": "조회수"}
+    )
+    like_count: Optional[int] = Field(
+        None,
+        sa_type=BigInteger,
+        sa_column_kwargs={"comment": "좋아요 수"}
+    )
+    comment_count: Optional[int] = Field(
+        None,
+        sa_type=BigInteger,
+        sa_column_kwargs={"comment": "댓글 수"}
+    )
+
+    def __repr__(self):
+        return f"<YoutubeVideoStats(video_id='{self.video_id}', captured_at='{self.captured_at}')>"
+
 class YoutubeComment(SQLModel, table=True):
     __tablename__ = "youtube_comment"
-    __table_args__ = {"comment": "유튜브 댓글"}
+    __table_args__ = (
+        Index("ix_youtube_comment_extract_pending", "comment_id", postgresql_where=text("extract_yn = 'N'")),
+        Index("ix_youtube_comment_video_id", "video_id", "published_at"),
+        # published_at 월 단위 range partition (migration 0004, app/database/partitions.py)
+        {"comment": "유튜브 댓글", "postgresql_partition_by": "RANGE (published_at)"},
+    )
 
     metadata = metadata
 
@@ -117,8 +171,9 @@ class YoutubeComment(SQLModel, table=True):
         None,
         sa_column_kwargs={"comment": "댓글의 텍스트입니다. 텍스트는 일반 텍스트 또는 HTML로 검색할 수 있습니다."}
     )
-    published_at: Optional[datetime] = Field(
-        None,
+    published_at: datetime = Field(
+        ...,
+        primary_key=True,  # partition key 는 PK 에 포함되어야 함
         sa_column_kwargs={"comment": "댓글이 처음 게시된 날짜 및 시간입니다."}
     )
     updated_at: Optional[datetime] = Field(
@@ -150,4 +205,107 @@ class YoutubeComment(SQLModel, table=True):
     video: "YoutubeVideo" = Relationship(back_populates="comments")
 
     def __repr__(self):
-        return f"<YoutubeComment(comment_id='{self.comment_id}', author='{self.author_display_name}')>"
\ No newline at end of file
+        return f"<YoutubeComment(comment_id='{self.comment_id}', author='{self.author_display_name}')>"
+
+class YoutubeChannelSync(SQLModel, table=True):
+    __tablename__ = "youtube_channel_sync"
+    __table_args__ = {"comment": "채널별 증분 수집 상태 (watermark)"}
+
+    metadata = metadata
+
+    channel_id: str = Field(
+        ...,
+        primary_key=True,
+        sa_column_kwargs={"comment": "채널ID"}
+    )
+    handle: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "채널 핸들 (예: @BandJannabi)"}
+    )
+    last_video_id: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "수집된 가장 최신 비디오ID"}
+    )
+    last_published_at: Optional[datetime] = Field(
+        None,
+        sa_column_kwargs={"comment": "수집된 가장 최신 비디오의 개시 날자"}
+    )
+    last_synced_at: Optional[datetime] = Field(
+        None,
+        sa_column_kwargs={"comment": "마지막 수집 시각"}
+    )
+    next_poll_at: Optional[datetime] = Field(
+        None,
+        sa_column_kwargs={"comment": "다음 자동 수집 시각"}
+    )
+    poll_interval: Optional[int] = Field(
+        None,
+        sa_column_kwargs={"comment": "자동 수집 주기 (초, 업로드/댓글 속도로 계산)"}
+    )
+    retry_video_ids: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "댓글 수집에 실패해 다음 수집에서 다시 수집할 비디오ID (콤마 구분)"}
+    )
+    resume_page_token: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "watermark 까지 내려가지 못하고 멈춘 playlist 페이지 토큰 (다음 수집에서 이어서 paging)"}
+    )
+    pending_video_id: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "이어서 paging 중인 수집의 가장 최신 비디오ID (watermark 에 도달하면 last_video_id 로 반영)"}
+    )
+    pending_published_at: Optional[datetime] = Field(
+        None,
+        sa_column_kwargs={"comment": "이어서 paging 중인 수집의 가장 최신 비디오 게시 날자"}
+    )
+
+    def __repr__(self):
+        return f"<YoutubeChannelSync(channel_id='{self.channel_id}', last_video_id='{self.last_video_id}')>"
+
+class YoutubeChannel(SQLModel, table=True):
+    __tablename__ = "youtube_channel"
+    __table_args__ = {"comment": "채널 핸들 → 채널ID / 업로드 플레이리스트 캐시"}
+
+    metadata = metadata
+
+    channel_id: str = Field(
+        ...,
+        primary_key=True,
+        sa_column_kwargs={"comment": "채널ID"}
+    )
+    handle: Optional[str] = Field(
+        None,
+        index=True,
+        sa_column_kwargs={"comment": "채널 핸들 (소문자, @ 포함)"}
+    )
+    uploads_playlist_id: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "업로드 플레이리스트ID"}
+    )
+    title: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "채널 이름"}
+    )
+    description: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "채널 설명"}
+    )
+    country: Optional[str] = Field(
+        None,
+        sa_column_kwargs={"comment": "채널 국가"}
+    )
+    published_at: Optional[datetime] = Field(
+        None,
+        sa_column_kwargs={"comment": "채널 개설 날자"}
+    )
+    resolved_at: Optional[datetime] = Field(
+        None,
+        sa_column_kwargs={"comment": "API 로 마지막 조회한 시각 (TTL 기준)"}
+    )
+    watch_yn: str = Field(
+        default="N",
+        sa_column_kwargs={"comment": "일괄 수집 대상(watch list) Y/N"}
+    )
+
+    def __repr__(self):
+        return f"<YoutubeChannel(channel_id='{self.channel_id}', handle='{self.handle}')>"
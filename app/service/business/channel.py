@@ -0,0 +1,124 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 채널 핸들 → 채널ID → 업로드 플레이리스트 조회 (youtube_channel 테이블 TTL 캐시)
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.model.youtube.response import (
+    ChannelItem,
+    ChannelSnippet,
+    ChannelContentDetails,
+    ChannelContentDetailsRelatedPlaylists,
+)
+from app.schema.public import YoutubeChannel
+from app.service.business.search import SearchBusinessService
+from app.service.business.transaction import TransactionBusinessService
+from app.service.business.youtube import YouTubeBusinessService, settings
+from app.utils.text import TextUtils
+
+
+class ChannelBusinessService:
+    """
+    채널 조회 결과를 youtube_channel 에 저장해 두고 ttl 동안은 API 를 호출하지 않습니다.
+    - 핸들 조회는 channels.list 1회로 채널ID 와 업로드 플레이리스트를 함께 얻음
+    - 업로드 플레이리스트는 채널마다 고정이므로 같은 채널의 반복 수집은 채널 조회를 건너뜀
+    """
+
+    def __init__(
+        self,
+        youtube_service: YouTubeBusinessService,
+        search_service: Optional[SearchBusinessService] = None,
+        tx_service: Optional[TransactionBusinessService] = None,
+        ttl: Optional[int] = None,
+    ):
+        self.youtube = youtube_service
+        self.search = search_service or SearchBusinessService()
+        self.tx = tx_service or TransactionBusinessService()
+        self.ttl = timedelta(seconds=settings.channel_cache_ttl if ttl is None else ttl)
+
+    @staticmethod
+    def normalize_handle(handle: str) -> str:
+        """핸들은 대소문자를 구분하지 않으므로 소문자 + '@' 접두사로 저장"""
+        handle = handle.strip().lower()
+        return handle if handle.startswith("@") else f"@{handle}"
+
+    async def resolve_handle(self, handle: str) -> YoutubeChannel:
+        """
+        핸들 → 채널 (캐시가 없거나 만료되었으면 channels.list?forHandle 1회 호출)
+        """
+        handle = self.normalize_handle(handle)
+        cached = await self.search.get_channel_by_handle(handle)
+        if self._is_fresh(cached):
+            return cached
+
+        item = await self.youtube.get_channel_by_handle(handle)
+        return await self._store(item, handle)
+
+    async def resolve_channel_id(self, channel_id: str) -> YoutubeChannel:
+        """
+        채널ID → 채널 (캐시가 없거나 만료되었으면 channels.list?id 1회 호출)
+        """
+        cached = await self.search.get_channel(channel_id)
+        if self._is_fresh(cached):
+            return cached
+
+        item = await self.youtube.get_channel_by_id(channel_id)
+        handle = item.snippet.customUrl if item.snippet else None
+        # customUrl 이 없으면 캐시된 핸들을 그대로 둠 (None 으로 덮어쓰면 핸들 조회가 캐시를 못 찾음)
+        return await self._store(item, self.normalize_handle(handle) if handle else None, cached)
+
+    async def get_channel_by_handle(self, handle: str) -> ChannelItem:
+        """business router 용: 캐시된 채널을 channels.list item 모양으로 반환"""
+        return self.to_channel_item(await self.resolve_handle(handle))
+
+    async def get_uploads_playlist_id(self, channel_id: str) -> str:
+        return (await self.resolve_channel_id(channel_id)).uploads_playlist_id
+
+    @staticmethod
+    def to_channel_item(channel: YoutubeChannel) -> ChannelItem:
+        published_at = channel.published_at.strftime("%Y-%m-%dT%H:%M:%SZ") if channel.published_at else None
+        return ChannelItem(
+            id=channel.channel_id,
+            snippet=ChannelSnippet(
+                title=channel.title or "",
+                description=channel.description,
+                publishedAt=published_at,
+                country=channel.country,
+                customUrl=channel.handle,
+            ),
+            contentDetails=ChannelContentDetails(
+                relatedPlaylists=ChannelContentDetailsRelatedPlaylists(uploads=channel.uploads_playlist_id),
+            ),
+        )
+
+    def _is_fresh(self, channel: Optional[YoutubeChannel]) -> bool:
+        return bool(
+            channel
+            and channel.uploads_playlist_id
+            and channel.resolved_at
+            and self._now() - channel.resolved_at < self.ttl
+        )
+
+    async def _store(
+        self, item: ChannelItem, handle: Optional[str], cached: Optional[YoutubeChannel] = None
+    ) -> YoutubeChannel:
+        """handle 을 모르면 (None) 저장된 핸들을 유지"""
+        snippet = item.snippet
+        channel = YoutubeChannel(
+            channel_id=item.id,
+            handle=handle or (cached.handle if cached else None),
+            uploads_playlist_id=item.contentDetails.relatedPlaylists.uploads if item.contentDetails else None,
+            title=snippet.title if snippet else None,
+            description=snippet.description if snippet else None,
+            country=snippet.country if snippet else None,
+            published_at=TextUtils.parse_ts(snippet.publishedAt) if snippet and snippet.publishedAt else None,
+            resolved_at=self._now(),
+        )
+        await self.tx.upsert_channel(channel.model_dump(exclude={"watch_yn"} if handle else {"watch_yn", "handle"}))
+        return channel
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -57,8 +57,8 @@ class NlpBusinessService:
             videos_data += f"""
             ===========================================================
             Video ID: {video.video_id}
-            Title: {TextUtils.unescape_control_chars(video.title)}
-            Description: {TextUtils.unescape_control_chars(video.description)}
+            Title: {video.title}
+            Description: {video.description}
             Channel Title: {video.channel_title}
             ===========================================================
             """
@@ -94,7 +94,7 @@ class NlpBusinessService:
                 f"=============== Comment #{idx} ================\n"
                 f"Comment ID: {comment.comment_id}\n"
                 f"Like Count: {comment.like_count}\n"
-                f"Text: {TextUtils.unescape_control_chars(comment.text_display or '')}\n"
+                f"Text: {comment.text_display or ''}\n"
                 f"============================================"
             )
             comment_blocks.append(block)
@@ -3,39 +3,145 @@ Author: sg.kim
 Date: 2025-04-25
 Description:
 """
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 
+from pydantic import BaseModel
 from sqlalchemy import Null
 from sqlalchemy.sql.operators import is_
-from sqlmodel import select, and_, col
+from sqlalchemy import func
+from sqlmodel import select, and_, or_, col
 
-from app.database import get_async_database
-from app.schema.public import YoutubeComment, YoutubeVideo
+from app.database import get_read_database, retry_on_primary
+from app.schema.public import YoutubeComment, YoutubeVideo, YoutubeChannelSync, YoutubeChannel, YoutubeVideoStats
+
+
+class VideoVelocity(BaseModel):
+    """기간 안의 첫 / 마지막 snapshot 사이 통계 증가량과 시간당 증가 속도"""
+    video_id: str
+    title: Optional[str] = None
+    first_captured_at: datetime
+    last_captured_at: datetime
+    view_delta: Optional[int] = None
+    like_delta: Optional[int] = None
+    views_per_hour: Optional[float] = None
+    likes_per_hour: Optional[float] = None
 
 
 class SearchBusinessService:
+    """
+    읽기 전용 조회 (read replica 가 설정되어 있으면 replica 에서 읽음)
+    방금 저장한 데이터를 다시 읽어야 하는 경로는 app.database.primary_reads() 안에서 호출
+    쿼리 도중 replica connection 이 끊기면 primary 에서 한 번 다시 조회 (retry_on_primary)
+    """
     def __init__(self):
-        self._session_factory = get_async_database()
-
-    async def get_videos(self, previous_id: Optional[str], page_size: int) -> Tuple[List[YoutubeVideo], Optional[str]]:
+        self._session_factory = get_read_database()
 
+    @staticmethod
+    def pending_videos_query(previous_id: Optional[str], page_size: int):
+        """
+        한류 판별 대기 영상 (korean_wave_yn IS NULL, video_id keyset) → ix_youtube_video_korean_wave_pending
+        """
         conditions = [col(YoutubeVideo.korean_wave_yn).is_(None)]
 
         if previous_id:
             conditions.append(YoutubeVideo.video_id > previous_id)
 
+        return (
+            select(YoutubeVideo)
+            .where(
+                and_(*conditions)
+            )
+            .order_by(YoutubeVideo.video_id)
+            .limit(page_size)
+        )
+
+    @staticmethod
+    def pending_comments_query(
+        previous_id: Optional[str], page_size: int, published_since: Optional[datetime] = None
+    ):
+        """
+        감성 분석 대기 댓글 (한류 영상 + extract_yn = 'N', comment_id keyset)
+        → ix_youtube_comment_extract_pending + ix_youtube_video_korean_wave_y
+        published_since 를 주면 그 이후 달의 partition 만 scan
+        """
+        return (
+            select(YoutubeComment)
+            .join(YoutubeComment.video)  # join to YoutubeVideo
+            .where(
+                and_(
+                    YoutubeVideo.korean_wave_yn == 'Y',
+                    YoutubeComment.extract_yn == 'N',
+                    *(
+                        [YoutubeComment.comment_id > previous_id]
+                        if previous_id is not None else []
+                    ),
+                    *(
+                        [YoutubeComment.published_at >= published_since]
+                        if published_since is not None else []
+                    ),
+                )
+            )
+            .order_by(YoutubeComment.comment_id)
+            .limit(page_size)
+        )
+
+    @staticmethod
+    def video_velocity_query(since: datetime, limit: int):
+        """
+        since 이후 snapshot 이 2개 이상인 영상의 조회수 / 좋아요 증가 속도 (조회수 속도 내림차순)
+        - captured_at 범위 조건 → ix_youtube_video_stats_captured_at (BRIN) 으로 기간 안의 block 만 읽음
+        - 증가량 = 기간 안의 최대값 - 최소값 (삭제 등으로 값이 줄어든 경우도 0 이상)
+        """
+        stats = (
+            select(
+                YoutubeVideoStats.video_id,
+                func.min(YoutubeVideoStats.captured_at).label("first_captured_at"),
+                func.max(YoutubeVideoStats.captured_at).label("last_captured_at"),
+                (func.max(YoutubeVideoStats.view_count) - func.min(YoutubeVideoStats.view_count)).label("view_delta"),
+                (func.max(YoutubeVideoStats.like_count) - func.min(YoutubeVideoStats.like_count)).label("like_delta"),
+            )
+            .where(YoutubeVideoStats.captured_at >= since)
+            .group_by(YoutubeVideoStats.video_id)
+            .having(func.count() >= 2)
+            .subquery("stats")
+        )
+        hours = func.extract("epoch", stats.c.last_captured_at - stats.c.first_captured_at) / 3600
+        views_per_hour = (stats.c.view_delta / hours).label("views_per_hour")
+        likes_per_hour = (stats.c.like_delta / hours).label("likes_per_hour")
+
+        return (
+            select(
+                stats.c.video_id,
+                YoutubeVideo.title,
+                stats.c.first_captured_at,
+                stats.c.last_captured_at,
+                stats.c.view_delta,
+                stats.c.like_delta,
+                views_per_hour,
+                likes_per_hour,
+            )
+            .join(YoutubeVideo, YoutubeVideo.video_id == stats.c.video_id)
+            .order_by(views_per_hour.desc().nulls_last())
+            .limit(limit)
+        )
+
+    @retry_on_primary
+    async def get_video_velocity(self, since: datetime, limit: int) -> List[VideoVelocity]:
+        """
+        조회수 증가 속도가 빠른 영상 (youtube_video_stats 기준)
+        """
+        async with self._session_factory() as session:
+            rows = (await session.execute(self.video_velocity_query(since, limit))).mappings().all()
+        return [VideoVelocity.model_validate(dict(row)) for row in rows]
+
+    @retry_on_primary
+    async def get_videos(self, previous_id: Optional[str], page_size: int) -> Tuple[List[YoutubeVideo], Optional[str]]:
+
         async with self._session_factory() as session:
             async with session.begin():
                 # 1) 해당 비디오 페이징 조회
-                stmt = (
-                    select(YoutubeVideo)
-                    .where(
-                        and_(*conditions)
-                    )
-                    .order_by(YoutubeVideo.video_id)
-                    .limit(page_size)
-                )
-                result = await session.execute(stmt)
+                result = await session.execute(self.pending_videos_query(previous_id, page_size))
                 videos: List[YoutubeVideo] = result.scalars().all()
 
         # 마지막 video_id 계산
@@ -48,7 +154,10 @@ class SearchBusinessService:
         return videos, last_id
 
 
-    async def get_comments_for_video(self, previous_id: Optional[str], page_size: int) -> Tuple[List[YoutubeComment], Optional[str]]:
+    @retry_on_primary
+    async def get_comments_for_video(
+        self, previous_id: Optional[str], page_size: int, published_since: Optional[datetime] = None
+    ) -> Tuple[List[YoutubeComment], Optional[str]]:
         """
         video_id에 속한 댓글(최상위 + 답글)을 조회 후 반환
         """
@@ -56,23 +165,9 @@ class SearchBusinessService:
         async with self._session_factory() as session:
             async with session.begin():
                 # 1) 해당 비디오의 모든 댓글 조회
-                stmt = (
-                    select(YoutubeComment)
-                    .join(YoutubeComment.video)  # join to YoutubeVideo
-                    .where(
-                        and_(
-                            YoutubeVideo.korean_wave_yn == 'Y',
-                            YoutubeComment.extract_yn == 'N',
-                            *(
-                                [YoutubeComment.comment_id > previous_id]
-                                if previous_id is not None else []
-                            )
-                        )
-                    )
-                    .order_by(YoutubeComment.comment_id)
-                    .limit(page_size)
+                result = await session.execute(
+                    self.pending_comments_query(previous_id, page_size, published_since)
                 )
-                result = await session.execute(stmt)
                 all_comments: List[YoutubeComment] = result.scalars().all()
 
         # 마지막 video_id 계산
@@ -83,3 +178,166 @@ class SearchBusinessService:
             last_id = None
 
         return all_comments, last_id
+
+    @retry_on_primary
+    async def get_channel_sync_state(self, channel_id: str) -> Optional[YoutubeChannelSync]:
+        """
+        채널의 증분 수집 watermark 조회 (없으면 None)
+        """
+        async with self._session_factory() as session:
+            return await session.get(YoutubeChannelSync, channel_id)
+
+    @retry_on_primary
+    async def get_latest_comment_published_at(self, video_id: str) -> Optional[datetime]:
+        """
+        비디오에 저장된 가장 최신 최상위 댓글의 게시 시각 (댓글 증분 수집 기준)
+        댓글은 영상 게시 이후에만 달리므로 영상 게시 시각을 하한으로 주어 그 이전 달의 partition 은 제외
+        """
+        async with self._session_factory() as session:
+            video_published_at = (await session.execute(
+                select(YoutubeVideo.published_at).where(YoutubeVideo.video_id == video_id)
+            )).scalar_one_or_none()
+            if video_published_at is None:
+                return None
+
+            stmt = (
+                select(func.max(YoutubeComment.published_at))
+                .where(
+                    and_(
+                        YoutubeComment.video_id == video_id,
+                        col(YoutubeComment.parent_comment_id).is_(None),
+                        YoutubeComment.published_at >= video_published_at,
+                    )
+                )
+            )
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    @retry_on_primary
+    async def get_comment_video_ids(self, comment_ids: List[str]) -> Dict[str, str]:
+        """
+        댓글ID → 비디오ID (archive replay 에서 답글의 video_id 를 찾을 때 사용)
+        """
+        if not comment_ids:
+            return {}
+        async with self._session_factory() as session:
+            stmt = (
+                select(YoutubeComment.comment_id, YoutubeComment.video_id)
+                .where(col(YoutubeComment.comment_id).in_(comment_ids))
+            )
+            return {comment_id: video_id for comment_id, video_id in (await session.execute(stmt)).all()}
+
+    @retry_on_primary
+    async def get_channel(self, channel_id: str) -> Optional[YoutubeChannel]:
+        """
+        채널 캐시 조회 (채널ID)
+        """
+        async with self._session_factory() as session:
+            return await session.get(YoutubeChannel, channel_id)
+
+    @retry_on_primary
+    async def get_channel_by_handle(self, handle: str) -> Optional[YoutubeChannel]:
+        """
+        채널 캐시 조회 (정규화된 핸들)
+        """
+        async with self._session_factory() as session:
+            stmt = select(YoutubeChannel).where(YoutubeChannel.handle == handle)
+            return (await session.execute(stmt)).scalars().first()
+
+    @retry_on_primary
+    async def get_watch_list(self) -> List[YoutubeChannel]:
+        """
+        일괄 수집 대상 채널 목록 (watch_yn = 'Y')
+        """
+        async with self._session_factory() as session:
+            stmt = (
+                select(YoutubeChannel)
+                .where(YoutubeChannel.watch_yn == "Y")
+                .order_by(YoutubeChannel.handle)
+            )
+            return list((await session.execute(stmt)).scalars().all())
+
+    @retry_on_primary
+    async def get_due_channels(self, now: datetime, limit: int) -> List[YoutubeChannel]:
+        """
+        자동 수집 시각이 된 watch list 채널 (수집 이력이 없는 채널 먼저)
+        """
+        async with self._session_factory() as session:
+            stmt = (
+                select(YoutubeChannel)
+                .outerjoin(YoutubeChannelSync, YoutubeChannelSync.channel_id == YoutubeChannel.channel_id)
+                .where(
+                    and_(
+                        YoutubeChannel.watch_yn == "Y",
+                        or_(
+                            col(YoutubeChannelSync.next_poll_at).is_(None),
+                            YoutubeChannelSync.next_poll_at <= now,
+                        ),
+                    )
+                )
+                .order_by(col(YoutubeChannelSync.next_poll_at).asc().nulls_first())
+                .limit(limit)
+            )
+            return list((await session.execute(stmt)).scalars().all())
+
+    @retry_on_primary
+    async def get_next_poll_at(self) -> Optional[datetime]:
+        """
+        watch list 채널 중 가장 가까운 다음 자동 수집 시각
+        """
+        async with self._session_factory() as session:
+            stmt = (
+                select(func.min(YoutubeChannelSync.next_poll_at))
+                .join(YoutubeChannel, YoutubeChannel.channel_id == YoutubeChannelSync.channel_id)
+                .where(YoutubeChannel.watch_yn == "Y")
+            )
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    @retry_on_primary
+    async def get_recent_video_ids(self, channel_id: str, published_since: datetime, limit: int) -> List[str]:
+        """
+        채널의 최근 게시된 저장 영상 (최신 순, 댓글 갱신 대상) → ix_youtube_video_channel_published
+        """
+        async with self._session_factory() as session:
+            stmt = (
+                select(YoutubeVideo.video_id)
+                .where(
+                    and_(
+                        YoutubeVideo.channel_id == channel_id,
+                        YoutubeVideo.published_at >= published_since,
+                    )
+                )
+                .order_by(col(YoutubeVideo.published_at).desc())
+                .limit(limit)
+            )
+            return list((await session.execute(stmt)).scalars().all())
+
+    @retry_on_primary
+    async def get_channel_activity(
+        self, channel_id: str, videos_since: datetime, comments_since: datetime
+    ) -> Tuple[int, int]:
+        """
+        채널의 최근 업로드 수 / 최근 댓글 수 (자동 수집 주기 계산용)
+        """
+        async with self._session_factory() as session:
+            videos = await session.execute(
+                select(func.count())
+                .select_from(YoutubeVideo)
+                .where(
+                    and_(
+                        YoutubeVideo.channel_id == channel_id,
+                        YoutubeVideo.published_at >= videos_since,
+                    )
+                )
+            )
+            comments = await session.execute(
+                select(func.count())
+                .select_from(YoutubeComment)
+                .join(YoutubeVideo, YoutubeVideo.video_id == YoutubeComment.video_id)
+                .where(
+                    and_(
+                        YoutubeVideo.channel_id == channel_id,
+                        YoutubeComment.published_at >= comments_since,
+                    )
+                )
+            )
+            return videos.scalar_one(), comments.scalar_one()
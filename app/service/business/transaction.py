@@ -3,104 +3,421 @@ Author: sg.kim
 Date: 2025-04-25
 Description:
 """
-from typing import Dict, List
+import logging
+from datetime import datetime, time, timezone
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from sqlalchemy import update
-from sqlmodel import select
+from sqlalchemy import (
+    ColumnElement, Table, and_, case, column, func, null, table as sa_table, text, tuple_, update, values,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, col, or_
 
+from app.config import DatabaseSettings
 from app.database import get_async_database
-from app.schema.public import YoutubeVideo, YoutubeComment
+from app.database.partitions import retention_cutoff
+from app.schema.public import YoutubeVideo, YoutubeComment, YoutubeChannelSync, YoutubeChannel, YoutubeVideoStats
+
+logger = logging.getLogger(__name__)
+
+# asyncpg 한 statement 의 bind parameter 상한
+POSTGRES_MAX_PARAMS = 32767
+
+# multi-row upsert 한 번에 보내는 최대 row 수
+UPSERT_CHUNK_ROWS = 1000
+
+# youtube_video_stats 로 snapshot 하는 컬럼
+STATS_COLUMNS = ("view_count", "like_count", "comment_count")
+
+
+def _dedupe(rows: List[Dict], pk: str) -> List[Dict]:
+    """PK 중복 제거 (마지막 값 사용) + 모든 row 를 같은 컬럼 구성으로 맞춤 (multi-row VALUES)"""
+    unique = list({row[pk]: row for row in rows}.values())
+    columns = list(dict.fromkeys(c for row in unique for c in row))
+    return [{c: row.get(c) for c in columns} for row in unique]
+
+def _dedupe_keep_columns(rows: List[Dict], pk: str) -> List[Dict]:
+    """PK 중복 제거 (마지막 값 사용), row 별 컬럼 구성은 그대로"""
+    return list({row[pk]: row for row in rows}.values())
+
+def _split_snapshots(videos_data: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    영상 row → (youtube_video row, youtube_video_stats row)
+    row 의 captured_at 은 snapshot 시각으로만 쓰고 youtube_video 에는 넣지 않음 (없으면 현재 시각)
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    videos, snapshots = [], []
+    for row in videos_data:
+        row = dict(row)
+        captured_at = row.pop("captured_at", None) or now
+        videos.append(row)
+        if any(row.get(c) is not None for c in STATS_COLUMNS):
+            snapshots.append({
+                "video_id": row["video_id"],
+                "captured_at": captured_at,
+                **{c: row.get(c) for c in STATS_COLUMNS},
+            })
+    return videos, snapshots
+
+def _captured_at(videos_data: List[Dict]) -> Dict[str, datetime]:
+    """영상ID → row 의 captured_at (captured_at 이 있는 row 만, 중복은 마지막 값)"""
+    return {row["video_id"]: row["captured_at"] for row in videos_data if row.get("captured_at")}
+
+def _chunks(rows: List[Dict], max_rows: int) -> Iterator[List[Dict]]:
+    """bind parameter 상한을 넘지 않도록 row 목록을 나눔"""
+    size = max(min(max_rows, POSTGRES_MAX_PARAMS // max(len(rows[0]), 1)), 1)
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+def _is_distinct(table: Table, excluded, columns: List[str]) -> ColumnElement[bool]:
+    """(저장된 값들) IS DISTINCT FROM (새 값들): 하나라도 다르면 True"""
+    return tuple_(*(table.c[c] for c in columns)).is_distinct_from(tuple_(*(excluded[c] for c in columns)))
+
+def _upsert_videos(stmt: Insert, columns: List[str]) -> Insert:
+    """youtube_video ON CONFLICT: 값이 하나라도 바뀐 row 만 UPDATE, 나머지 컬럼은 유지"""
+    table = YoutubeVideo.__table__
+    changed = [c for c in columns if c != "video_id"]
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.video_id],
+        set_={c: stmt.excluded[c] for c in changed},
+        where=_is_distinct(table, stmt.excluded, changed),
+    ).returning(table.c.video_id)
+
+def _upsert_comments(stmt: Insert, columns: List[str]) -> Insert:
+    """
+    youtube_comment ON CONFLICT: etag 가 같으면 건너뛰고, 텍스트가 바뀐 경우에만 분석 결과 초기화
+    저장된 updated_at 보다 오래된 댓글(archive replay 의 예전 응답)은 덮어쓰지 않음
+    (partitioned table 이라 conflict 대상은 partition key 를 포함한 PK (comment_id, published_at))
+    """
+    table = YoutubeComment.__table__
+    excluded = stmt.excluded
+    set_ = {c: excluded[c] for c in columns if c not in ("comment_id", "published_at")}
+    if "text_display" in set_:
+        text_changed = table.c.text_display.is_distinct_from(excluded.text_display)
+        set_["extract_yn"] = case((text_changed, "N"), else_=table.c.extract_yn)
+        set_["sentiment"] = case((text_changed, null()), else_=table.c.sentiment)
+        set_["key_words"] = case((text_changed, null()), else_=table.c.key_words)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.comment_id, table.c.published_at],
+        set_=set_,
+        where=and_(
+            or_(table.c.etag.is_(None), table.c.etag.is_distinct_from(excluded.etag)),
+            or_(table.c.updated_at.is_(None), excluded.updated_at.is_(None), excluded.updated_at >= table.c.updated_at),
+        ),
+    ).returning(table.c.comment_id)
+
+def _upsert_by_pk(table: Table, pk: str, row: Dict) -> Insert:
+    """row 1개 INSERT ... ON CONFLICT (pk) DO UPDATE: row 에 있는 컬럼만 덮어쓰고 나머지는 유지"""
+    stmt = insert(table).values(row)
+    changed = [c for c in row if c != pk]
+    if not changed:
+        return stmt.on_conflict_do_nothing(index_elements=[table.c[pk]])
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[pk]],
+        set_={c: stmt.excluded[c] for c in changed},
+    )
 
 
 class TransactionBusinessService:
-    def __init__(self):
+    def __init__(self, chunk_rows: int = UPSERT_CHUNK_ROWS, comment_retention_months: Optional[int] = None):
         self._session_factory = get_async_database()
+        self.chunk_rows = chunk_rows
+        # 보관 기간이 지난 달의 댓글은 저장하지 않음 (partition 을 detach / drop 한 달은 default partition 으로 들어감)
+        self.comment_retention_months = (
+            comment_retention_months if comment_retention_months is not None
+            else DatabaseSettings().comment_retention_months
+        )
+
+    def _drop_retired_comments(self, comments_data: List[Dict]) -> List[Dict]:
+        """published_at 이 보관 기간(comment_retention_months)보다 오래된 댓글 제외"""
+        cutoff = retention_cutoff(self.comment_retention_months)
+        if cutoff is None:
+            return comments_data
+        cutoff_at = datetime.combine(cutoff, time.min)
+        kept = [row for row in comments_data if row.get("published_at") is None or row["published_at"] >= cutoff_at]
+        if len(kept) < len(comments_data):
+            logger.info("skipped %d comments older than the retention cutoff %s", len(comments_data) - len(kept), cutoff)
+        return kept
 
     async def insert_youtube_video(self, video_data: Dict) -> None:
+        await self.insert_youtube_videos_bulk([video_data])
+
+    async def insert_youtube_videos_bulk(self, videos_data: List[Dict], skip_stale: bool = False) -> int:
+        """
+        비디오 row 들을 INSERT ... ON CONFLICT (video_id) DO UPDATE 로 한 번에 upsert 합니다.
+        - videos_data 에 없는 컬럼(korean_wave_yn 등)은 기존 값을 유지
+        - 값이 모두 같은 row 는 UPDATE 하지 않음 (IS DISTINCT FROM)
+        - 통계가 있는 영상은 값이 같아도 youtube_video_stats 에 snapshot 1 row 를 같은 트랜잭션으로 추가
+        - skip_stale: row 의 captured_at 보다 최근 snapshot 이 있는 영상은 youtube_video 를 갱신하지 않고
+          snapshot 만 추가 (archive replay 가 더 최근에 수집한 제목 / 통계를 예전 값으로 되돌리지 않도록)
+        - 실제로 insert/update 한 row 수를 반환합니다.
+        """
+        captured = _captured_at(videos_data)
+        videos, snapshots = _split_snapshots(videos_data)
+        rows = _dedupe(videos, "video_id")
+        if not rows:
+            return 0
+
+        written = 0
         async with self._session_factory() as session:
-            # merge 사용: PK(video_id) 가 있으면 UPDATE, 없으면 INSERT
-            obj = YoutubeVideo(**video_data)
-            merged = await session.merge(obj)
-            session.add(merged)
+            if skip_stale:
+                rows = await self._drop_stale_videos(session, rows, captured)
+            for chunk in _chunks(rows, self.chunk_rows) if rows else ():
+                stmt = _upsert_videos(insert(YoutubeVideo.__table__).values(chunk), list(chunk[0]))
+                written += len((await session.execute(stmt)).all())
+            await self._append_snapshots(session, snapshots)
             await session.commit()
+        return written
+
+    async def _drop_stale_videos(
+        self, session: AsyncSession, rows: List[Dict], captured: Dict[str, datetime]
+    ) -> List[Dict]:
+        """youtube_video_stats 에 captured[video_id] 보다 최근 snapshot 이 있는 영상 row 제외"""
+        stats = YoutubeVideoStats.__table__
+        ids = [row["video_id"] for row in rows if row["video_id"] in captured]
+        latest: Dict[str, datetime] = {}
+        for i in range(0, len(ids), self.chunk_rows):
+            result = await session.execute(
+                select(stats.c.video_id, func.max(stats.c.captured_at))
+                .where(stats.c.video_id.in_(ids[i:i + self.chunk_rows]))
+                .group_by(stats.c.video_id)
+            )
+            latest.update(result.all())
+        return [
+            row for row in rows
+            if row["video_id"] not in latest or captured[row["video_id"]] >= latest[row["video_id"]]
+        ]
+
+    async def _append_snapshots(self, session: AsyncSession, snapshots: List[Dict]) -> None:
+        """youtube_video_stats append (같은 영상 / 시각의 snapshot 이 이미 있으면 건너뜀)"""
+        for chunk in _chunks(snapshots, self.chunk_rows) if snapshots else ():
+            await session.execute(
+                insert(YoutubeVideoStats.__table__).values(chunk).on_conflict_do_nothing()
+            )
 
-    async def insert_youtube_comments_bulk(self, comments_data: List[Dict]) -> None:
+    async def upsert_channel_sync_state(self, sync_data: Dict) -> None:
+        """
+        채널의 증분 수집 watermark 저장
+        - sync_data: channel_id, handle, last_video_id, last_published_at, last_synced_at, retry_video_ids,
+          resume_page_token, pending_video_id, pending_published_at
+        - sync_data 에 없는 컬럼(next_poll_at 등)은 기존 값을 유지
+        - INSERT ... ON CONFLICT 한 문장 (스케줄러와 일괄 수집이 같은 새 채널을 동시에 저장해도 충돌 없음)
+        """
+        async with self._session_factory() as session:
+            await session.execute(_upsert_by_pk(YoutubeChannelSync.__table__, "channel_id", sync_data))
+            await session.commit()
+
+    async def update_poll_schedule(
+        self, channel_id: str, handle: Optional[str], next_poll_at: datetime, poll_interval: int
+    ) -> None:
+        """
+        채널의 다음 자동 수집 시각 저장 (youtube_channel_sync)
+        """
+        await self.upsert_channel_sync_state({
+            "channel_id": channel_id,
+            "handle": handle,
+            "next_poll_at": next_poll_at,
+            "poll_interval": poll_interval,
+        })
+
+    async def upsert_channel(self, channel_data: Dict) -> None:
+        """
+        채널 캐시 저장 (PK: channel_id)
+        - 같은 핸들을 가진 이전 채널 row 가 있으면 핸들을 비움 (핸들이 다른 채널로 옮겨간 경우)
+        - channel_data 에 없는 컬럼(watch_yn 등)은 기존 값을 유지
+        - INSERT ... ON CONFLICT 한 문장 (스케줄러와 일괄 수집이 같은 새 채널을 동시에 저장해도 충돌 없음)
+        """
+        async with self._session_factory() as session:
+            if channel_data.get("handle"):
+                await session.execute(
+                    update(YoutubeChannel)
+                    .where(
+                        YoutubeChannel.handle == channel_data["handle"],
+                        YoutubeChannel.channel_id != channel_data["channel_id"],
+                    )
+                    .values(handle=None)
+                )
+            await session.execute(_upsert_by_pk(YoutubeChannel.__table__, "channel_id", channel_data))
+            await session.commit()
+
+    async def update_channel_watch(self, channel_ids: List[str], watch_yn: str) -> None:
+        """
+        채널들의 watch list 포함 여부(watch_yn) 변경
         """
-        한 비디오에 대한 다수의 댓글을 한 번에 insert 혹은 upsert 합니다.
+        async with self._session_factory() as session:
+            await session.execute(
+                update(YoutubeChannel)
+                .where(col(YoutubeChannel.channel_id).in_(channel_ids))
+                .values(watch_yn=watch_yn)
+            )
+            await session.commit()
+
+    async def insert_youtube_comments_bulk(self, comments_data: List[Dict]) -> int:
+        """
+        다수의 댓글을 INSERT ... ON CONFLICT (comment_id) DO UPDATE 로 한 번에 upsert 합니다.
         - comments_data: List[Dict] 형태로 YoutubeComment 필드들을 제공받습니다.
+        - etag 가 저장된 값과 같으면 변경이 없는 댓글이므로 건너뜁니다.
+        - 텍스트가 바뀐 댓글만 extract_yn 을 'N' 으로 되돌려 다시 분석되도록 합니다.
+        - 보관 기간(comment_retention_months)이 지난 댓글은 저장하지 않습니다.
+        - 실제로 insert/update 한 row 수를 반환합니다.
         """
+        # 같은 batch 안의 중복 comment_id 는 마지막 값 사용 (ON CONFLICT 는 한 row 를 두 번 갱신할 수 없음)
+        rows = _dedupe(self._drop_retired_comments(comments_data), "comment_id")
+        if not rows:
+            return 0
+
+        written = 0
         async with self._session_factory() as session:
-            # objects 리스트에 모델 인스턴스 생성
-            objects = [YoutubeComment(**data) for data in comments_data]
-            # merge_all 은 없으므로 일괄 merge loop
-            for obj in objects:
-                await session.merge(obj)
+            for chunk in _chunks(rows, self.chunk_rows):
+                stmt = _upsert_comments(insert(YoutubeComment.__table__).values(chunk), list(chunk[0]))
+                written += len((await session.execute(stmt)).all())
+            await session.commit()
+        return written
+
+    async def bulk_load_videos(self, videos_data: List[Dict], skip_stale: bool = False) -> int:
+        """
+        대량 적재용 insert_youtube_videos_bulk: COPY 로 staging 테이블에 넣은 뒤 upsert 1회 (+ 통계 snapshot)
+        (skip_stale 규칙은 insert_youtube_videos_bulk 와 같음)
+        """
+        captured = _captured_at(videos_data)
+        videos, snapshots = _split_snapshots(videos_data)
+        keep = (lambda session, rows: self._drop_stale_videos(session, rows, captured)) if skip_stale else None
+        return await self._copy_upsert(
+            YoutubeVideo.__table__, videos, "video_id", _upsert_videos, snapshots=snapshots, keep=keep
+        )
+
+    async def bulk_load_comments(self, comments_data: List[Dict]) -> int:
+        """
+        대량 적재용 insert_youtube_comments_bulk: COPY 로 staging 테이블에 넣은 뒤 upsert 1회
+        (etag / extract_yn / 보관 기간 규칙은 insert_youtube_comments_bulk 와 같음)
+        """
+        return await self._copy_upsert(
+            YoutubeComment.__table__, self._drop_retired_comments(comments_data), "comment_id", _upsert_comments
+        )
+
+    async def _copy_upsert(
+        self,
+        table: Table,
+        data: List[Dict],
+        pk: str,
+        upsert: Callable[[Insert, List[str]], Insert],
+        snapshots: Optional[List[Dict]] = None,
+        keep: Optional[Callable[[AsyncSession, List[Dict]], Awaitable[List[Dict]]]] = None,
+    ) -> int:
+        rows = _dedupe(data, pk)
+        if not rows:
+            return 0
+        columns = list(rows[0])
+        stage_name = f"stage_{table.name}"
+        stage = sa_table(stage_name, *(column(c) for c in columns))
+
+        async with self._session_factory() as session:
+            # 1) 세션 전용 staging 테이블 (TEMP: WAL 을 쓰지 않고, 제약 조건 없음, commit 때 비워짐)
+            #    첫 execute 가 트랜잭션을 시작하므로 아래 COPY 도 같은 트랜잭션에서 실행됨
+            await session.execute(text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {stage_name} ON COMMIT DELETE ROWS "
+                f"AS SELECT * FROM {table.fullname} WITH NO DATA"
+            ))
+
+            # 2) keep 이 있으면 같은 트랜잭션에서 저장할 row 를 거름
+            if keep is not None:
+                rows = await keep(session, rows)
+
+            written = 0
+            if rows:
+                # 3) asyncpg COPY (binary) 로 staging 적재
+                connection = await session.connection()
+                raw = await connection.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    stage_name,
+                    records=[tuple(row[c] for c in columns) for row in rows],
+                    columns=columns,
+                )
+
+                # 4) staging → 본 테이블 set-based upsert 1회
+                stmt = upsert(insert(table).from_select(columns, select(*stage.c)), columns)
+                written = len((await session.execute(stmt)).all())
+            await self._append_snapshots(session, snapshots or [])
             await session.commit()
+        return written
 
-    async def update_korean_wave_status(self, videos_data: List[Dict]) -> None:
+    async def update_korean_wave_status(self, videos_data: List[Dict]) -> List[str]:
         """
         비디오의 한류 상태를 bulk 업데이트합니다.
         - videos_data: List[Dict] 형태로 각 Dict는 video_id, korean_wave_yn, reason 필드를 포함합니다.
           예: [{'video_id': 'abcde', 'korean_wave_yn': 'Y', 'reason': '한류 콘텐츠입니다'}]
         - reason 필드는 YoutubeVideo 테이블의 identify_reason 필드로 매핑됩니다.
+        - UPDATE ... FROM (VALUES ...) 한 문장으로 row 마다 다른 값을 반영하고, 실제로 갱신된 video_id 를 반환합니다.
         """
-        if not videos_data:
-            return
-            
-        async with self._session_factory() as session:
-            # 일괄 업데이트를 위한 효율적인 방법
-            # 데이터 처리
-            for video_data in videos_data:
-                if 'video_id' not in video_data:
-                    continue
-                
-                update_values = {}
-                if 'korean_wave_yn' in video_data:
-                    update_values['korean_wave_yn'] = video_data['korean_wave_yn']
-                if 'reason' in video_data:
-                    update_values['identify_reason'] = video_data['reason']
-
-                if update_values:
-                    # 각 비디오에 대해 개별적인 업데이트 실행 (BULK 처리)
-                    stmt = update(YoutubeVideo).where(
-                        YoutubeVideo.video_id == video_data['video_id']
-                    ).values(**update_values)
-                    
-                    await session.execute(stmt)
-            
-            # 한 번의 커밋으로 모든 변경사항 저장
-            await session.commit()
+        rows = []
+        for video_data in videos_data:
+            if 'video_id' not in video_data:
+                continue
+            row = {'video_id': video_data['video_id']}
+            if 'korean_wave_yn' in video_data:
+                row['korean_wave_yn'] = video_data['korean_wave_yn']
+            if 'reason' in video_data:
+                row['identify_reason'] = video_data['reason']
+            if len(row) > 1:
+                rows.append(row)
 
-    async def update_sentiment_for_comments(self, comment_data_list: List[Dict]) -> None:
-        if not comment_data_list:
-            return
+        return await self._update_from_values(YoutubeVideo.__table__, "video_id", rows)
 
-        async with self._session_factory() as session:
-            # 일괄 업데이트를 위한 효율적인 방법
-            # 데이터 처리
-            for comment_data in comment_data_list:
-                if 'comment_id' not in comment_data:
-                    continue
-
-                update_values = {}
-                if 'sentiment' in comment_data:
-                    update_values['sentiment'] = comment_data['sentiment']
-                if 'keywords' in comment_data:
-                    update_values['key_words'] = comment_data['keywords']
-                update_values['extract_yn'] = "Y"
-
-                if update_values:
-                    # 각 비디오에 대해 개별적인 업데이트 실행 (BULK 처리)
-                    stmt = update(YoutubeComment).where(
-                        YoutubeComment.comment_id == comment_data['comment_id']
-                    ).values(**update_values)
-
-                    await session.execute(stmt)
-
-            # 한 번의 커밋으로 모든 변경사항 저장
-            await session.commit()
+    async def update_sentiment_for_comments(self, comment_data_list: List[Dict]) -> List[str]:
+        """
+        댓글의 감성 분석 / 키워드 결과를 bulk 업데이트하고 extract_yn 을 'Y' 로 표시합니다.
+        - UPDATE ... FROM (VALUES ...) 한 문장으로 반영하고, 실제로 갱신된 comment_id 를 반환합니다.
+        - published_at 을 같이 넘기면 그 댓글의 partition 만 찾음 (없으면 모든 partition 의 PK index 를 확인)
+        """
+        rows = []
+        for comment_data in comment_data_list:
+            if 'comment_id' not in comment_data:
+                continue
+            row = {'comment_id': comment_data['comment_id']}
+            if comment_data.get('published_at') is not None:
+                row['published_at'] = comment_data['published_at']
+            if 'sentiment' in comment_data:
+                row['sentiment'] = comment_data['sentiment']
+            if 'keywords' in comment_data:
+                row['key_words'] = comment_data['keywords']
+            row['extract_yn'] = "Y"
+            rows.append(row)
+
+        return await self._update_from_values(YoutubeComment.__table__, "comment_id", rows, match=("published_at",))
 
+    async def _update_from_values(
+        self, table: Table, pk: str, rows: List[Dict], match: Sequence[str] = ()
+    ) -> List[str]:
+        """
+        UPDATE table SET col = v.col FROM (VALUES ...) AS v WHERE table.pk = v.pk RETURNING table.pk
+        - 컬럼 구성이 같은 row 끼리 한 문장 (LLM 결과는 보통 한 그룹), bind parameter 상한에 맞춰 chunk
+        - match 컬럼이 row 에 있으면 WHERE 조건에만 사용 (partition key 등)
+        - 한 트랜잭션으로 commit
+        """
+        groups: Dict[tuple, List[Dict]] = {}
+        for row in _dedupe_keep_columns(rows, pk):
+            groups.setdefault(tuple(row), []).append(row)
+        if not groups:
+            return []
 
+        updated: List[str] = []
+        async with self._session_factory() as session:
+            for columns, group in groups.items():
+                for chunk in _chunks(group, self.chunk_rows):
+                    data = values(
+                        *(column(c, table.c[c].type) for c in columns), name="v"
+                    ).data([tuple(row[c] for c in columns) for row in chunk])
+                    keys = [pk, *(c for c in match if c in columns)]
+                    stmt = (
+                        update(table)
+                        .where(*(table.c[c] == data.c[c] for c in keys))
+                        .values({c: data.c[c] for c in columns if c not in keys})
+                        .returning(table.c[pk])
+                    )
+                    updated += (await session.execute(stmt)).scalars().all()
+            await session.commit()
+        return updated
 
     async def update_korean_wave_status_optimized(self, videos_data: List[Dict]) -> None:
         """
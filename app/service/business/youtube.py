@@ -3,41 +3,299 @@ Author: sg.kim
 Date: 2025-04-24
 Description:
 """
+import asyncio
+import json
 import os
-from typing import Optional, List
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional, List, Dict, Iterable, AsyncIterator, Tuple, Type, TypeVar, Union
 import httpx
+from pydantic import BaseModel
 
 from fastapi import HTTPException
 
 from app.config import Settings
+from app.model.youtube.lean import (
+    PLAYLIST_ITEMS_FIELDS,
+    VIDEOS_PART,
+    VIDEOS_FIELDS,
+    COMMENT_THREADS_FIELDS,
+    COMMENTS_FIELDS,
+    LeanPlaylistItemsListResponse,
+    LeanVideosListResponse,
+    LeanVideoItem,
+    LeanCommentThreadsListResponse,
+    LeanCommentThreadItem,
+    LeanCommentsListResponse,
+    LeanComment,
+)
 from app.model.youtube.response import (
     ChannelsListResponse,
     PlaylistItemsListResponse,
     VideosListResponse,
     CommentThreadsListResponse,
+    CommentsListResponse,
     ChannelItem,
+    VideoItem,
+    CommentThreadItem,
+    CommentReply,
+)
+from app.utils.archive import ResponseArchive
+from app.utils.cache import EtagCache
+from app.utils.fair import FairScheduler, scheduling_key
+from app.utils.key_pool import ApiKeyPool
+from app.utils.rate_limit import QuotaRateLimiter, QuotaExhaustedError
+from app.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    RetryableError,
+    parse_retry_after,
 )
+from app.utils.text import TextUtils
 
 settings: Settings = Settings()
 
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+# videos.list 의 id 파라미터에 넣을 수 있는 최대 개수
+VIDEOS_LIST_MAX_IDS = 50
+
+# 키를 교체해야 하는 403 오류 사유
+QUOTA_ERROR_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+# 댓글을 막아 둔 영상의 commentThreads.list 403 사유
+COMMENTS_DISABLED_REASON = "commentsDisabled"
+
+# 잠시 후 다시 시도하면 되는 오류 (status / 403 사유)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError", "internalError"}
+
+# endpoint 별 쿼터 unit cost (YouTube Data API v3 기준, list 호출은 모두 1 unit)
+ENDPOINT_COSTS = {
+    "/channels": 1,
+    "/playlistItems": 1,
+    "/videos": 1,
+    "/commentThreads": 1,
+    "/comments": 1,
+}
+
+def create_rate_limiter() -> QuotaRateLimiter:
+    """
+    Build the quota-aware limiter shared by every YouTubeBusinessService.
+    """
+    return QuotaRateLimiter(
+        rate=settings.rate_limit_per_second,
+        burst=settings.rate_limit_burst,
+        daily_budget=settings.daily_quota * max(len(settings.get_api_keys()), 1),
+        costs=ENDPOINT_COSTS,
+    )
+
+def create_key_pool() -> ApiKeyPool:
+    """
+    Build the API key pool shared by every YouTubeBusinessService.
+    """
+    return ApiKeyPool(settings.get_api_keys(), settings.daily_quota)
+
+def create_scheduler() -> FairScheduler:
+    """
+    Build the round-robin scheduler that bounds concurrent API calls across channels.
+    """
+    return FairScheduler(settings.api_concurrency)
+
+def create_resilient_caller() -> ResilientCaller:
+    """
+    Build the retry / timeout / hedging / circuit-breaker layer shared by every YouTubeBusinessService.
+    """
+    return ResilientCaller(
+        max_attempts=settings.retry_max_attempts,
+        base_delay=settings.retry_base_delay,
+        max_delay=settings.retry_max_delay,
+        default_timeout=settings.http_timeout,
+        timeouts=settings.endpoint_timeouts,
+        hedge=settings.hedge_requests,
+        hedge_quantile=settings.hedge_quantile,
+        hedge_min_samples=settings.hedge_min_samples,
+        breaker=CircuitBreaker(settings.circuit_failure_threshold, settings.circuit_reset_timeout),
+    )
+
+def create_archive() -> Optional[ResponseArchive]:
+    """
+    Build the raw-response archive shared by every YouTubeBusinessService (None unless archive_path is set).
+    """
+    if not settings.archive_path:
+        return None
+    return ResponseArchive(settings.archive_path, settings.archive_segment_bytes)
+
+def create_http_client(base_url: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Build the keep-alive (HTTP/2 capable) client shared by every YouTubeBusinessService.
+    Pool limits and timeouts come from Settings. The read timeout is the longest endpoint
+    timeout so it never cuts a slow endpoint short; ResilientCaller.timed enforces each
+    endpoint's own deadline.
+    """
+    read_timeout = max([settings.http_timeout, *settings.endpoint_timeouts.values()])
+    return httpx.AsyncClient(
+        base_url=base_url or settings.youtube_api_base_url,
+        http2=settings.http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(read_timeout, connect=settings.http_connect_timeout),
+    )
+
 class YouTubeBusinessService:
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[EtagCache] = None,
+        rate_limiter: Optional[QuotaRateLimiter] = None,
+        key_pool: Optional[ApiKeyPool] = None,
+        scheduler: Optional[FairScheduler] = None,
+        resilience: Optional[ResilientCaller] = None,
+        archive: Optional[ResponseArchive] = None,
+    ):
         # 1. Try to use provided settings
         if settings:
-            self.api_key = settings.youtube_api_key
+            api_keys = settings.get_api_keys()
             self.base_url = settings.youtube_api_base_url
         # 2. Fall back to direct environment variables
         else:
-            self.api_key = os.environ.get("YOUTUBE_API_KEY")
+            api_keys = [k for k in os.environ.get("YOUTUBE_API_KEY", "").split(",") if k]
             self.base_url = os.environ.get("YOUTUBE_API_BASE_URL")
-            
+
         # Validate required settings
-        if not self.api_key:
+        if not (key_pool or api_keys):
             raise ValueError("YOUTUBE_API_KEY environment variable is not set")
         if not self.base_url:
             raise ValueError("YOUTUBE_API_BASE_URL environment variable is not set")
             
-        self.client = httpx.AsyncClient(base_url=self.base_url)
+        # 외부에서 받은 공유 클라이언트는 닫지 않음 (lifespan 에서 관리)
+        self._owns_client = client is None
+        self.client = client or create_http_client(self.base_url)
+        # ETag 조건부 요청 캐시 (None 이면 사용 안 함)
+        self.cache = cache
+        # 쿼터/초당 호출 제한 (None 이면 사용 안 함)
+        self.rate_limiter = rate_limiter
+        # 요청마다 키 풀에서 키를 골라 사용
+        self.key_pool = key_pool or ApiKeyPool(api_keys, settings.daily_quota)
+        # 채널별 round-robin 동시 호출 제한 (None 이면 사용 안 함)
+        self.scheduler = scheduler
+        # 재시도 / timeout / hedging / circuit breaker
+        self.resilience = resilience or create_resilient_caller()
+        # 200 응답 원본을 gzip NDJSON 으로 보관 (None 이면 사용 안 함, replay 용)
+        self.archive = archive
+
+    async def _get(self, path: str, params: Dict, model: Type[ResponseT]) -> ResponseT:
+        """
+        GET the endpoint with a key from the pool and validate the raw body straight into `model`
+        (bytes → model in one pass, no intermediate dict).
+        - A key answering with a quota error is taken out of rotation and the call is retried with the next key.
+        - With a cache, the stored ETag is sent as If-None-Match and a 304 is served from the cache.
+        - With a scheduler, the call waits for a slot granted round-robin across channels (scheduling_key).
+        - Transient failures (5xx, 429, rate-limit 403, timeouts, connection errors) are retried with
+          jittered backoff; a degraded API trips the circuit breaker and fails fast with 503.
+        - With an archive, every fresh 200 body is appended as-is (304s were archived when first fetched).
+        - Any other 4xx raises HTTPException with that status and the API error reason as detail.
+        """
+        slot = self.scheduler.slot(scheduling_key.get()) if self.scheduler else nullcontext()
+        async with slot:
+            for _ in range(len(self.key_pool)):
+                try:
+                    resp, body, api_key = await self.resilience.call(path, lambda: self._attempt(path, params))
+                except CircuitOpenError as e:
+                    raise HTTPException(status_code=503, detail=str(e))
+                except RetryableError as e:
+                    raise HTTPException(status_code=e.status_code or 503, detail=str(e))
+                except (httpx.TransportError, TimeoutError) as e:
+                    raise HTTPException(status_code=504, detail=f"{path}: {e!r}")
+
+                if resp.status_code == 403 and self._error_reason(body) in QUOTA_ERROR_REASONS:
+                    self.key_pool.report_error(api_key, quota_exceeded=True)
+                    continue
+                if resp.status_code >= 400:
+                    # 재시도 대상이 아닌 오류 (400 / 404 / commentsDisabled 등): 오류 응답을 빈 결과로 파싱하지 않음
+                    self.key_pool.report_error(api_key)
+                    raise HTTPException(status_code=resp.status_code, detail=self._error_reason(body) or path)
+                if self.archive and resp.status_code == 200:
+                    await self.archive.append(path, params, body)
+                return model.model_validate_json(body)
+
+        raise HTTPException(status_code=429, detail="all API keys have exhausted their daily quota")
+
+    async def _attempt(self, path: str, params: Dict) -> Tuple[httpx.Response, bytes, str]:
+        """
+        One request: quota units and a key are taken per attempt, so retries and hedges are accounted for.
+        Raises RetryableError for transient error responses.
+        """
+        try:
+            cost = await self.rate_limiter.acquire(path) if self.rate_limiter else 1
+            api_key = self.key_pool.acquire(cost)
+        except QuotaExhaustedError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+
+        resp, body = await self._send(path, {**params, "key": api_key})
+
+        if resp.status_code in RETRYABLE_STATUS or (
+            resp.status_code == 403 and self._error_reason(body) in RETRYABLE_REASONS
+        ):
+            self.key_pool.report_error(api_key)
+            raise RetryableError(
+                f"{path}: HTTP {resp.status_code} {self._error_reason(body) or ''}".rstrip(),
+                status_code=resp.status_code,
+                retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+            )
+        return resp, body, api_key
+
+    async def _http_get(self, path: str, params: Dict, headers: Optional[Dict] = None) -> httpx.Response:
+        """
+        Only the network round trip is timed, so ETag-cache I/O never counts against the
+        endpoint timeout or skews the latency used for hedging.
+        """
+        async with self.resilience.timed(path):
+            if headers:
+                return await self.client.get(path, params=params, headers=headers)
+            return await self.client.get(path, params=params)
+
+    async def _send(self, path: str, params: Dict) -> Tuple[httpx.Response, bytes]:
+        if self.cache is None:
+            resp = await self._http_get(path, params)
+            return resp, resp.content
+
+        cache_key = EtagCache.make_key(path, params)
+        cached = await self.cache.get(cache_key)
+        if cached:
+            etag, body = cached
+            resp = await self._http_get(path, params, {"If-None-Match": etag})
+            if resp.status_code == 304:
+                return resp, body
+        else:
+            resp = await self._http_get(path, params)
+
+        etag = resp.headers.get("ETag")
+        if resp.status_code == 200 and etag:
+            await self.cache.put(cache_key, etag, resp.content)
+        return resp, resp.content
+
+    def _partial(self, params: Dict, fields: str, part: Optional[str] = None) -> None:
+        """
+        Narrow a lean request to the stored fields (fields= and, optionally, a smaller part).
+        With an archive the full response is requested instead, so a later replay can map fields
+        the pipeline does not store today; the slim models ignore the extra fields.
+        """
+        if self.archive is not None:
+            return
+        params["fields"] = fields
+        if part:
+            params["part"] = part
+
+    @staticmethod
+    def _error_reason(body: bytes) -> Optional[str]:
+        try:
+            return json.loads(body)["error"]["errors"][0]["reason"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
 
     async def get_channel_by_handle(self, handle: str) -> ChannelItem:
         """
@@ -47,11 +305,21 @@ class YouTubeBusinessService:
         params = {
             "part": "id,snippet,contentDetails",
             "forHandle": handle,
-            "key": self.api_key,
         }
-        resp = await self.client.get("/channels", params=params)
-        data = resp.json()
-        parsed = ChannelsListResponse.model_validate(data)
+        parsed = await self._get("/channels", params, ChannelsListResponse)
+        if not parsed.items:
+            raise HTTPException(status_code=404, detail="Channel not found")
+        return parsed.items[0]
+
+    async def get_channel_by_id(self, channel_id: str) -> ChannelItem:
+        """
+        Retrieve a channel by its ID. snippet.customUrl carries the channel handle.
+        """
+        params = {
+            "part": "id,snippet,contentDetails",
+            "id": channel_id,
+        }
+        parsed = await self._get("/channels", params, ChannelsListResponse)
         if not parsed.items:
             raise HTTPException(status_code=404, detail="Channel not found")
         return parsed.items[0]
@@ -63,11 +331,8 @@ class YouTubeBusinessService:
         params = {
             "part": "contentDetails",
             "id": channel_id,
-            "key": self.api_key,
         }
-        resp = await self.client.get("/channels", params=params)
-        data = resp.json()
-        parsed = ChannelsListResponse.model_validate(data)
+        parsed = await self._get("/channels", params, ChannelsListResponse)
         if not parsed.items:
             raise HTTPException(status_code=404, detail="Channel not found")
         return parsed.items[0].contentDetails.relatedPlaylists.uploads
@@ -77,22 +342,25 @@ class YouTubeBusinessService:
         playlist_id: str,
         page_token: Optional[str] = None,
         max_results: int = 50,
-    ) -> PlaylistItemsListResponse:
+        lean: bool = False,
+    ) -> Union[PlaylistItemsListResponse, LeanPlaylistItemsListResponse]:
         """
         Fetch a page of playlist items from the given playlist ID.
+        - lean: request only the video IDs (fields=) and decode into the slim ingestion model
+          (without fields= when archiving, see _partial).
         """
         params = {
             "part": "snippet,contentDetails",
             "playlistId": playlist_id,
             "maxResults": max_results,
-            "key": self.api_key,
         }
         if page_token:
             params["pageToken"] = page_token
+        if lean:
+            self._partial(params, PLAYLIST_ITEMS_FIELDS, part="contentDetails")
+            return await self._get("/playlistItems", params, LeanPlaylistItemsListResponse)
 
-        resp = await self.client.get("/playlistItems", params=params)
-        data = resp.json()
-        return PlaylistItemsListResponse.model_validate(data)
+        return await self._get("/playlistItems", params, PlaylistItemsListResponse)
 
     async def get_video_details(self, video_id: str) -> VideosListResponse:
         """
@@ -101,20 +369,47 @@ class YouTubeBusinessService:
         params = {
             "part": "snippet,contentDetails,statistics,status",
             "id": video_id,
-            "key": self.api_key,
         }
-        resp = await self.client.get("/videos", params=params)
-        data = resp.json()
-        return VideosListResponse.model_validate(data)
+        return await self._get("/videos", params, VideosListResponse)
+
+    async def get_videos_details(
+        self,
+        video_ids: Iterable[str],
+        lean: bool = False,
+    ) -> Dict[str, Union[VideoItem, LeanVideoItem]]:
+        """
+        Retrieve metadata for many videos, 50 IDs per /videos request.
+        Returns a dict keyed by video ID; IDs the API did not return are omitted.
+        - lean: request only the stored fields (fields=) and decode into the slim ingestion model
+          (without fields= when archiving, see _partial).
+        """
+        ids = list(dict.fromkeys(video_ids))
+        chunks = [ids[i:i + VIDEOS_LIST_MAX_IDS] for i in range(0, len(ids), VIDEOS_LIST_MAX_IDS)]
+
+        async def fetch(chunk: List[str]) -> Union[VideosListResponse, LeanVideosListResponse]:
+            params = {
+                "part": "snippet,contentDetails,statistics,status",
+                "id": ",".join(chunk),
+            }
+            if lean:
+                self._partial(params, VIDEOS_FIELDS, part=VIDEOS_PART)
+                return await self._get("/videos", params, LeanVideosListResponse)
+            return await self._get("/videos", params, VideosListResponse)
+
+        responses = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+        return {item.id: item for resp in responses for item in resp.items}
 
     async def get_comment_threads(
         self,
         video_id: str,
         page_token: Optional[str] = None,
         max_results: int = 100,
-    ) -> CommentThreadsListResponse:
+        lean: bool = False,
+    ) -> Union[CommentThreadsListResponse, LeanCommentThreadsListResponse]:
         """
         Fetch a page of top-level comment threads for a video.
+        - lean: request only the stored fields (fields=) and decode into the slim ingestion model
+          (without fields= when archiving, see _partial).
         """
         params = {
             "part": "snippet,replies",
@@ -122,14 +417,126 @@ class YouTubeBusinessService:
             "maxResults": max_results,
             "textFormat": "plainText",
             "order": "time",
-            "key": self.api_key,
         }
         if page_token:
             params["pageToken"] = page_token
 
-        resp = await self.client.get("/commentThreads", params=params)
-        data = resp.json()
-        return CommentThreadsListResponse.model_validate(data)
+        if lean:
+            self._partial(params, COMMENT_THREADS_FIELDS)
+            return await self._get("/commentThreads", params, LeanCommentThreadsListResponse)
+
+        return await self._get("/commentThreads", params, CommentThreadsListResponse)
+
+    async def iter_comment_threads(
+        self,
+        video_id: str,
+        max_pages: Optional[int] = None,
+        max_threads: Optional[int] = None,
+        since: Optional[datetime] = None,
+        lean: bool = False,
+    ) -> AsyncIterator[List[Union[CommentThreadItem, LeanCommentThreadItem]]]:
+        """
+        Follow nextPageToken through every commentThreads page of a video (newest first)
+        and yield each page of threads as soon as it arrives.
+        - max_pages / max_threads: stop after this many pages / threads.
+        - since: stop at the first thread published at or before this UTC (naive) timestamp.
+        - lean: see get_comment_threads.
+        - A video with comments disabled yields nothing.
+        """
+        page_token: Optional[str] = None
+        pages = threads = 0
+        while True:
+            try:
+                resp = await self.get_comment_threads(video_id, page_token=page_token, max_results=100, lean=lean)
+            except HTTPException as e:
+                # 댓글을 막아 둔 영상은 댓글 0개
+                if e.status_code == 403 and e.detail == COMMENTS_DISABLED_REASON:
+                    return
+                raise
+            pages += 1
+            items = resp.items or []
+            done = False
+
+            if since is not None:
+                fresh = [
+                    t for t in items
+                    if TextUtils.parse_ts(t.snippet.topLevelComment.snippet.publishedAt) > since
+                ]
+                done = len(fresh) < len(items)
+                items = fresh
+            if max_threads is not None and threads + len(items) >= max_threads:
+                items = items[:max_threads - threads]
+                done = True
+
+            threads += len(items)
+            if items:
+                yield items
+
+            page_token = resp.nextPageToken
+            if done or not page_token or (max_pages is not None and pages >= max_pages):
+                break
+
+    async def get_comment_replies(
+        self,
+        parent_id: str,
+        page_token: Optional[str] = None,
+        max_results: int = 100,
+        lean: bool = False,
+    ) -> Union[CommentsListResponse, LeanCommentsListResponse]:
+        """
+        Fetch a page of replies to a top-level comment (comments.list?parentId=...).
+        - lean: request only the stored fields (fields=) and decode into the slim ingestion model
+          (without fields= when archiving, see _partial).
+        """
+        params = {
+            "part": "snippet",
+            "parentId": parent_id,
+            "maxResults": max_results,
+            "textFormat": "plainText",
+        }
+        if page_token:
+            params["pageToken"] = page_token
+
+        if lean:
+            self._partial(params, COMMENTS_FIELDS)
+            return await self._get("/comments", params, LeanCommentsListResponse)
+
+        return await self._get("/comments", params, CommentsListResponse)
+
+    async def iter_comment_replies(
+        self,
+        parent_id: str,
+        lean: bool = False,
+    ) -> AsyncIterator[List[Union[CommentReply, LeanComment]]]:
+        """
+        Follow nextPageToken through every reply page of a comment thread.
+        """
+        page_token: Optional[str] = None
+        while True:
+            resp = await self.get_comment_replies(parent_id, page_token=page_token, lean=lean)
+            if resp.items:
+                yield resp.items
+            page_token = resp.nextPageToken
+            if not page_token:
+                break
+
+    def quota_status(self) -> Dict:
+        """
+        Remaining daily budget and per-endpoint usage of the shared rate limiter,
+        plus per-key consumption of the key pool and the per-channel scheduler queues.
+        """
+        status = self.rate_limiter.snapshot() if self.rate_limiter else {}
+        status["keys"] = self.key_pool.snapshot()
+        if self.scheduler:
+            status["scheduler"] = self.scheduler.snapshot()
+        return status
+
+    def resilience_status(self) -> Dict:
+        """
+        Circuit breaker state, retry / timeout / hedge counters and current hedge delays.
+        """
+        return self.resilience.snapshot()
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
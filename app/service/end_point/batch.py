@@ -0,0 +1,126 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 여러 채널 일괄 수집 작업 (채널별 진행 상황 / 처리량)
+    채널은 bounded 작업자 풀이 순서대로 가져가서 수집하고,
+    API 호출 슬롯은 FairScheduler 가 채널 사이에서 round-robin 으로 나눠 줍니다.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+from pydantic import BaseModel, Field, computed_field
+
+from app.service.end_point.pipeline import IngestionStats
+
+logger = logging.getLogger(__name__)
+
+IngestChannel = Callable[[str, IngestionStats], Awaitable[object]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _per_second(count: int, seconds: Optional[float]) -> Optional[float]:
+    return round(count / seconds, 2) if seconds else None
+
+
+class ChannelProgress(BaseModel):
+    handle: str
+    # queued → running → done | failed
+    status: str = "queued"
+    error: Optional[str] = None
+    stats: IngestionStats = Field(default_factory=IngestionStats)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def elapsed_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return round(((self.finished_at or _now()) - self.started_at).total_seconds(), 3)
+
+    @computed_field
+    @property
+    def videos_per_second(self) -> Optional[float]:
+        return _per_second(self.stats.videos, self.elapsed_seconds)
+
+    @computed_field
+    @property
+    def comments_per_second(self) -> Optional[float]:
+        return _per_second(self.stats.comments, self.elapsed_seconds)
+
+
+class BatchJob(BaseModel):
+    job_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    page_limit: int
+    full_resync: bool = False
+    # queued → running → done
+    status: str = "queued"
+    created_at: datetime = Field(default_factory=_now)
+    finished_at: Optional[datetime] = None
+    channels: List[ChannelProgress] = Field(default_factory=list)
+
+    @computed_field
+    @property
+    def progress(self) -> dict:
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for channel in self.channels:
+            counts[channel.status] += 1
+        return {"total": len(self.channels), **counts}
+
+    @computed_field
+    @property
+    def videos(self) -> int:
+        return sum(c.stats.videos for c in self.channels)
+
+    @computed_field
+    @property
+    def comments(self) -> int:
+        return sum(c.stats.comments for c in self.channels)
+
+    @computed_field
+    @property
+    def elapsed_seconds(self) -> float:
+        return round(((self.finished_at or _now()) - self.created_at).total_seconds(), 3)
+
+    @computed_field
+    @property
+    def comments_per_second(self) -> Optional[float]:
+        return _per_second(self.comments, self.elapsed_seconds)
+
+
+async def run_batch(job: BatchJob, ingest: IngestChannel, workers: int) -> BatchJob:
+    """
+    job.channels 를 workers 개의 작업자가 순서대로 수집합니다.
+    한 채널의 오류는 해당 채널의 status / error 에만 기록됩니다.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for channel in job.channels:
+        queue.put_nowait(channel)
+
+    async def worker() -> None:
+        while not queue.empty():
+            channel: ChannelProgress = queue.get_nowait()
+            channel.status = "running"
+            channel.started_at = _now()
+            try:
+                await ingest(channel.handle, channel.stats)
+                channel.status = "done"
+            except Exception as e:
+                logger.warning("batch %s: channel %s failed: %r", job.job_id, channel.handle, e)
+                channel.status = "failed"
+                channel.error = str(getattr(e, "detail", e))
+            finally:
+                channel.finished_at = _now()
+
+    job.status = "running"
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(min(workers, len(job.channels)), 1))))
+    finally:
+        job.status = "done"
+        job.finished_at = _now()
+    return job
@@ -0,0 +1,379 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 채널 수집 파이프라인
+    playlist paging → metadata fetch → video write → comment fetch → reply expansion → comment write
+    각 단계는 bounded asyncio.Queue 로 연결되고, 단계별 작업자 수를 설정할 수 있습니다.
+    API 응답은 fields= 로 저장할 필드만 받아 slim 모델(app/model/youtube/lean.py)로 디코딩합니다.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, Field
+
+from app.config import IngestionSettings
+from app.model.youtube.lean import LeanCommentThreadItem, LeanPlaylistItem, LeanVideoItem
+from app.model.youtube.response import CommentThreadItem, PlaylistItem, VideoItem
+from app.schema.public import YoutubeChannelSync
+from app.service.business.search import SearchBusinessService
+from app.service.business.transaction import TransactionBusinessService
+from app.service.business.youtube import YouTubeBusinessService
+from app.utils.text import TextUtils
+
+logger = logging.getLogger(__name__)
+
+# 단계 종료 신호 (작업자 1명당 1개씩 전달)
+_DONE = object()
+
+Emit = Callable[[Any], Awaitable[None]]
+
+# 영상 row 저장까지의 단계 (여기서 실패하면 watermark 를 올리지 않음)
+VIDEO_STAGES = ("playlist", "metadata", "video_write")
+# 댓글 단계 (여기서 실패한 영상은 sync state 에 남겨 다음 실행에서 다시 수집)
+COMMENT_STAGES = ("comments", "replies", "comment_write")
+
+
+class ReplyJob(BaseModel):
+    """commentThreads 응답에 포함되지 않은 답글을 comments.list 로 채워야 하는 스레드"""
+    video_id: str
+    parent_id: str
+
+class CoalescedWriteError(Exception):
+    """여러 batch 를 모아 한 번에 저장하다 실패: 모은 row 전체의 비디오ID 를 failures 에 기록하도록 전달"""
+
+    def __init__(self, error: Exception, video_ids: List[str]):
+        super().__init__(str(error))
+        self.video_ids = video_ids
+
+class IngestionFailure(BaseModel):
+    stage: str
+    item: str
+    error: str
+    # 실패한 항목에 포함된 비디오ID (playlist 단계는 비어 있음)
+    video_ids: List[str] = Field(default_factory=list)
+
+class IngestionStats(BaseModel):
+    videos: int = 0
+    comments: int = 0
+    failures: List[IngestionFailure] = Field(default_factory=list)
+    # 이번 실행에서 저장한 가장 최신 영상 (다음 증분 수집의 watermark)
+    newest_video_id: Optional[str] = None
+    newest_published_at: Optional[datetime] = None
+    # watermark 에 도달해서 playlist paging 을 멈췄는지 여부 (full_resync 는 지나가기만 하고 계속 paging)
+    reached_watermark: bool = False
+    # playlist 마지막 페이지까지 내려갔는지 여부 (page_limit 에서 멈추면 False)
+    reached_end: bool = False
+    # watermark / 마지막 페이지 전에 page_limit 에서 멈춘 경우 다음 페이지 토큰 (다음 수집에서 이어서 paging)
+    next_page_token: Optional[str] = None
+    # watermark 와 관계없이 다시 수집한 (이미 저장된) 영상
+    refresh_video_ids: List[str] = Field(default_factory=list)
+
+    def failed_video_ids(self, stages: Sequence[str] = COMMENT_STAGES) -> List[str]:
+        """stages 에서 실패한 항목의 비디오ID (중복 제거, 실패 순서)"""
+        return list(dict.fromkeys(v for f in self.failures if f.stage in stages for v in f.video_ids))
+
+
+def _count(value: Optional[str]) -> Optional[int]:
+    """statistics 의 숫자 문자열 → int (비공개 / 숫자가 아니면 None)"""
+    return int(value) if value is not None and value.isdigit() else None
+
+def map_video(item: Union[VideoItem, LeanVideoItem]) -> Dict:
+    """videos.list item → youtube_video row"""
+    return {
+        "video_id": item.id,
+        "published_at": TextUtils.parse_ts(item.snippet.publishedAt),
+        "channel_id": item.snippet.channelId,
+        "title": TextUtils.sanitize_text(item.snippet.title),
+        "description": TextUtils.sanitize_text(item.snippet.description),
+        "channel_title": item.snippet.channelTitle,
+        "live_broadcast_content": item.snippet.liveBroadcastContent,
+        "default_language": item.snippet.defaultLanguage,
+        "view_count": _count(item.statistics.viewCount) if item.statistics else None,
+        "like_count": _count(item.statistics.likeCount) if item.statistics else None,
+        "comment_count": _count(item.statistics.commentCount) if item.statistics else None,
+    }
+
+def map_comment(comment, video_id: str, parent_comment_id: Optional[str]) -> Dict:
+    """topLevelComment / reply → youtube_comment row"""
+    s = comment.snippet
+    return {
+        "comment_id": comment.id,
+        "video_id": video_id,
+        "parent_comment_id": parent_comment_id,
+        "etag": comment.etag,
+        "author_display_name": s.authorDisplayName,
+        "author_channel_id": s.authorChannelId.get("value"),
+        "text_display": TextUtils.sanitize_text(s.textDisplay),
+        "published_at": TextUtils.parse_ts(s.publishedAt),
+        "updated_at": TextUtils.parse_ts(s.updatedAt),
+        "viewer_rating": getattr(s, "viewerRating", None),
+        "like_count": getattr(s, "likeCount", None),
+    }
+
+def needs_reply_expansion(thread: Union[CommentThreadItem, LeanCommentThreadItem]) -> bool:
+    """commentThreads 는 답글을 일부만 포함하므로 totalReplyCount 와 비교합니다."""
+    embedded = len(thread.replies.comments) if thread.replies and thread.replies.comments else 0
+    return thread.snippet.totalReplyCount > embedded
+
+def map_comment_thread(thread: Union[CommentThreadItem, LeanCommentThreadItem]) -> List[Dict]:
+    """commentThreads.list item → 최상위 댓글 + 포함된 답글 rows"""
+    video_id = thread.snippet.videoId
+    top = map_comment(thread.snippet.topLevelComment, video_id, None)
+    # 스레드 ID / etag 로 저장 (기존 동작 유지)
+    top["comment_id"] = thread.id
+    top["etag"] = thread.etag
+    rows = [top]
+
+    if thread.replies and thread.replies.comments:
+        rows += [map_comment(reply, video_id, thread.id) for reply in thread.replies.comments]
+    return rows
+
+
+def _row_video_ids(rows: List[Dict]) -> List[str]:
+    return list(dict.fromkeys(row["video_id"] for row in rows))
+
+
+class IngestionPipeline:
+    """
+    한 채널의 업로드 플레이리스트를 단계별 작업자 풀로 수집합니다.
+    - 큐가 가득 차면 앞 단계가 대기하므로 메모리 사용량은 queue_size 로 제한됩니다.
+    - 항목 단위로 예외를 잡아 failures 에 기록하므로 한 영상의 오류가 전체 실행을 중단시키지 않습니다.
+    - 댓글은 FK(video_id) 때문에 영상 row 저장이 끝난 뒤에 수집합니다.
+    """
+
+    def __init__(
+        self,
+        business: YouTubeBusinessService,
+        tx: TransactionBusinessService,
+        settings: Optional[IngestionSettings] = None,
+        search: Optional[SearchBusinessService] = None,
+    ):
+        self.business = business
+        self.tx = tx
+        self.settings = settings or IngestionSettings()
+        # 댓글 증분 수집 기준 조회용 (None 이면 항상 전체 수집)
+        self.search = search
+
+    async def run(
+        self,
+        playlist_id: str,
+        page_limit: int,
+        watermark: Optional[YoutubeChannelSync] = None,
+        full_resync: bool = False,
+        stats: Optional[IngestionStats] = None,
+        refresh_video_ids: Sequence[str] = (),
+        page_token: Optional[str] = None,
+    ) -> IngestionStats:
+        """
+        watermark 가 있으면 이미 수집한 영상에 도달하는 즉시 playlist paging 을 멈춥니다.
+        (업로드 플레이리스트는 최신 영상부터 내려옴, full_resync 이면 watermark 를 지나서 page_limit 까지)
+        댓글은 delta 모드 (comment_delta_sync) 에서 저장된 가장 최신 댓글까지만 paging 합니다. full_resync 도 같음.
+        refresh_video_ids (이미 저장된 영상: 댓글 단계 실패 재시도, 최근 영상 댓글 갱신) 는 watermark 와 관계없이
+        메타 → 댓글을 다시 수집합니다. delta 모드이면 새 댓글만큼만 paging.
+        page_token 이 있으면 playlist 를 그 페이지부터 이어서 내려가고, watermark / 마지막 페이지 전에 page_limit 에서
+        멈추면 다음 페이지 토큰을 stats.next_page_token 에 남깁니다.
+        stats 를 넘기면 실행 중에 갱신되므로 호출자가 진행 상황을 볼 수 있습니다.
+        """
+        s = self.settings
+        stats = stats if stats is not None else IngestionStats()
+        metadata_workers = max(s.metadata_workers, 1)
+        comment_workers = max(s.comment_workers, 1)
+        writer_workers = max(s.writer_workers, 1)
+        reply_workers = max(s.reply_workers, 1)
+        delta = s.comment_delta_sync and self.search is not None
+        stats.refresh_video_ids = list(dict.fromkeys(refresh_video_ids))
+
+        video_ids_q: asyncio.Queue = asyncio.Queue(maxsize=s.queue_size)
+        video_write_q: asyncio.Queue = asyncio.Queue(maxsize=s.queue_size)
+        comment_q: asyncio.Queue = asyncio.Queue(maxsize=s.queue_size)
+        reply_q: asyncio.Queue = asyncio.Queue(maxsize=s.queue_size)
+        comment_write_q: asyncio.Queue = asyncio.Queue(maxsize=s.queue_size)
+
+        # 1) playlist paging → video ID 목록 (페이지당 최대 50개)
+        #    다시 수집할 (이미 저장된) 영상을 먼저 보내고, paging 에서 같은 영상이 나오면 건너뜀
+        async def page_playlist(_, emit: Emit) -> None:
+            refresh = stats.refresh_video_ids
+            for i in range(0, len(refresh), 50):
+                await emit(refresh[i:i + 50])
+            seen = set(refresh)
+
+            next_token, pages = page_token, 0
+            while pages < page_limit:
+                resp = await self.business.get_playlist_items(
+                    playlist_id=playlist_id,
+                    page_token=next_token,
+                    max_results=50,
+                    lean=True,
+                )
+                pages += 1
+                fresh = []
+                for item in resp.items:
+                    if self._is_ingested(item, watermark):
+                        stats.reached_watermark = True
+                        if not full_resync:
+                            break
+                    if item.contentDetails.videoId not in seen:
+                        fresh.append(item.contentDetails.videoId)
+                if fresh:
+                    await emit(fresh)
+                next_token = resp.nextPageToken
+                if not next_token:
+                    stats.reached_end = True
+                if (stats.reached_watermark and not full_resync) or not next_token:
+                    break
+            if not (stats.reached_watermark or stats.reached_end):
+                stats.next_page_token = next_token
+
+        # 2) video ID 목록 → 영상 메타 (videos.list 1회 호출)
+        async def fetch_metadata(video_ids: List[str], emit: Emit) -> None:
+            items = await self.business.get_videos_details(video_ids, lean=True)
+            rows = [map_video(items[video_id]) for video_id in video_ids if video_id in items]
+            if rows:
+                await emit(rows)
+
+        # 3) 영상 rows 저장 (페이지 단위 multi-row upsert 1회) → 댓글 수집 대상
+        async def write_videos(rows: List[Dict], emit: Emit) -> None:
+            await self.tx.insert_youtube_videos_bulk(rows)
+            for video_data in rows:
+                stats.videos += 1
+                if stats.newest_published_at is None or video_data["published_at"] > stats.newest_published_at:
+                    stats.newest_video_id = video_data["video_id"]
+                    stats.newest_published_at = video_data["published_at"]
+            for video_data in rows:
+                await emit(video_data["video_id"])
+
+        # 4) video ID → 댓글 + 답글 rows (페이지 단위로 흘려보냄)
+        #    다음 페이지는 앞 페이지가 쓰기 큐에 들어간 뒤에 요청하므로
+        #    영상당 메모리 사용량은 페이지 1개 + 큐 크기로 제한됩니다.
+        async def fetch_comments(video_id: str, emit: Emit) -> None:
+            since = await self.search.get_latest_comment_published_at(video_id) if delta else None
+            async for threads in self.business.iter_comment_threads(
+                video_id,
+                max_pages=s.comment_max_pages,
+                max_threads=s.comment_max_threads,
+                since=since,
+                lean=True,
+            ):
+                batch: List[Dict] = []
+                for thread in threads:
+                    batch += map_comment_thread(thread)
+                if batch:
+                    await emit(batch)
+                for thread in threads:
+                    if needs_reply_expansion(thread):
+                        await emit(ReplyJob(video_id=video_id, parent_id=thread.id))
+
+        # 5) 답글 확장: 누락된 답글만 comments.list(parentId) 로 조회, 나머지 batch 는 그대로 전달
+        async def expand_replies(item: Union[List[Dict], ReplyJob], emit: Emit) -> None:
+            if not isinstance(item, ReplyJob):
+                await emit(item)
+                return
+            async for replies in self.business.iter_comment_replies(item.parent_id, lean=True):
+                if replies:
+                    await emit([map_comment(reply, item.video_id, item.parent_id) for reply in replies])
+
+        # 6) 댓글 bulk insert/upsert
+        #    큐에 쌓여 있는 batch 를 bulk_load_threshold 까지 모아서 저장하고,
+        #    그 이상 쌓였으면(대량 백필) COPY + staging 테이블 경로로 적재
+        #    실패하면 모은 batch 들의 비디오ID 전체를 실패로 기록 (다음 실행에서 모두 다시 수집)
+        async def write_comments(batch: List[Dict], emit: Emit) -> None:
+            rows = list(batch)
+            while len(rows) < s.bulk_load_threshold:
+                try:
+                    more = comment_write_q.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if more is _DONE:
+                    # 종료 신호는 다른 작업자 몫이므로 되돌려 놓음
+                    comment_write_q.put_nowait(_DONE)
+                    break
+                rows += more
+            try:
+                if len(rows) >= s.bulk_load_threshold:
+                    stats.comments += await self.tx.bulk_load_comments(rows)
+                else:
+                    stats.comments += await self.tx.insert_youtube_comments_bulk(rows)
+            except Exception as e:
+                raise CoalescedWriteError(e, _row_video_ids(rows)) from e
+
+        source: asyncio.Queue = asyncio.Queue()
+        await source.put(playlist_id)
+        await source.put(_DONE)
+
+        await asyncio.gather(
+            self._stage("playlist", 1, source, video_ids_q, metadata_workers, page_playlist, stats),
+            self._stage("metadata", metadata_workers, video_ids_q, video_write_q, writer_workers,
+                        fetch_metadata, stats, key=",".join, videos=list),
+            self._stage("video_write", writer_workers, video_write_q, comment_q, comment_workers,
+                        write_videos, stats, key=lambda rows: ",".join(v["video_id"] for v in rows),
+                        videos=_row_video_ids),
+            self._stage("comments", comment_workers, comment_q, reply_q, reply_workers,
+                        fetch_comments, stats, videos=lambda video_id: [video_id]),
+            self._stage("replies", reply_workers, reply_q, comment_write_q, writer_workers,
+                        expand_replies, stats,
+                        key=lambda j: j.parent_id if isinstance(j, ReplyJob) else ",".join(_row_video_ids(j)),
+                        videos=lambda j: [j.video_id] if isinstance(j, ReplyJob) else _row_video_ids(j)),
+            self._stage("comment_write", writer_workers, comment_write_q, None, 0,
+                        write_comments, stats, key=lambda b: ",".join(_row_video_ids(b)), videos=_row_video_ids),
+        )
+        return stats
+
+    @staticmethod
+    def _is_ingested(item: Union[PlaylistItem, LeanPlaylistItem], watermark: Optional[YoutubeChannelSync]) -> bool:
+        if watermark is None:
+            return False
+        if item.contentDetails.videoId == watermark.last_video_id:
+            return True
+        published = item.contentDetails.videoPublishedAt
+        return bool(
+            published
+            and watermark.last_published_at
+            and TextUtils.parse_ts(published) <= watermark.last_published_at
+        )
+
+    @staticmethod
+    async def _stage(
+        name: str,
+        workers: int,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        downstream_workers: int,
+        handler: Callable[[Any, Emit], Awaitable[None]],
+        stats: IngestionStats,
+        key: Callable[[Any], str] = str,
+        videos: Optional[Callable[[Any], List[str]]] = None,
+    ) -> None:
+        """
+        inbox 에서 항목을 꺼내 handler 로 처리하고, handler 가 emit 한 결과를 outbox 로 넘깁니다.
+        모든 작업자가 끝나면 다음 단계 작업자 수만큼 종료 신호를 보냅니다.
+        실패하면 key(item) 과 videos(item) (항목에 포함된 비디오ID) 를 failures 에 기록합니다.
+        (CoalescedWriteError 이면 handler 가 모은 row 전체의 비디오ID 로 기록)
+        """
+        async def emit(result: Any) -> None:
+            await outbox.put(result)
+
+        async def worker() -> None:
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                try:
+                    await handler(item, emit)
+                except Exception as e:
+                    if isinstance(e, CoalescedWriteError):
+                        item_key, video_ids = ",".join(e.video_ids), e.video_ids
+                    else:
+                        item_key, video_ids = key(item), videos(item) if videos else []
+                    logger.exception(f"[{name}] {item_key} failed: {e}")
+                    stats.failures.append(
+                        IngestionFailure(stage=name, item=item_key, error=str(e), video_ids=video_ids)
+                    )
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            if outbox is not None:
+                for _ in range(downstream_workers):
+                    await outbox.put(_DONE)
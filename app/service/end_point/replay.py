@@ -0,0 +1,186 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 원본 응답 아카이브(app/utils/archive.py) replay
+    저장된 videos / commentThreads / comments 응답을 수집 파이프라인과 같은 slim 모델 + 매핑 함수로 디코딩해
+    DB 에 다시 upsert 합니다. API 를 호출하지 않으므로 쿼터를 쓰지 않고 디스크 속도로 동작합니다.
+    (매핑 / 스키마 변경 후 재처리, 백필 용도)
+"""
+import logging
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Generic, Iterator, List, Optional, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app.config import IngestionSettings
+from app.database import primary_reads
+from app.model.youtube.lean import (
+    LeanCommentsListResponse,
+    LeanCommentThreadsListResponse,
+    LeanVideosListResponse,
+)
+from app.service.business.search import SearchBusinessService
+from app.service.business.transaction import TransactionBusinessService
+from app.service.business.youtube import ResponseT
+from app.service.end_point.pipeline import IngestionFailure, map_comment, map_comment_thread, map_video
+from app.utils.archive import ResponseArchive
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveRecord(BaseModel, Generic[ResponseT]):
+    """아카이브 한 줄 (body 는 줄 전체와 함께 한 번에 디코딩)"""
+    ts: datetime
+    endpoint: str
+    params: Dict[str, Any] = {}
+    body: ResponseT
+
+class ReplayStats(BaseModel):
+    segments: int = 0
+    records: int = 0
+    videos: int = 0
+    comments: int = 0
+    # video_id 를 찾지 못한 답글 수
+    orphan_replies: int = 0
+    failures: List[IngestionFailure] = Field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+
+class ArchiveReplay:
+    """
+    FK(video_id) 순서를 지키기 위해 endpoint 단위로 videos → commentThreads → comments 순서로 재생합니다.
+    - 영상 / 댓글은 batch_size 개씩 모아 COPY + staging 테이블 경로(bulk_load_*)로 저장
+      (etag 가 같은 댓글은 건너뜀, 마지막 남은 작은 batch 는 multi-row upsert)
+    - 잘못된 줄 / 저장 실패는 failures 에 기록하고 계속 진행
+    - 이미 더 최근 값이 저장된 row 는 덮어쓰지 않음 (until 이 과거여도 live 데이터를 예전 값으로 되돌리지 않음)
+      영상: captured_at 보다 최근 통계 snapshot 이 있으면 건너뛰고 snapshot 만 추가 / 댓글: updated_at 이 더 오래되면 건너뜀
+    - 아카이브가 켜져 있으면 수집 경로가 fields= 없이 전체 응답을 받아 저장하므로 매핑 변경 후에도 재처리 가능
+      (단, 이 방식 이전에 fields= 로 저장된 응답에는 VIDEOS_FIELDS / COMMENT_THREADS_FIELDS 밖의 필드가 없음)
+    """
+
+    def __init__(
+        self,
+        archive: ResponseArchive,
+        tx: TransactionBusinessService,
+        search: Optional[SearchBusinessService] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.archive = archive
+        self.tx = tx
+        # 답글의 video_id 를 DB 에서 찾을 때 사용 (None 이면 이번 replay 의 commentThreads 에서만 찾음)
+        self.search = search
+        self.batch_size = max(batch_size or IngestionSettings().bulk_load_threshold, 1)
+
+    async def run(self, since: Optional[date] = None, until: Optional[date] = None) -> ReplayStats:
+        started = time.monotonic()
+        stats = ReplayStats()
+        # 스레드ID → 비디오ID (답글 저장용)
+        thread_videos: Dict[str, str] = {}
+
+        # 1) videos (통계 snapshot 시각은 원래 응답을 받은 시각)
+        videos: List[Dict] = []
+        for record in self._records("/videos", LeanVideosListResponse, since, until, stats):
+            captured_at = record.ts.astimezone(timezone.utc).replace(tzinfo=None)
+            videos += [{**map_video(item), "captured_at": captured_at} for item in record.body.items]
+            if len(videos) >= self.batch_size:
+                await self._write_videos(videos, stats)
+                videos = []
+        await self._write_videos(videos, stats)
+
+        # 2) commentThreads (최상위 댓글 + 포함된 답글)
+        batch: List[Dict] = []
+        for record in self._records("/commentThreads", LeanCommentThreadsListResponse, since, until, stats):
+            for thread in record.body.items:
+                thread_videos[thread.id] = thread.snippet.videoId
+                batch += map_comment_thread(thread)
+            if len(batch) >= self.batch_size:
+                await self._write_comments(batch, stats)
+                batch = []
+        await self._write_comments(batch, stats)
+
+        # 3) comments (comments.list 로 따로 받은 답글, parentId 는 요청 파라미터에 있음)
+        pending: List[tuple] = []
+        for record in self._records("/comments", LeanCommentsListResponse, since, until, stats):
+            parent_id = record.params.get("parentId")
+            if not parent_id:
+                continue
+            pending += [(reply, parent_id) for reply in record.body.items]
+            if len(pending) >= self.batch_size:
+                await self._write_replies(pending, thread_videos, stats)
+                pending = []
+        await self._write_replies(pending, thread_videos, stats)
+
+        stats.elapsed_seconds = round(time.monotonic() - started, 3)
+        return stats
+
+    def _records(
+        self,
+        endpoint: str,
+        model: Type[ResponseT],
+        since: Optional[date],
+        until: Optional[date],
+        stats: ReplayStats,
+    ) -> Iterator[ArchiveRecord[ResponseT]]:
+        record_model = ArchiveRecord[model]
+        for path in self.archive.segments(endpoint, since, until):
+            stats.segments += 1
+            for n, line in enumerate(self.archive.iter_lines(path), start=1):
+                try:
+                    record = record_model.model_validate_json(line)
+                except ValidationError as e:
+                    self._fail(stats, "decode", f"{self._segment_name(path)}:{n}", e)
+                    continue
+                stats.records += 1
+                yield record
+
+    async def _write_replies(self, pending: List[tuple], thread_videos: Dict[str, str], stats: ReplayStats) -> None:
+        if not pending:
+            return
+        missing = list({parent_id for _, parent_id in pending if parent_id not in thread_videos})
+        if missing and self.search is not None:
+            # 앞 단계에서 저장한 commentThreads 를 봐야 하므로 primary 에서 읽음
+            with primary_reads():
+                thread_videos.update(await self.search.get_comment_video_ids(missing))
+
+        rows = []
+        for reply, parent_id in pending:
+            video_id = thread_videos.get(parent_id)
+            if video_id is None:
+                stats.orphan_replies += 1
+                continue
+            rows.append(map_comment(reply, video_id, parent_id))
+        await self._write_comments(rows, stats)
+
+    async def _write_videos(self, rows: List[Dict], stats: ReplayStats) -> None:
+        if not rows:
+            return
+        try:
+            if len(rows) >= self.batch_size:
+                await self.tx.bulk_load_videos(rows, skip_stale=True)
+            else:
+                await self.tx.insert_youtube_videos_bulk(rows, skip_stale=True)
+            stats.videos += len(rows)
+        except Exception as e:
+            self._fail(stats, "video_write", f"{rows[0]['video_id']} (+{len(rows) - 1})", e)
+
+    async def _write_comments(self, rows: List[Dict], stats: ReplayStats) -> None:
+        if not rows:
+            return
+        try:
+            if len(rows) >= self.batch_size:
+                stats.comments += await self.tx.bulk_load_comments(rows)
+            else:
+                stats.comments += await self.tx.insert_youtube_comments_bulk(rows)
+        except Exception as e:
+            self._fail(stats, "comment_write", f"{rows[0]['comment_id']} (+{len(rows) - 1})", e)
+
+    @staticmethod
+    def _fail(stats: ReplayStats, stage: str, item: str, e: Exception) -> None:
+        logger.warning("archive replay %s failed for %s: %r", stage, item, e)
+        stats.failures.append(IngestionFailure(stage=stage, item=item, error=repr(e)))
+
+    @staticmethod
+    def _segment_name(path: Path) -> str:
+        return "/".join(path.parts[-3:])
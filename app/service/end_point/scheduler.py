@@ -0,0 +1,133 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: watch list 채널 자동 수집 스케줄러
+    채널마다 다음 수집 시각(youtube_channel_sync.next_poll_at)을 저장해 두고,
+    시각이 된 채널을 일괄 수집 작업으로 실행한 뒤 업로드 / 댓글 속도로 다음 주기를 다시 계산합니다.
+    수집은 수동 수집과 같은 경로(YouTubeEndPointService)라서 page_limit 에서 멈춘 paging 은 다음 수집에서 이어지고,
+    최근 게시된 저장 영상의 새 댓글도 함께 수집됩니다 (댓글 속도 계산에 반영).
+    상태는 DB 에 있으므로 재시작해도 일정이 이어집니다.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import PollingSettings
+from app.database import primary_reads
+from app.service.business.channel import ChannelBusinessService
+from app.service.business.search import SearchBusinessService
+from app.service.business.transaction import TransactionBusinessService
+from app.service.end_point.batch import BatchJob
+from app.service.end_point.youtube import YouTubeEndPointService
+
+logger = logging.getLogger(__name__)
+
+
+def compute_poll_interval(videos: int, comments: int, settings: PollingSettings) -> int:
+    """
+    최근 업로드 / 댓글 수 → 수집 주기(초)
+    다음 수집까지 새 영상이 video_target 개, 또는 새 댓글이 comment_target 개 쌓일 정도의 간격
+    """
+    videos_per_second = videos / (settings.video_window_days * 86400)
+    comments_per_second = comments / (settings.comment_window_days * 86400)
+
+    candidates = [settings.max_interval]
+    if videos_per_second > 0:
+        candidates.append(settings.video_target / videos_per_second)
+    if comments_per_second > 0:
+        candidates.append(settings.comment_target / comments_per_second)
+    return int(min(max(min(candidates), settings.min_interval), settings.max_interval))
+
+
+class PollingScheduler:
+    """
+    lifespan(app/event.py) 에서 start() / stop() 합니다.
+    tick 마다 due 채널을 최대 max_channels_per_tick 개 가져와 한 번의 일괄 수집 작업으로 실행합니다.
+    """
+
+    def __init__(
+        self,
+        endpoint_service: YouTubeEndPointService,
+        search_service: Optional[SearchBusinessService] = None,
+        tx_service: Optional[TransactionBusinessService] = None,
+        settings: Optional[PollingSettings] = None,
+    ):
+        self.endpoint = endpoint_service
+        self.search = search_service or endpoint_service.search
+        self.tx = tx_service or endpoint_service.tx
+        self.settings = settings or PollingSettings()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.settings.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(self) -> Optional[BatchJob]:
+        """due 채널을 수집하고 다음 수집 시각을 저장합니다. 수집한 채널이 없으면 None"""
+        now = self._now()
+        channels = [
+            c for c in await self.search.get_due_channels(now, self.settings.max_channels_per_tick) if c.handle
+        ]
+        if not channels:
+            return None
+
+        job = self.endpoint.new_batch_job([c.handle for c in channels], self.settings.page_limit)
+        logger.info("polling %d due channels (job %s)", len(channels), job.job_id)
+        await self.endpoint.run_batch_ingestion(job)
+
+        progress = {p.handle: p for p in job.channels}
+        for channel in channels:
+            result = progress.get(ChannelBusinessService.normalize_handle(channel.handle))
+            if result is not None and result.status == "done" and result.stats.next_page_token:
+                # page_limit 에서 멈춰 watermark 까지 남은 영상이 있으면 min_interval 뒤에 이어서 수집
+                interval = self.settings.min_interval
+            elif result is not None and result.status == "done":
+                interval = await self._interval_for(channel.channel_id)
+            else:
+                interval = self.settings.failure_retry
+            await self.tx.update_poll_schedule(
+                channel.channel_id, channel.handle, self._now() + timedelta(seconds=interval), interval
+            )
+        return job
+
+    async def _interval_for(self, channel_id: str) -> int:
+        now = self._now()
+        videos, comments = await self.search.get_channel_activity(
+            channel_id,
+            videos_since=now - timedelta(days=self.settings.video_window_days),
+            comments_since=now - timedelta(days=self.settings.comment_window_days),
+        )
+        return compute_poll_interval(videos, comments, self.settings)
+
+    async def _loop(self) -> None:
+        # 직전 tick 에서 저장한 next_poll_at 을 봐야 하므로 replica 대신 primary 에서 읽음
+        with primary_reads():
+            while True:
+                try:
+                    await self.run_once()
+                    delay = await self._seconds_until_next_poll()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.exception("polling scheduler tick failed: %r", e)
+                    delay = self.settings.tick_seconds
+                await asyncio.sleep(delay)
+
+    async def _seconds_until_next_poll(self) -> float:
+        """가장 가까운 next_poll_at 까지 (1초 ~ tick_seconds, 새로 추가된 채널도 tick 안에 잡힘)"""
+        next_poll_at = await self.search.get_next_poll_at()
+        if next_poll_at is None:
+            return self.settings.tick_seconds
+        return min(max((next_poll_at - self._now()).total_seconds(), 1.0), self.settings.tick_seconds)
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -3,15 +3,28 @@ Author: sg.kim
 Date: 2025-04-24
 Description:
 """
+import asyncio
 import logging
-from typing import Optional, List, Dict
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional, Dict, List
 
-from app.model.youtube.response import ChannelItem
+from fastapi import HTTPException
+
+from app.config import IngestionSettings
+from app.database import primary_reads
+from app.schema.public import YoutubeChannel, YoutubeChannelSync
+from app.service.business.channel import ChannelBusinessService
 from app.service.business.nlp import NlpBusinessService
-from app.service.business.search import SearchBusinessService
+from app.service.business.search import SearchBusinessService, VideoVelocity
 from app.service.business.transaction import TransactionBusinessService
 from app.service.business.youtube import YouTubeBusinessService
-from app.utils.text import TextUtils
+from app.service.end_point.batch import BatchJob, ChannelProgress, run_batch
+from app.service.end_point.pipeline import COMMENT_STAGES, IngestionPipeline, IngestionStats, VIDEO_STAGES
+from app.service.end_point.replay import ArchiveReplay, ReplayStats
+from app.utils.fair import scheduling_key
+
+logger = logging.getLogger(__name__)
 
 
 class YouTubeEndPointService:
@@ -24,99 +37,229 @@ class YouTubeEndPointService:
         tx_service: Optional[TransactionBusinessService] = None,
         search_service: Optional[SearchBusinessService] = None,
         nlp_service: Optional[NlpBusinessService] = None,
+        ingestion_settings: Optional[IngestionSettings] = None,
+        channel_service: Optional[ChannelBusinessService] = None,
     ):
+        self._owns_business = business_service is None
         self.business = business_service or YouTubeBusinessService()
         self.tx = tx_service or TransactionBusinessService()
         self.search = search_service or SearchBusinessService()
         self.nlp = nlp_service or NlpBusinessService()
+        self.ingestion_settings = ingestion_settings or IngestionSettings()
+        self.channels = channel_service or ChannelBusinessService(self.business, self.search, self.tx)
+        # 일괄 수집 작업 (최근 batch_job_history 개만 보관)
+        self.batch_jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._batch_tasks: Dict[str, asyncio.Task] = {}
 
     async def fetch_all_videos_with_comments(
-        self, handle: str, video_page_limit: int = 5
-    ) -> Dict[str, str]:
-        # 1) 채널 → 업로드 플레이리스트
-        channel: ChannelItem = await self.business.get_channel_by_handle(handle)
-        playlist_id = await self.business.get_uploads_playlist_id(channel.id)
-
-        # 2) 비디오 ID 수집
-        all_video_ids, next_token, pages = [], None, 0
-        while pages < video_page_limit:
-            resp = await self.business.get_playlist_items(
-                playlist_id=playlist_id,
-                page_token=next_token,
-                max_results=50,
-            )
-            pages += 1
-            all_video_ids += [item.contentDetails.videoId for item in resp.items]
-            next_token = resp.nextPageToken
-            if not next_token:
-                break
+        self,
+        handle: str,
+        video_page_limit: int = 5,
+        full_resync: bool = False,
+        stats: Optional[IngestionStats] = None,
+    ) -> Dict[str, Any]:
+        """
+        채널의 신규 영상과 댓글을 수집합니다.
+        - 저장된 watermark(youtube_channel_sync)에 도달하면 playlist paging 을 멈춤
+        - 댓글은 저장된 가장 최신 댓글에 도달하면 paging 을 멈춤 (delta 모드, full_resync 도 같음)
+        - 최근 comment_refresh_days 일 안에 게시된 저장 영상은 매번 메타 / 새 댓글을 다시 수집
+        - full_resync=True 이면 watermark 를 지나서 video_page_limit 페이지까지 다시 수집
+        - video_page_limit 에서 멈춰 저장된 watermark 까지 내려가지 못하면 watermark 는 그대로 둠 (다음 실행에서 이어서)
+        - 댓글 / 답글 수집이나 저장에 실패한 영상은 youtube_channel_sync.retry_video_ids 에 남겨 다음 실행에서 다시 수집
+        - stats 를 넘기면 수집 중 진행 상황이 그 객체에 기록됨
+        """
+        # API 호출 슬롯은 채널(handle) 단위로 round-robin 배분
+        # watermark / 최신 댓글 조회는 방금 저장한 값을 봐야 하므로 primary 에서 읽음
+        token = scheduling_key.set(ChannelBusinessService.normalize_handle(handle))
+        try:
+            with primary_reads():
+                return await self._fetch_channel(handle, video_page_limit, full_resync, stats)
+        finally:
+            scheduling_key.reset(token)
+
+    async def _fetch_channel(
+        self,
+        handle: str,
+        video_page_limit: int,
+        full_resync: bool,
+        stats: Optional[IngestionStats],
+    ) -> Dict[str, Any]:
+        # 1) 채널 → 업로드 플레이리스트 (youtube_channel 캐시, 없으면 channels.list 1회)
+        channel = await self.channels.resolve_handle(handle)
+        # full_resync 도 watermark 를 넘겨서 그 지점까지 내려갔는지 확인 (멈추지는 않음)
+        state = await self.search.get_channel_sync_state(channel.channel_id)
+
+        # 2) 비디오 ID 수집 → 메타 → 저장 → 댓글 → 저장 (단계별 동시 처리)
+        #    이전에 댓글 수집이 실패한 영상 + 최근 게시된 저장 영상은 watermark 와 관계없이 새 댓글까지 다시 수집
+        #    직전 수집이 page_limit 에서 멈췄으면 그 페이지부터 이어서 watermark 까지 내려감 (full_resync 는 처음부터)
+        refresh = self._retry_video_ids(state) + await self._recent_video_ids(channel.channel_id)
+        resume_token = state.resume_page_token if state and not full_resync else None
+        pipeline = IngestionPipeline(self.business, self.tx, self.ingestion_settings, search=self.search)
+        stats = await pipeline.run(
+            channel.uploads_playlist_id, video_page_limit, watermark=state, full_resync=full_resync, stats=stats,
+            refresh_video_ids=refresh, page_token=resume_token,
+        )
+
+        # 3) watermark 갱신 (영상 단계에서 실패가 있으면 다음 실행에서 다시 보도록 유지)
+        #    watermark 까지 내려가지 못했으면 멈춘 페이지 토큰을 남기고, 끝까지 내려간 뒤에 watermark 를 옮김
+        #    댓글 단계에서 실패한 영상은 watermark 와 별도로 기록해 다음 실행에서 다시 수집
+        await self.tx.upsert_channel_sync_state(self._next_sync_state(channel.channel_id, handle, state, stats))
 
-        # 3) 비디오별 메타·댓글 fetch & 저장
-        for vid in all_video_ids:
-            # 3.1) 영상 메타
-            vresp = await self.business.get_video_details(vid)
-            item = vresp.items[0] if vresp.items else None
-            if not item:
-                continue
-
-            vid_data = {
-                "video_id": item.id,
-                "published_at": TextUtils.parse_ts(item.snippet.publishedAt),
-                "channel_id": item.snippet.channelId,
-                "title": TextUtils.escape_control_chars(item.snippet.title),
-                "description": TextUtils.escape_control_chars(item.snippet.description),
-                "channel_title": item.snippet.channelTitle,
-                "live_broadcast_content": item.snippet.liveBroadcastContent,
-                "default_language": item.snippet.defaultLanguage,
-                "view_count": item.statistics.viewCount if item.statistics else None,
-                "like_count": item.statistics.likeCount if item.statistics else None,
-                "comment_count": item.statistics.commentCount if item.statistics else None,
-            }
-            await self.tx.insert_youtube_video(vid_data)
-
-            # 3.2) 댓글 + 답글 수집
-            crep = await self.business.get_comment_threads(video_id=vid, max_results=100)
-            batch: List[Dict] = []
-
-            for thread in crep.items or []:
-                top = thread.snippet.topLevelComment.snippet
-                batch.append({
-                    "comment_id": thread.id,
-                    "video_id": thread.snippet.videoId,
-                    "parent_comment_id": None,
-                    "etag": thread.etag,
-                    "author_display_name": top.authorDisplayName,
-                    "author_channel_id": top.authorChannelId.get("value"),
-                    "text_display": TextUtils.escape_control_chars(top.textDisplay),
-                    "published_at": TextUtils.parse_ts(top.publishedAt),
-                    "updated_at": TextUtils.parse_ts(top.updatedAt),
-                    "viewer_rating": getattr(top, "viewerRating", None),
-                    "like_count": getattr(top, "likeCount", None),
-                })
-
-                # 답글이 있으면 batch에 추가
-                if thread.replies and thread.replies.comments:
-                    for reply in thread.replies.comments:
-                        r = reply.snippet
-                        batch.append({
-                            "comment_id": reply.id,
-                            "video_id": thread.snippet.videoId,
-                            "parent_comment_id": thread.id,
-                            "etag": reply.etag,
-                            "author_display_name": r.authorDisplayName,
-                            "author_channel_id": r.authorChannelId.get("value"),
-                            "text_display": TextUtils.escape_control_chars(r.textDisplay),
-                            "published_at": TextUtils.parse_ts(r.publishedAt),
-                            "updated_at": TextUtils.parse_ts(r.updatedAt),
-                            "viewer_rating": getattr(r, "viewerRating", None),
-                            "like_count": getattr(r, "likeCount", None),
-                        })
-
-            # 3.3) 한 번에 bulk insert/upsert
-            if batch:
-                await self.tx.insert_youtube_comments_bulk(batch)
-
-        return {"detail": "추출이 완료되었습니다"}
+        return {"detail": "추출이 완료되었습니다", **stats.model_dump(mode="json")}
+
+    @staticmethod
+    def _retry_video_ids(state: Optional[YoutubeChannelSync]) -> List[str]:
+        if state is None or not state.retry_video_ids:
+            return []
+        return [v for v in state.retry_video_ids.split(",") if v]
+
+    async def _recent_video_ids(self, channel_id: str) -> List[str]:
+        """댓글을 다시 수집할 최근 게시된 저장 영상 (comment_refresh_days 가 0 이면 없음)"""
+        s = self.ingestion_settings
+        if s.comment_refresh_days <= 0 or s.comment_refresh_max_videos <= 0:
+            return []
+        since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=s.comment_refresh_days)
+        return await self.search.get_recent_video_ids(channel_id, since, s.comment_refresh_max_videos)
+
+    @staticmethod
+    def _failed_video_ids(stats: IngestionStats) -> List[str]:
+        """
+        다음 실행에서 다시 수집할 영상: 댓글 단계에서 실패한 영상
+        + 다시 수집하던 영상 중 메타 / 영상 저장 단계에서 실패한 영상 (새 영상은 watermark 를 유지하므로 다시 paging 됨)
+        성공한 영상은 목록에서 빠짐
+        """
+        refresh = set(stats.refresh_video_ids)
+        failed = stats.failed_video_ids(COMMENT_STAGES)
+        failed += [v for v in stats.failed_video_ids(VIDEO_STAGES) if v in refresh]
+        return list(dict.fromkeys(failed))
+
+    @classmethod
+    def _next_sync_state(
+        cls,
+        channel_id: str,
+        handle: str,
+        state: Optional[YoutubeChannelSync],
+        stats: IngestionStats,
+    ) -> Dict[str, Any]:
+        last_video_id = state.last_video_id if state else None
+        last_published_at = state.last_published_at if state else None
+        resume_page_token = state.resume_page_token if state else None
+        pending = (state.pending_published_at, state.pending_video_id) if state and state.pending_published_at else None
+
+        # 다시 수집하던 (이미 저장된) 영상만의 실패는 retry_video_ids 로 남기므로 watermark 를 막지 않음
+        refresh = set(stats.refresh_video_ids)
+        video_failed = any(
+            f.stage in VIDEO_STAGES and not (f.video_ids and set(f.video_ids) <= refresh) for f in stats.failures
+        )
+        # 이어서 paging 하던 중 가장 최신 영상 = 이전 실행들의 pending 과 이번 실행의 newest 중 최신
+        if stats.newest_published_at and (pending is None or stats.newest_published_at > pending[0]):
+            pending = (stats.newest_published_at, stats.newest_video_id)
+
+        # page_limit 에서 멈춰 이전 watermark 까지 내려가지 못했으면 그 사이 영상이 남아 있으므로 유지
+        walk_complete = state is None or stats.reached_watermark or stats.reached_end
+        if any(f.stage == "playlist" for f in stats.failures):
+            # 만료된 토큰일 수 있으므로 다음 수집은 처음부터 다시 paging (pending 은 유지)
+            resume_page_token = None
+        elif video_failed:
+            # 영상 단계 실패: watermark / 페이지 토큰을 그대로 두고 같은 지점부터 다시 수집
+            pass
+        elif walk_complete:
+            if pending and (last_published_at is None or pending[0] > last_published_at):
+                last_published_at, last_video_id = pending
+            resume_page_token, pending = None, None
+        else:
+            resume_page_token = stats.next_page_token
+
+        return {
+            "channel_id": channel_id,
+            "handle": handle,
+            "last_video_id": last_video_id,
+            "last_published_at": last_published_at,
+            "last_synced_at": datetime.now(timezone.utc).replace(tzinfo=None),
+            "resume_page_token": resume_page_token,
+            "pending_video_id": pending[1] if pending else None,
+            "pending_published_at": pending[0] if pending else None,
+            "retry_video_ids": ",".join(cls._failed_video_ids(stats)) or None,
+        }
+
+    async def start_batch_ingestion(
+        self,
+        handles: Optional[List[str]] = None,
+        video_page_limit: int = 5,
+        full_resync: bool = False,
+    ) -> BatchJob:
+        """
+        여러 채널을 백그라운드에서 일괄 수집합니다. handles 가 없으면 watch list 를 사용합니다.
+        - 채널은 batch_channel_workers 개씩 동시에 수집
+        - 진행 상황은 get_batch_job(job_id) 로 조회
+        """
+        if not handles:
+            handles = [c.handle for c in await self.search.get_watch_list() if c.handle]
+        handles = list(dict.fromkeys(ChannelBusinessService.normalize_handle(h) for h in handles))
+        if not handles:
+            raise HTTPException(status_code=400, detail="no handles given and the watch list is empty")
+
+        job = self.new_batch_job(handles, video_page_limit, full_resync)
+        task = asyncio.create_task(self.run_batch_ingestion(job))
+        self._batch_tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._batch_tasks.pop(job.job_id, None))
+        return job
+
+    def new_batch_job(self, handles: List[str], video_page_limit: int, full_resync: bool = False) -> BatchJob:
+        """
+        일괄 수집 작업을 만들어 등록만 합니다 (실행은 run_batch_ingestion). 최근 작업만 보관.
+        """
+        job = BatchJob(
+            page_limit=video_page_limit,
+            full_resync=full_resync,
+            channels=[ChannelProgress(handle=h) for h in handles],
+        )
+        self.batch_jobs[job.job_id] = job
+        while len(self.batch_jobs) > max(self.ingestion_settings.batch_job_history, 1):
+            old_id, _ = self.batch_jobs.popitem(last=False)
+            self._batch_tasks.pop(old_id, None)
+        return job
+
+    async def run_batch_ingestion(self, job: BatchJob) -> BatchJob:
+        async def ingest(handle: str, stats: IngestionStats) -> None:
+            await self.fetch_all_videos_with_comments(handle, job.page_limit, job.full_resync, stats=stats)
+
+        return await run_batch(job, ingest, self.ingestion_settings.batch_channel_workers)
+
+    def get_batch_job(self, job_id: str) -> BatchJob:
+        job = self.batch_jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Batch job not found")
+        return job
+
+    async def get_watch_list(self) -> List[YoutubeChannel]:
+        return await self.search.get_watch_list()
+
+    async def update_watch_list(self, handles: List[str], watch: bool = True) -> List[YoutubeChannel]:
+        """
+        핸들들을 watch list 에 추가(watch=True) 하거나 제거합니다. 채널은 채널 캐시로 조회합니다.
+        """
+        channels = [await self.channels.resolve_handle(h) for h in handles]
+        await self.tx.update_channel_watch([c.channel_id for c in channels], "Y" if watch else "N")
+        return await self.search.get_watch_list()
+
+    async def replay_archive(self, since: Optional[date] = None, until: Optional[date] = None) -> ReplayStats:
+        """
+        아카이브된 API 응답을 다시 디코딩 / upsert 합니다 (API 호출 없음, since ~ until 날짜 포함).
+        """
+        archive = self.business.archive
+        if archive is None:
+            raise HTTPException(status_code=400, detail="response archive is not configured (YOUTUBE_ARCHIVE_PATH)")
+        # 쓰고 있는 segment 의 버퍼까지 디스크에 내려서 replay 에 포함
+        archive.flush()
+        return await ArchiveReplay(archive, self.tx, self.search).run(since, until)
+
+    async def get_trending_videos(self, hours: int = 24, limit: int = 50) -> List[VideoVelocity]:
+        """
+        최근 hours 시간 동안 조회수가 가장 빠르게 늘어난 영상 (수집 때마다 쌓이는 통계 snapshot 기준)
+        """
+        since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hours)
+        return await self.search.get_video_velocity(since, limit)
 
     async def process_korean_wave_status(
             self, page_size: int = 50
@@ -140,7 +283,8 @@ class YouTubeEndPointService:
             results = await self.nlp.identify_korean_wave_for_video(videos)
             print(f"PROCESS COUNT>> {len(results)}")
             # DB 업데이트
-            await self.tx.update_korean_wave_status(results)
+            updated = await self.tx.update_korean_wave_status(results)
+            self._log_unmatched("video_id", results, updated)
             previous_id = last_id
             if previous_id is None:
                 break
@@ -149,27 +293,47 @@ class YouTubeEndPointService:
 
 
     async def process_sentiment_for_comment(
-            self, page_size: int = 50
+            self, page_size: int = 50, since_days: Optional[int] = None
     ) -> Dict[str, str]:
 
         print(f"page_size >> {page_size}")
 
+        # since_days 가 있으면 최근 partition 만 scan
+        published_since = (
+            datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=since_days) if since_days else None
+        )
         previous_id: Optional[str] = None
         while True:
-            comments, last_id = await self.search.get_comments_for_video(previous_id, page_size)
+            comments, last_id = await self.search.get_comments_for_video(previous_id, page_size, published_since)
             print(f"SELECT COUNT>> {len(comments)}")
             if not comments:
                 break
             # NLP 처리
             results = await self.nlp.identify_sentiment_for_comments(comments)
             print(f"PROCESS COUNT>> {len(results)}")
+            # partition key 를 같이 넘겨 댓글이 있는 partition 만 갱신
+            published = {c.comment_id: c.published_at for c in comments}
+            for result in results:
+                if result.get("comment_id") in published:
+                    result["published_at"] = published[result["comment_id"]]
             # DB 업데이트
-            await self.tx.update_sentiment_for_comments(results)
+            updated = await self.tx.update_sentiment_for_comments(results)
+            self._log_unmatched("comment_id", results, updated)
             previous_id = last_id
             if previous_id is None:
                 break
 
         return {"detail": "감성 분석 및 키워드 추출 완료"}
 
+    @staticmethod
+    def _log_unmatched(id_field: str, results: List[Dict], updated: List[str]) -> None:
+        # LLM 이 없는 ID 를 돌려준 경우 (갱신되지 않은 결과)
+        unmatched = {r[id_field] for r in results if id_field in r} - set(updated)
+        if unmatched:
+            logger.warning("%d NLP results matched no row (%s): %s", len(unmatched), id_field, sorted(unmatched))
+
     async def close(self):
-        await self.business.close()
\ No newline at end of file
+        for task in list(self._batch_tasks.values()):
+            task.cancel()
+        if self._owns_business:
+            await self.business.close()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: YouTube Data API 원본 응답 아카이브 (gzip NDJSON, 날짜 / endpoint 별 append-only segment)
+    <root>/<YYYY-MM-DD>/<endpoint>/<segment>.ndjson.gz
+    한 줄 = {"ts": ..., "endpoint": ..., "params": {...}, "body": <원본 응답 JSON>}
+"""
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+
+class ResponseArchive:
+    """
+    - 응답 본문은 다시 인코딩하지 않고 그대로 body 에 넣음
+      (JSON 문자열 안의 줄바꿈은 항상 \\n 으로 escape 되어 있으므로 바깥 공백의 개행만 지우면 한 줄이 됨)
+    - segment 는 압축 후 크기가 segment_max_bytes 를 넘거나 날짜가 바뀌면 새 파일로 교체
+    - 파일 쓰기는 동기 I/O 이므로 asyncio.to_thread 로 실행
+    """
+
+    # 아카이브에 남기지 않을 파라미터
+    IGNORED_PARAMS = ("key",)
+
+    def __init__(self, root: str, segment_max_bytes: int = 64 * 1024 * 1024):
+        self.root = Path(root)
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.Lock()
+        # endpoint → (날짜, 원본 파일, gzip writer)
+        self._segments: Dict[str, Tuple[date, BinaryIO, gzip.GzipFile]] = {}
+
+    @staticmethod
+    def endpoint_dir(endpoint: str) -> str:
+        return endpoint.strip("/").replace("/", "_")
+
+    async def append(self, endpoint: str, params: Dict, body: bytes) -> None:
+        await asyncio.to_thread(self._append, endpoint, params, body)
+
+    def flush(self) -> None:
+        with self._lock:
+            for _, raw, writer in self._segments.values():
+                writer.flush()
+                raw.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for endpoint in list(self._segments):
+                self._close_segment(endpoint)
+
+    def segments(self, endpoint: str, since: Optional[date] = None, until: Optional[date] = None) -> List[Path]:
+        """날짜 범위(양끝 포함)의 endpoint segment 파일들 (오래된 순)"""
+        if not self.root.exists():
+            return []
+        found = []
+        for day_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            try:
+                day = date.fromisoformat(day_dir.name)
+            except ValueError:
+                continue
+            if (since and day < since) or (until and day > until):
+                continue
+            found += sorted((day_dir / self.endpoint_dir(endpoint)).glob("*.ndjson.gz"))
+        return found
+
+    @staticmethod
+    def iter_lines(path: Path) -> Iterator[bytes]:
+        """segment 의 레코드 줄들. 아직 쓰는 중이라 끝이 잘린 segment 는 읽을 수 있는 데까지만"""
+        with gzip.open(path, "rb") as f:
+            try:
+                for line in f:
+                    if line.endswith(b"\n"):
+                        yield line
+            except (EOFError, gzip.BadGzipFile):
+                return
+
+    def _append(self, endpoint: str, params: Dict, body: bytes) -> None:
+        header = json.dumps(
+            {
+                "ts": datetime.now(timezone.utc).isoformat(),
+                "endpoint": endpoint,
+                "params": {k: v for k, v in params.items() if k not in self.IGNORED_PARAMS},
+            },
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8")
+        line = header[:-1] + b',"body":' + body.replace(b"\r", b"").replace(b"\n", b"") + b"}\n"
+
+        with self._lock:
+            writer = self._writer(endpoint)
+            writer.write(line)
+
+    def _writer(self, endpoint: str) -> gzip.GzipFile:
+        today = datetime.now(timezone.utc).date()
+        current = self._segments.get(endpoint)
+        if current:
+            day, raw, writer = current
+            if day == today and raw.tell() < self.segment_max_bytes:
+                return writer
+            self._close_segment(endpoint)
+
+        directory = self.root / today.isoformat() / self.endpoint_dir(endpoint)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%H%M%S', time.gmtime())}-{os.getpid()}-{time.monotonic_ns()}.ndjson.gz"
+        raw = open(directory / name, "ab")
+        writer = gzip.GzipFile(fileobj=raw, mode="ab")
+        self._segments[endpoint] = (today, raw, writer)
+        return writer
+
+    def _close_segment(self, endpoint: str) -> None:
+        _, raw, writer = self._segments.pop(endpoint)
+        writer.close()
+        raw.close()
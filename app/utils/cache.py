@@ -0,0 +1,87 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: YouTube Data API 조건부 요청(If-None-Match)용 ETag 응답 캐시
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+
+class EtagCache:
+    """
+    endpoint + params 를 키로 ETag 와 응답 본문을 SQLite 파일에 저장합니다.
+    - max_entries 를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+    - 본문은 zlib 로 압축해서 저장
+    - sqlite3 는 동기 API 이므로 asyncio.to_thread 로 실행
+    """
+
+    # 캐시 키에서 제외할 파라미터 (API 키는 응답에 영향을 주지 않음)
+    IGNORED_PARAMS = ("key",)
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS etag_cache ("
+            " key TEXT PRIMARY KEY,"
+            " etag TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS etag_cache_accessed_at ON etag_cache (accessed_at)")
+        self._conn.commit()
+
+    @classmethod
+    def make_key(cls, path: str, params: Dict) -> str:
+        filtered = {k: v for k, v in params.items() if k not in cls.IGNORED_PARAMS}
+        raw = path + "?" + json.dumps(filtered, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """(etag, body) 또는 None"""
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, etag: str, body: bytes) -> None:
+        await asyncio.to_thread(self._put, key, etag, body)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM etag_cache").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, body FROM etag_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE etag_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return row[0], zlib.decompress(row[1])
+
+    def _put(self, key: str, etag: str, body: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO etag_cache (key, etag, body, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, etag, zlib.compress(body), time.time()),
+            )
+            # LRU eviction
+            self._conn.execute(
+                "DELETE FROM etag_cache WHERE key IN ("
+                " SELECT key FROM etag_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
@@ -0,0 +1,87 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: 키(채널)별 round-robin 으로 동시 실행 슬롯을 나눠 주는 fair scheduler
+"""
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+
+# 현재 작업이 속한 채널 (수집 시작 시 설정, 하위 task 에 그대로 전달됨)
+scheduling_key: ContextVar[Optional[str]] = ContextVar("scheduling_key", default=None)
+
+
+class FairScheduler:
+    """
+    동시에 concurrency 개까지만 슬롯을 내주고, 대기자가 있으면 키를 돌아가며 하나씩 깨웁니다.
+    - 대기 요청이 많은 키(큰 채널)도 한 바퀴에 슬롯 1개만 받으므로 다른 키가 굶지 않음
+    - 같은 키 안에서는 들어온 순서(FIFO)대로 처리
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(concurrency, 1)
+        self._active = 0
+        self._waiting: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable = None) -> AsyncIterator[None]:
+        await self._acquire(key)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def snapshot(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "active": self._active,
+            "waiting": {str(k): len(q) for k, q in self._waiting.items()},
+        }
+
+    async def _acquire(self, key: Hashable) -> None:
+        if self._active < self.concurrency and not self._waiting:
+            self._active += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(key, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 슬롯을 받은 직후 취소됨 → 다음 대기자에게 넘김
+                self._release()
+            else:
+                self._discard(key, fut)
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._active < self.concurrency and self._waiting:
+            key, queue = next(iter(self._waiting.items()))
+            fut = queue.popleft()
+            # 이번 키는 맨 뒤로 (round-robin)
+            if queue:
+                self._waiting.move_to_end(key)
+            else:
+                del self._waiting[key]
+            if fut.done():
+                continue
+            fut.set_result(None)
+            self._active += 1
+
+    def _discard(self, key: Hashable, fut: asyncio.Future) -> None:
+        queue = self._waiting.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(fut)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiting[key]
@@ -0,0 +1,83 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: YouTube Data API 키 풀 (키별 쿼터 사용량 / 오류 추적 및 로테이션)
+"""
+from datetime import date, datetime
+from typing import Dict, List
+
+from app.utils.rate_limit import QUOTA_TZ, QuotaExhaustedError
+
+
+class ApiKeyPool:
+    """
+    요청마다 사용량이 가장 적은 키를 골라 줍니다.
+    - 키별 일일 예산(daily_budget_per_key)을 넘는 키는 건너뜀
+    - quotaExceeded 응답을 받은 키는 다음 초기화(태평양 시간 자정)까지 제외
+    """
+
+    def __init__(self, keys: List[str], daily_budget_per_key: int):
+        if not keys:
+            raise ValueError("at least one API key is required")
+        self.keys = list(dict.fromkeys(keys))
+        self.daily_budget_per_key = daily_budget_per_key
+        self._day = self._today()
+        self._used: Dict[str, int] = {k: 0 for k in self.keys}
+        self._requests: Dict[str, int] = {k: 0 for k in self.keys}
+        self._errors: Dict[str, int] = {k: 0 for k in self.keys}
+        self._exhausted: Dict[str, bool] = {k: False for k in self.keys}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def acquire(self, cost: int = 1) -> str:
+        """cost 만큼 여유가 있는 키 중 사용량이 가장 적은 키를 반환합니다."""
+        self._roll_day()
+        candidates = [
+            k for k in self.keys
+            if not self._exhausted[k] and self._used[k] + cost <= self.daily_budget_per_key
+        ]
+        if not candidates:
+            raise QuotaExhaustedError("all API keys have exhausted their daily quota")
+
+        key = min(candidates, key=lambda k: self._used[k])
+        self._used[key] += cost
+        self._requests[key] += 1
+        return key
+
+    def report_error(self, key: str, quota_exceeded: bool = False) -> None:
+        if key not in self._errors:
+            return
+        self._errors[key] += 1
+        if quota_exceeded:
+            self._exhausted[key] = True
+
+    def snapshot(self) -> List[Dict]:
+        self._roll_day()
+        return [
+            {
+                "key": self.mask(k),
+                "used": self._used[k],
+                "remaining": max(self.daily_budget_per_key - self._used[k], 0),
+                "requests": self._requests[k],
+                "errors": self._errors[k],
+                "exhausted": self._exhausted[k],
+            }
+            for k in self.keys
+        ]
+
+    @staticmethod
+    def mask(key: str) -> str:
+        return f"{key[:4]}...{key[-4:]}" if len(key) > 8 else "****"
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            for k in self.keys:
+                self._used[k] = 0
+                self._exhausted[k] = False
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(QUOTA_TZ).date()
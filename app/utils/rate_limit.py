@@ -0,0 +1,116 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: YouTube Data API 쿼터 기반 rate limiter (초당 token bucket + 일일 unit 예산)
+"""
+import asyncio
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+try:
+    # YouTube 일일 쿼터는 태평양 시간 자정에 초기화됨
+    QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except ZoneInfoNotFoundError:
+    QUOTA_TZ = timezone(timedelta(hours=-8))
+
+
+class QuotaExhaustedError(RuntimeError):
+    pass
+
+
+class QuotaRateLimiter:
+    """
+    - 초당 요청 수: token bucket (rate, burst)
+    - 일일 예산: endpoint 별 unit cost 를 누적해서 daily_budget 을 넘지 않도록 함
+    - asyncio.Lock 은 대기 순서대로(FIFO) 깨우므로 호출자는 들어온 순서대로 처리됩니다.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        daily_budget: int,
+        costs: Dict[str, int],
+        default_cost: int = 1,
+    ):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.daily_budget = daily_budget
+        self.costs = costs
+        self.default_cost = default_cost
+
+        self._lock = asyncio.Lock()
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._day = self._today()
+        self._used = 0
+        self._used_by_endpoint: Dict[str, int] = defaultdict(int)
+
+    def cost_of(self, endpoint: str) -> int:
+        return self.costs.get(endpoint, self.default_cost)
+
+    @property
+    def remaining(self) -> int:
+        self._roll_day()
+        return max(self.daily_budget - self._used, 0)
+
+    async def acquire(self, endpoint: str) -> int:
+        """
+        endpoint 호출 1회분의 토큰과 unit 을 확보합니다. 일일 예산이 부족하면 QuotaExhaustedError.
+        """
+        cost = self.cost_of(endpoint)
+        async with self._lock:
+            self._roll_day()
+            if self._used + cost > self.daily_budget:
+                raise QuotaExhaustedError(
+                    f"daily quota exhausted ({self._used}/{self.daily_budget} units used)"
+                )
+
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+            self._used += cost
+            self._used_by_endpoint[endpoint] += cost
+        return cost
+
+    def snapshot(self) -> Dict:
+        self._roll_day()
+        return {
+            "daily_budget": self.daily_budget,
+            "used": self._used,
+            "remaining": self.remaining,
+            "used_by_endpoint": dict(self._used_by_endpoint),
+            "resets_at": self._next_reset().isoformat(),
+            "rate_per_second": self.rate,
+            "waiting": self._waiters(),
+        }
+
+    def _waiters(self) -> int:
+        waiters = getattr(self._lock, "_waiters", None)
+        return len(waiters) if waiters else 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+            self._used_by_endpoint.clear()
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(QUOTA_TZ).date()
+
+    def _next_reset(self) -> datetime:
+        return datetime.combine(self._day + timedelta(days=1), datetime.min.time(), QUOTA_TZ)
@@ -0,0 +1,249 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: YouTube Data API 호출 안정화 (jitter 재시도 / endpoint 별 timeout / hedging / circuit breaker)
+"""
+import asyncio
+import math
+import random
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+
+class RetryableError(Exception):
+    """일시적인 오류 응답 (5xx, 429, rateLimitExceeded 등) → 재시도 대상"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+# 재시도 대상 예외 (연결 오류 / httpx timeout / endpoint timeout 포함)
+RETRYABLE_EXCEPTIONS = (RetryableError, httpx.TransportError, TimeoutError)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더 (초 또는 HTTP-date) → 대기 초"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold 번 쌓이면 reset_timeout 초 동안 호출을 바로 거절합니다 (open).
+    시간이 지나면 호출 1개만 시험으로 통과시키고 (half-open), 성공하면 다시 닫힙니다.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before_call(self) -> None:
+        if self.state == "open":
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(f"YouTube API circuit is open (retry in {remaining:.1f}s)")
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                raise CircuitOpenError("YouTube API circuit is half-open (probe in flight)")
+            self._probing = True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """실패 기록. 이번 실패로 circuit 이 열렸으면 True"""
+        self._failures += 1
+        self._probing = False
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            opened = self.state != "open"
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            return opened
+        return False
+
+    def release(self) -> None:
+        """API 상태와 무관한 오류로 끝난 시험 호출을 되돌림"""
+        self._probing = False
+
+
+class LatencyTracker:
+    """endpoint 별 최근 응답 시간 (hedging 지연 계산용)"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def endpoints(self) -> List[str]:
+        return list(self._samples)
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self._samples[endpoint].append(seconds)
+
+    def quantile(self, endpoint: str, q: float, min_samples: int) -> Optional[float]:
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(math.ceil(q * len(ordered)) - 1, len(ordered) - 1)]
+
+
+class ResilientCaller:
+    """
+    - 재시도: RETRYABLE_EXCEPTIONS 에 대해 full-jitter 지수 backoff, Retry-After 가 있으면 그 값을 우선
+    - timeout: timed(endpoint) 구간에 endpoint 별 제한 시간 적용
+    - hedging: 응답이 최근 hedge_quantile 지연보다 늦으면 같은 요청을 하나 더 보내고 먼저 끝난 쪽 사용
+    - circuit breaker: 실패가 이어지면 CircuitOpenError 로 즉시 실패
+    - counters: 위 동작별 횟수 (snapshot)
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        default_timeout: float = 10.0,
+        timeouts: Optional[Dict[str, float]] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+        self.latency = LatencyTracker()
+        self.counters: Counter = Counter()
+
+    def timeout_for(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    @asynccontextmanager
+    async def timed(self, endpoint: str) -> AsyncIterator[None]:
+        """실제 네트워크 구간: endpoint 별 timeout 적용 + 응답 시간 기록"""
+        started = time.monotonic()
+        async with asyncio.timeout(self.timeout_for(endpoint)):
+            yield
+        self.latency.record(endpoint, time.monotonic() - started)
+
+    async def call(self, endpoint: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        for n in range(1, self.max_attempts + 1):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self.counters["circuit_rejected"] += 1
+                raise
+
+            self.counters["attempts"] += 1
+            try:
+                result = await self._hedged(endpoint, attempt)
+            except RETRYABLE_EXCEPTIONS as e:
+                self._record_failure(e)
+                if n == self.max_attempts:
+                    self.counters["gave_up"] += 1
+                    raise
+                self.counters["retries"] += 1
+                await asyncio.sleep(self._backoff(n, getattr(e, "retry_after", None)))
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+        raise AssertionError("unreachable")
+
+    def snapshot(self) -> Dict:
+        return {
+            "circuit": self.breaker.state,
+            "counters": dict(self.counters),
+            "hedge_delays": {
+                endpoint: self.latency.quantile(endpoint, self.hedge_quantile, self.hedge_min_samples)
+                for endpoint in self.latency.endpoints()
+            } if self.hedge else {},
+        }
+
+    def _record_failure(self, e: BaseException) -> None:
+        self.counters["failures"] += 1
+        if isinstance(e, (TimeoutError, httpx.TimeoutException)):
+            self.counters["timeouts"] += 1
+        elif isinstance(e, RetryableError) and e.status_code:
+            self.counters[f"status_{e.status_code}"] += 1
+        else:
+            self.counters["transport_errors"] += 1
+        if self.breaker.record_failure():
+            self.counters["circuit_opened"] += 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # full jitter: 0 ~ base * 2^(n-1)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def _hedged(self, endpoint: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        delay = (
+            self.latency.quantile(endpoint, self.hedge_quantile, self.hedge_min_samples)
+            if self.hedge else None
+        )
+        if delay is None:
+            return await attempt()
+
+        primary = asyncio.ensure_future(attempt())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self.counters["hedges"] += 1
+        hedge = asyncio.ensure_future(attempt())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
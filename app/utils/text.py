@@ -6,6 +6,13 @@ Description:
 import codecs, re
 import json
 from datetime import datetime, timezone
+from typing import Optional
+
+# PostgreSQL text 에 저장할 수 없는 문자: NUL, 짝이 없는 surrogate (UTF-8 로 인코딩 불가)
+_UNSTORABLE_CHARS = re.compile("[\x00\ud800-\udfff]")
+
+# 예전 저장 형식(str.encode("unicode_escape"))이 만드는 escape 시퀀스
+_ESCAPE_SEQUENCE = re.compile(r"\\(?:[\\tnr]|x[0-9a-f]{2}|u[0-9a-f]{4}|U[0-9a-f]{8})")
 
 
 class TextUtils:
@@ -17,14 +24,21 @@ class TextUtils:
         return dt.astimezone(timezone.utc).replace(tzinfo=None)
 
     @staticmethod
-    def escape_control_chars(s: str) -> str:
-        # 모든 제어문자를 \uXXXX 또는 \xXX 형태로 이스케이프
-        return s.encode("unicode_escape").decode("ascii")
+    def sanitize_text(s: Optional[str]) -> Optional[str]:
+        # UTF-8 그대로 저장하고 PostgreSQL 이 거부하는 문자만 정리 (NUL 제거, 깨진 surrogate → U+FFFD)
+        if not s or not _UNSTORABLE_CHARS.search(s):
+            return s
+        return _UNSTORABLE_CHARS.sub(lambda m: "" if m.group() == "\x00" else "\ufffd", s)
+
+    @staticmethod
+    def is_escaped_text(s: Optional[str]) -> bool:
+        # 예전 형식(unicode_escape ASCII)으로 저장된 값인지 (ASCII 이고 escape 시퀀스가 있음)
+        return bool(s) and s.isascii() and _ESCAPE_SEQUENCE.search(s) is not None
 
     @staticmethod
     def unescape_control_chars(s: str) -> str:
-        # 저장된 이스케이프 문자열을 원래 텍스트로 복원
-        return codecs.decode(s, "unicode_escape")
+        # 예전 형식으로 저장된 이스케이프 문자열을 원래 텍스트로 복원 (UTF-8 migration 용)
+        return TextUtils.sanitize_text(codecs.decode(s, "unicode_escape"))
 
     @staticmethod
     def parse_response_with_regex(raw: str):
@@ -0,0 +1,164 @@
+"""
+Author: sg.kim
+Date: 2026-10-17
+Description: commentThreads.list 응답 디코딩 비용 비교 (각 경로를 --repeat 번 돌려 가장 빠른 값을 출력)
+    1) 한 번 파싱 vs 두 번 파싱: 같은 full model / 같은 전체 응답에서
+       resp.json() → model_validate (dict 를 거쳐 두 번 파싱) 와 bytes → model_validate_json 비교
+    2) fields= partial response: 같은 lean model 에서 전체 응답과 fields= 로 줄어든 응답 비교
+       - full model 은 fields= 응답을 파싱하지 못함 (kind / authorProfileImageUrl 등 필수 필드가 빠짐)
+         → lean model 은 속도가 아니라 줄어든 응답을 받기 위해 필요
+    3) 참고: 같은 전체 응답에서 full model vs lean model (모델 차이만, 실행마다 순서가 바뀌는 수준)
+
+    실행: python -m benchmarks.decode_comment_threads [--threads 100] [--replies 5] [--pages 200] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+from pydantic import ValidationError
+
+from app.model.youtube.lean import LeanCommentThreadsListResponse
+from app.model.youtube.response import CommentThreadsListResponse
+
+TEXTS = [
+    "이 노래 진짜 좋다 ㅠㅠ 매일 듣는 중",
+    "Watching from Brazil! K-pop never disappoints 🔥🔥",
+    "3:42 여기 부분 라이브로 들으면 소름 돋음",
+    "I can't stop replaying this. The bridge is insane.\nThe vocals, the choreography, everything.",
+    "한국 여행 가서 콘서트 꼭 보고 싶어요!! 언젠가는...",
+]
+
+def _comment(cid: str, rng: random.Random) -> Dict:
+    text = rng.choice(TEXTS)
+    published = f"2025-04-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z"
+    author = f"user{rng.randint(1, 10 ** 6)}"
+    return {
+        "kind": "youtube#comment",
+        "etag": f"etag-{cid}",
+        "id": cid,
+        "snippet": {
+            "channelId": "UC123",
+            "videoId": "VID123",
+            "textDisplay": text,
+            "textOriginal": text,
+            "authorDisplayName": f"@{author}",
+            "authorProfileImageUrl": f"https://yt3.ggpht.com/ytc/{author}=s48-c-k-c0x00ffffff-no-rj",
+            "authorChannelUrl": f"http://www.youtube.com/@{author}",
+            "authorChannelId": {"value": f"UC{author}"},
+            "canRate": True,
+            "viewerRating": "none",
+            "likeCount": rng.randint(0, 5000),
+            "publishedAt": published,
+            "updatedAt": published,
+        },
+    }
+
+def comment_threads_page(threads: int, replies: int, seed: int = 0) -> Dict:
+    """실제 API 와 같은 모양의 commentThreads.list 응답 1페이지"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(threads):
+        cid = f"Ugz{seed}x{i}"
+        embedded = [_comment(f"{cid}.r{j}", rng) for j in range(replies)]
+        items.append({
+            "kind": "youtube#commentThread",
+            "etag": f"etag-{cid}",
+            "id": cid,
+            "snippet": {
+                "channelId": "UC123",
+                "videoId": "VID123",
+                "topLevelComment": _comment(cid, rng),
+                "canReply": True,
+                "totalReplyCount": replies,
+                "isPublic": True,
+            },
+            "replies": {"comments": embedded} if embedded else None,
+        })
+    return {
+        "kind": "youtube#commentThreadListResponse",
+        "etag": f"etag-page-{seed}",
+        "nextPageToken": "Z2V0X25ld2VzdF9maXJzdC0tQ2dnSWdBUVZGN2ZST0JJRkNJZ2dHQUFTQlFpb0lCZ0FFZ1VJaVNBWUFCSUZDSjBnR0FFU0JRaUhJQmdBR0FBaURnb01DUGJhOUw4R0VKakZfZkVC",
+        "pageInfo": {"totalResults": threads, "resultsPerPage": threads},
+        "items": items,
+    }
+
+def trim_to_fields(page: Dict) -> Dict:
+    """fields=COMMENT_THREADS_FIELDS 로 요청했을 때 API 가 돌려주는 모양"""
+    def comment(c: Dict) -> Dict:
+        s = c["snippet"]
+        keep = ("authorDisplayName", "authorChannelId", "textDisplay", "viewerRating", "likeCount",
+                "publishedAt", "updatedAt")
+        return {"id": c["id"], "etag": c["etag"], "snippet": {k: s[k] for k in keep}}
+
+    items = []
+    for t in page["items"]:
+        item = {
+            "id": t["id"],
+            "etag": t["etag"],
+            "snippet": {
+                "videoId": t["snippet"]["videoId"],
+                "totalReplyCount": t["snippet"]["totalReplyCount"],
+                "topLevelComment": comment(t["snippet"]["topLevelComment"]),
+            },
+        }
+        if t.get("replies"):
+            item["replies"] = {"comments": [comment(r) for r in t["replies"]["comments"]]}
+        items.append(item)
+    return {"nextPageToken": page["nextPageToken"], "items": items}
+
+def _bench(name: str, decode: Callable[[bytes], object], bodies: List[bytes], repeat: int) -> float:
+    decode(bodies[0])  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for body in bodies:
+            decode(body)
+        best = min(best, time.perf_counter() - started)
+    per_page_ms = best / len(bodies) * 1000
+    size_kb = sum(len(b) for b in bodies) / len(bodies) / 1024
+    print(f"  {name:<46} {per_page_ms:8.3f} ms/page  {size_kb:8.1f} KiB/page")
+    return per_page_ms
+
+def _rejects(model, body: bytes) -> bool:
+    try:
+        model.model_validate_json(body)
+    except ValidationError:
+        return True
+    return False
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=100, help="threads per page (API max 100)")
+    parser.add_argument("--replies", type=int, default=5, help="embedded replies per thread (API max 5)")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path, the fastest is reported")
+    args = parser.parse_args()
+
+    pages = [comment_threads_page(args.threads, args.replies, seed) for seed in range(args.pages)]
+    full = [json.dumps(p, ensure_ascii=False).encode("utf-8") for p in pages]
+    trimmed = [json.dumps(trim_to_fields(p), ensure_ascii=False).encode("utf-8") for p in pages]
+
+    # 1. 두 번 파싱 제거
+    print("1) parse once (full model, full body)")
+    twice = _bench("json.loads + model_validate", lambda b: CommentThreadsListResponse.model_validate(json.loads(b)),
+                   full, args.repeat)
+    once = _bench("model_validate_json", CommentThreadsListResponse.model_validate_json, full, args.repeat)
+    print(f"  -> {twice / once:.2f}x")
+
+    # 2. fields= 로 응답 축소
+    print("2) fields= partial response (lean model)")
+    lean_full = _bench("full body", LeanCommentThreadsListResponse.model_validate_json, full, args.repeat)
+    lean_trimmed = _bench("fields= body", LeanCommentThreadsListResponse.model_validate_json, trimmed, args.repeat)
+    print(f"  -> {lean_full / lean_trimmed:.2f}x, payload {len(trimmed[0]) / len(full[0]):.0%} of full body")
+    print(f"  full model rejects fields= body: {_rejects(CommentThreadsListResponse, trimmed[0])}")
+
+    # 3. 모델 차이만 (참고)
+    print("3) model only (full body)")
+    print(f"  lean / full model: {lean_full / once:.2f}")
+    print(f"total: json.loads + model_validate (full) -> model_validate_json (lean, fields=): "
+          f"{twice / lean_trimmed:.2f}x")
+
+if __name__ == "__main__":
+    main()
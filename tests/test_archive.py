@@ -0,0 +1,165 @@
+"""
+Tests for ResponseArchive and ArchiveReplay
+Author: sg.kim
+Date: 2026-10-17
+"""
+import datetime
+import gzip
+import json
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.service.business.youtube import YouTubeBusinessService
+from app.service.end_point.replay import ArchiveReplay
+from app.utils.archive import ResponseArchive
+from tests.test_ingestion_pipeline import FakeTx, thread_item, video_item
+
+
+@pytest.fixture
+def archive(tmp_path):
+    a = ResponseArchive(str(tmp_path / "archive"))
+    yield a
+    a.close()
+
+@pytest_asyncio.fixture
+async def service(archive):
+    svc = YouTubeBusinessService(archive=archive)
+    yield svc
+    await svc.close()
+
+
+def body(data) -> bytes:
+    # API 응답처럼 들여쓰기 / 개행이 있는 JSON
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+class FakeSearch:
+    def __init__(self, video_ids):
+        self.video_ids = video_ids
+        self.lookups = []
+
+    async def get_comment_video_ids(self, comment_ids):
+        self.lookups.append(sorted(comment_ids))
+        return {c: self.video_ids[c] for c in comment_ids if c in self.video_ids}
+
+
+@pytest.mark.asyncio
+async def test_archive_writes_one_line_per_response_without_api_key(archive):
+    await archive.append("/videos", {"id": "VID1", "key": "secret"}, body({"items": [{"text": "줄\n바꿈"}]}))
+    await archive.append("/videos", {"id": "VID2"}, body({"items": []}))
+    archive.close()
+
+    [segment] = archive.segments("/videos")
+    assert segment.parent.name == "videos"
+    with gzip.open(segment, "rb") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["params"] for r in records] == [{"id": "VID1"}, {"id": "VID2"}]
+    assert records[0]["body"]["items"][0]["text"] == "줄\n바꿈"
+
+@pytest.mark.asyncio
+async def test_archive_rotates_segments_and_reads_open_segment_after_flush(tmp_path):
+    archive = ResponseArchive(str(tmp_path), segment_max_bytes=1)
+    await archive.append("/comments", {"parentId": "C1"}, body({"items": []}))
+    await archive.append("/comments", {"parentId": "C2"}, body({"items": []}))
+    archive.flush()
+
+    segments = archive.segments("/comments")
+    assert len(segments) == 2
+    # 마지막 segment 는 아직 열려 있음 (trailer 없음) → flush 된 줄까지 읽힘
+    assert [json.loads(l)["params"]["parentId"] for s in segments for l in archive.iter_lines(s)] == ["C1", "C2"]
+    archive.close()
+
+@pytest.mark.asyncio
+async def test_business_service_archives_only_fresh_200_responses(monkeypatch, service, archive):
+    responses = [
+        httpx.Response(404, json={"error": {"errors": [{"reason": "videoNotFound"}]}}),
+        httpx.Response(200, json={"items": [video_item("VID1")]}),
+    ]
+
+    async def fake_get(path, params=None, headers=None):
+        return responses.pop(0)
+    monkeypatch.setattr(service.client, "get", fake_get)
+
+    with pytest.raises(HTTPException):
+        await service.get_videos_details(["VID1"], lean=True)
+    await service.get_videos_details(["VID1"], lean=True)
+    archive.close()
+
+    lines = [json.loads(l) for s in archive.segments("/videos") for l in archive.iter_lines(s)]
+    assert len(lines) == 1
+    assert lines[0]["body"]["items"][0]["id"] == "VID1"
+    assert "key" not in lines[0]["params"]
+
+@pytest.mark.asyncio
+async def test_archiving_service_requests_full_responses(monkeypatch, service, archive):
+    # fields= 로 줄인 응답을 보관하면 나중에 매핑을 바꿔도 replay 할 수 없으므로 전체 응답을 요청
+    sent = []
+    async def fake_get(path, params=None, headers=None):
+        sent.append((path, params.get("part"), params.get("fields")))
+        if path == "/videos":
+            return httpx.Response(200, json={"items": [video_item("VID1")]})
+        return httpx.Response(200, json={"items": [thread_item("VID1", "T1")]})
+    monkeypatch.setattr(service.client, "get", fake_get)
+
+    videos = await service.get_videos_details(["VID1"], lean=True)
+    threads = await service.get_comment_threads("VID1", lean=True)
+    archive.close()
+
+    assert videos["VID1"].snippet.title and threads.items[0].id == "T1"
+    assert sent == [
+        ("/videos", "snippet,contentDetails,statistics,status", None),
+        ("/commentThreads", "snippet,replies", None),
+    ]
+    lines = [json.loads(l) for s in archive.segments("/videos") for l in archive.iter_lines(s)]
+    assert lines[0]["body"]["items"][0]["kind"] == "youtube#video"
+
+@pytest.mark.asyncio
+async def test_replay_writes_videos_before_comments(archive):
+    # 댓글 응답이 영상 응답보다 먼저 아카이브되어도 영상 → 댓글 → 답글 순서로 저장
+    await archive.append("/comments", {"parentId": "T1"}, body({"items": [
+        {"id": "R2", "etag": "e", "snippet": thread_item("VID1", "R2")["snippet"]["topLevelComment"]["snippet"]},
+    ]}))
+    await archive.append("/comments", {"parentId": "OLD"}, body({"items": [
+        {"id": "R9", "etag": "e", "snippet": thread_item("VID0", "R9")["snippet"]["topLevelComment"]["snippet"]},
+    ]}))
+    await archive.append("/commentThreads", {"videoId": "VID1"}, body({"items": [thread_item("VID1", "T1", ["R1"])]}))
+    await archive.append("/videos", {"id": "VID0,VID1"}, body({"items": [video_item("VID0"), video_item("VID1")]}))
+    archive.close()
+
+    tx = FakeTx()
+    search = FakeSearch({"OLD": "VID0"})
+    stats = await ArchiveReplay(archive, tx, search).run()
+
+    assert [v["video_id"] for v in tx.videos] == ["VID0", "VID1"]
+    assert [(c["comment_id"], c["video_id"], c["parent_comment_id"]) for c in tx.comments] == [
+        ("T1", "VID1", None),
+        ("R1", "VID1", "T1"),
+        ("R2", "VID1", "T1"),
+        ("R9", "VID0", "OLD"),
+    ]
+    # 이번 replay 에 없는 스레드만 DB 에서 조회
+    assert search.lookups == [["OLD"]]
+    assert (stats.records, stats.videos, stats.comments, stats.failures) == (4, 2, 4, [])
+    # replay 는 더 최근에 수집된 영상 row 를 덮어쓰지 않음
+    assert tx.skip_stale == [True]
+
+@pytest.mark.asyncio
+async def test_replay_skips_corrupt_lines_and_filters_by_day(archive):
+    await archive.append("/videos", {}, body({"items": [video_item("VID1")]}))
+    archive.close()
+    [segment] = archive.segments("/videos")
+    with gzip.open(segment, "ab") as f:
+        f.write(b'{"ts": "broken"}\n')
+
+    tx = FakeTx()
+    stats = await ArchiveReplay(archive, tx).run()
+    assert [v["video_id"] for v in tx.videos] == ["VID1"]
+    assert [f.stage for f in stats.failures] == ["decode"]
+
+    day = datetime.date.fromisoformat(segment.parent.parent.name)
+    assert archive.segments("/videos", since=day, until=day) == [segment]
+    next_day = day + datetime.timedelta(days=1)
+    assert archive.segments("/videos", since=next_day) == []
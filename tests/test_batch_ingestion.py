@@ -0,0 +1,57 @@
+"""
+Tests for multi-channel batch ingestion
+Author: sg.kim
+Date: 2026-10-17
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.service.end_point.batch import BatchJob, ChannelProgress, run_batch
+
+
+def make_job(handles):
+    return BatchJob(page_limit=1, channels=[ChannelProgress(handle=h) for h in handles])
+
+
+@pytest.mark.asyncio
+async def test_run_batch_bounds_channels_and_reports_progress():
+    in_flight = max_in_flight = 0
+
+    async def ingest(handle, stats):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        stats.videos += 2
+        stats.comments += 10
+        in_flight -= 1
+
+    job = make_job([f"@ch{i}" for i in range(7)])
+    await run_batch(job, ingest, workers=3)
+
+    assert max_in_flight == 3
+    assert job.status == "done"
+    assert job.progress == {"total": 7, "queued": 0, "running": 0, "done": 7, "failed": 0}
+    assert job.videos == 14 and job.comments == 70
+    assert all(c.comments_per_second for c in job.channels)
+
+@pytest.mark.asyncio
+async def test_run_batch_isolates_channel_failures():
+    async def ingest(handle, stats):
+        if handle == "@bad":
+            raise HTTPException(status_code=404, detail="Channel not found")
+        stats.videos += 1
+
+    job = make_job(["@a", "@bad", "@b"])
+    await run_batch(job, ingest, workers=2)
+
+    assert [(c.handle, c.status, c.error) for c in job.channels] == [
+        ("@a", "done", None),
+        ("@bad", "failed", "Channel not found"),
+        ("@b", "done", None),
+    ]
+    dumped = job.model_dump(mode="json")
+    assert dumped["progress"]["failed"] == 1
+    assert dumped["channels"][0]["stats"]["videos"] == 1
@@ -0,0 +1,80 @@
+"""
+Tests for EtagCache and conditional requests in YouTubeBusinessService
+Author: sg.kim
+Date: 2026-10-17
+"""
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.service.business.youtube import YouTubeBusinessService
+from app.utils.cache import EtagCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = EtagCache(str(tmp_path / "etag.sqlite3"), max_entries=2)
+    yield c
+    c.close()
+
+@pytest_asyncio.fixture
+async def service(cache):
+    svc = YouTubeBusinessService(cache=cache)
+    yield svc
+    await svc.close()
+
+
+def test_make_key_ignores_api_key():
+    a = EtagCache.make_key("/videos", {"id": "VID1", "key": "k1"})
+    b = EtagCache.make_key("/videos", {"key": "k2", "id": "VID1"})
+    assert a == b
+    assert a != EtagCache.make_key("/videos", {"id": "VID2", "key": "k1"})
+
+@pytest.mark.asyncio
+async def test_lru_eviction(cache):
+    await cache.put("a", "e1", b"A")
+    await cache.put("b", "e2", b"B")
+    assert await cache.get("a") == ("e1", b"A")  # a 를 최근 사용으로 갱신
+    await cache.put("c", "e3", b"C")
+
+    assert len(cache) == 2
+    assert await cache.get("b") is None
+    assert await cache.get("c") == ("e3", b"C")
+
+@pytest.mark.asyncio
+async def test_not_modified_is_served_from_cache(monkeypatch, service):
+    body = {"kind": "youtube#videoListResponse", "etag": "E1", "items": [], "pageInfo": {"totalResults": 7}}
+    sent_headers = []
+    async def fake_get(path, params=None, headers=None):
+        sent_headers.append(headers)
+        if headers and headers.get("If-None-Match") == "E1":
+            return httpx.Response(304)
+        return httpx.Response(200, json=body, headers={"ETag": "E1"})
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    first = await service.get_video_details("VID123")
+    second = await service.get_video_details("VID123")
+
+    assert sent_headers == [None, {"If-None-Match": "E1"}]
+    assert first == second
+    assert second.pageInfo["totalResults"] == 7
+
+@pytest.mark.asyncio
+async def test_cache_io_is_not_timed(monkeypatch, service):
+    body = {"kind": "youtube#videoListResponse", "etag": "E1", "items": [], "pageInfo": {}}
+    service.resilience.timeouts["/videos"] = 0.05
+    real_get = service.cache.get
+    async def slow_cache_get(key):
+        await asyncio.sleep(0.1)  # 느린 디스크 I/O 는 endpoint timeout 에 포함되지 않아야 함
+        return await real_get(key)
+    async def fake_get(path, params=None, headers=None):
+        return httpx.Response(200, json=body, headers={"ETag": "E1"})
+    monkeypatch.setattr(service.cache, 'get', slow_cache_get)
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    await service.get_video_details("VID123")
+
+    assert service.resilience_status()["counters"].get("timeouts", 0) == 0
+    assert max(service.resilience.latency._samples["/videos"]) < 0.05
@@ -0,0 +1,113 @@
+"""
+Tests for ChannelBusinessService (handle → channel / uploads playlist cache)
+Author: sg.kim
+Date: 2026-10-17
+"""
+import datetime
+
+import pytest
+
+from app.model.youtube.response import ChannelItem
+from app.schema.public import YoutubeChannel
+from app.service.business.channel import ChannelBusinessService
+
+
+def channel_item(channel_id="UC123", custom_url="@BandJannabi"):
+    return ChannelItem.model_validate({
+        "id": channel_id,
+        "snippet": {"title": "잔나비", "publishedAt": "2014-01-01T00:00:00Z", "customUrl": custom_url},
+        "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}},
+    })
+
+
+class FakeYouTube:
+    def __init__(self):
+        self.calls = []
+
+    async def get_channel_by_handle(self, handle):
+        self.calls.append(("handle", handle))
+        return channel_item()
+
+    async def get_channel_by_id(self, channel_id):
+        self.calls.append(("id", channel_id))
+        return channel_item(channel_id)
+
+
+class FakeStore:
+    """SearchBusinessService / TransactionBusinessService 역할 (메모리)"""
+    def __init__(self):
+        self.rows = {}
+
+    async def get_channel(self, channel_id):
+        return self.rows.get(channel_id)
+
+    async def get_channel_by_handle(self, handle):
+        return next((r for r in self.rows.values() if r.handle == handle), None)
+
+    async def upsert_channel(self, channel_data):
+        # ON CONFLICT 처럼 넘어온 컬럼만 덮어씀
+        current = self.rows.get(channel_data["channel_id"])
+        merged = {**current.model_dump(), **channel_data} if current else channel_data
+        self.rows[channel_data["channel_id"]] = YoutubeChannel(**merged)
+
+
+@pytest.fixture
+def youtube():
+    return FakeYouTube()
+
+@pytest.fixture
+def store():
+    return FakeStore()
+
+
+@pytest.mark.asyncio
+async def test_resolve_handle_uses_cache(youtube, store):
+    service = ChannelBusinessService(youtube, store, store)
+
+    first = await service.resolve_handle("@BandJannabi")
+    second = await service.resolve_handle("bandjannabi")
+
+    assert youtube.calls == [("handle", "@bandjannabi")]
+    assert first.uploads_playlist_id == second.uploads_playlist_id == "UU123"
+    # 핸들로 저장된 채널은 채널ID 조회에도 사용됨
+    assert await service.get_uploads_playlist_id("UC123") == "UU123"
+    assert len(youtube.calls) == 1
+
+@pytest.mark.asyncio
+async def test_resolve_handle_refreshes_after_ttl(youtube, store):
+    service = ChannelBusinessService(youtube, store, store, ttl=60)
+
+    await service.resolve_handle("@BandJannabi")
+    store.rows["UC123"].resolved_at -= datetime.timedelta(seconds=61)
+    await service.resolve_handle("@BandJannabi")
+
+    assert len(youtube.calls) == 2
+
+@pytest.mark.asyncio
+async def test_resolve_channel_id_stores_handle_from_custom_url(youtube, store):
+    service = ChannelBusinessService(youtube, store, store)
+
+    assert await service.get_uploads_playlist_id("UC999") == "UU999"
+    item = await service.get_channel_by_handle("@BandJannabi")
+
+    assert youtube.calls == [("id", "UC999")]
+    assert item.id == "UC999"
+    assert item.contentDetails.relatedPlaylists.uploads == "UU999"
+    assert item.snippet.publishedAt == "2014-01-01T00:00:00Z"
+
+@pytest.mark.asyncio
+async def test_refresh_without_custom_url_keeps_cached_handle(youtube, store):
+    service = ChannelBusinessService(youtube, store, store, ttl=60)
+    await service.resolve_handle("@BandJannabi")
+    store.rows["UC123"].resolved_at -= datetime.timedelta(seconds=61)
+
+    async def without_custom_url(channel_id):
+        youtube.calls.append(("id", channel_id))
+        return channel_item(channel_id, custom_url=None)
+    youtube.get_channel_by_id = without_custom_url
+
+    channel = await service.resolve_channel_id("UC123")
+    await service.resolve_handle("@BandJannabi")
+
+    assert channel.handle == store.rows["UC123"].handle == "@bandjannabi"
+    assert youtube.calls == [("handle", "@bandjannabi"), ("id", "UC123")]
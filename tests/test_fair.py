@@ -0,0 +1,64 @@
+"""
+Tests for FairScheduler
+Author: sg.kim
+Date: 2026-10-17
+"""
+import asyncio
+
+import pytest
+
+from app.utils.fair import FairScheduler
+
+
+@pytest.mark.asyncio
+async def test_slots_are_granted_round_robin_across_keys():
+    scheduler = FairScheduler(concurrency=1)
+    order = []
+
+    async def call(key, i):
+        async with scheduler.slot(key):
+            order.append(f"{key}{i}")
+            await asyncio.sleep(0)
+
+    # 큰 채널(a)이 먼저 잔뜩 대기열에 들어가도 b, c 가 번갈아 슬롯을 받음
+    async with scheduler.slot("a"):
+        tasks = [asyncio.create_task(call("a", i)) for i in range(4)]
+        tasks += [asyncio.create_task(call("b", i)) for i in range(2)]
+        tasks += [asyncio.create_task(call("c", 0))]
+        await asyncio.sleep(0)
+        assert scheduler.snapshot()["waiting"] == {"a": 4, "b": 2, "c": 1}
+    await asyncio.gather(*tasks)
+
+    assert order == ["a0", "b0", "c0", "a1", "b1", "a2", "a3"]
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    scheduler = FairScheduler(concurrency=3)
+    in_flight = max_in_flight = 0
+
+    async def call(key):
+        nonlocal in_flight, max_in_flight
+        async with scheduler.slot(key):
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+    await asyncio.gather(*(call(i % 5) for i in range(30)))
+
+    assert max_in_flight == 3
+    assert scheduler.snapshot() == {"concurrency": 3, "active": 0, "waiting": {}}
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    scheduler = FairScheduler(concurrency=1)
+
+    async with scheduler.slot("a"):
+        waiter = asyncio.create_task(scheduler.slot("b").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    async with scheduler.slot("c"):
+        assert scheduler.snapshot()["active"] == 1
+    assert scheduler.snapshot() == {"concurrency": 1, "active": 0, "waiting": {}}
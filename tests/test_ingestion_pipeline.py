@@ -0,0 +1,490 @@
+"""
+Tests for IngestionPipeline
+Author: sg.kim
+Date: 2026-10-17
+"""
+import asyncio
+import datetime
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.config import IngestionSettings
+from app.model.youtube.response import (
+    PlaylistItemsListResponse,
+    VideosListResponse,
+    CommentThreadsListResponse,
+    CommentsListResponse,
+)
+from app.schema.public import YoutubeChannelSync
+from app.service.business.youtube import YouTubeBusinessService
+from app.service.end_point.pipeline import IngestionPipeline
+from app.service.end_point.youtube import YouTubeEndPointService
+
+
+DEFAULT_PUBLISHED = "2025-04-25T04:00:44Z"
+
+
+def playlist_page(video_ids, next_token=None, published=None):
+    published = published or {}
+    return PlaylistItemsListResponse.model_validate({
+        "kind": "youtube#playlistItemListResponse",
+        "etag": "etag",
+        "items": [
+            {
+                "kind": "youtube#playlistItem",
+                "etag": "etag",
+                "snippet": {
+                    "publishedAt": "2025-04-25T04:00:44Z", "channelId": "UC123", "title": vid,
+                    "description": "", "thumbnails": {}, "channelTitle": "ch", "playlistId": "UU123",
+                    "position": i,
+                },
+                "contentDetails": {"videoId": vid, "videoPublishedAt": published.get(vid, DEFAULT_PUBLISHED)},
+            }
+            for i, vid in enumerate(video_ids)
+        ],
+        "nextPageToken": next_token,
+        "pageInfo": {"totalResults": len(video_ids), "resultsPerPage": 50},
+    })
+
+def video_item(vid, published_at=DEFAULT_PUBLISHED):
+    return {
+        "kind": "youtube#video",
+        "etag": "etag",
+        "id": vid,
+        "snippet": {
+            "publishedAt": published_at, "channelId": "UC123", "title": "제목",
+            "description": "설명", "thumbnails": {}, "channelTitle": "ch",
+        },
+        "statistics": {"viewCount": "10", "likeCount": "1", "commentCount": "1"},
+    }
+
+def comment_snippet(text="댓글"):
+    return {
+        "authorDisplayName": "user", "authorProfileImageUrl": "", "authorChannelId": {"value": "UCa"},
+        "textDisplay": text, "likeCount": 0,
+        "publishedAt": "2025-04-25T04:00:44Z", "updatedAt": "2025-04-25T04:00:44Z",
+    }
+
+def thread_item(vid, cid, replies=(), total_replies=None):
+    return {
+        "kind": "youtube#commentThread",
+        "etag": "etag",
+        "id": cid,
+        "snippet": {
+            "videoId": vid,
+            "topLevelComment": {"kind": "youtube#comment", "etag": "etag", "id": cid, "snippet": comment_snippet()},
+            "canReply": True,
+            "totalReplyCount": len(replies) if total_replies is None else total_replies,
+            "isPublic": True,
+        },
+        "replies": {"comments": [
+            {"kind": "youtube#comment", "etag": "etag", "id": rid, "snippet": comment_snippet()}
+            for rid in replies
+        ]},
+    }
+
+
+class FakeBusiness:
+    def __init__(self, pages, fail_video=None, delay=0.0, total_replies=None, published=None, fail_comments=()):
+        self.pages = pages
+        self.fail_comments = set(fail_comments)
+        self.published = published or {}
+        self.playlist_calls = 0
+        self.total_replies = total_replies
+        self.fail_video = fail_video
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.since = {}
+
+    async def _track(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+    async def get_playlist_items(self, playlist_id, page_token=None, max_results=50, lean=False):
+        self.playlist_calls += 1
+        index = int(page_token or 0)
+        next_token = str(index + 1) if index + 1 < len(self.pages) else None
+        return playlist_page(self.pages[index], next_token, self.published)
+
+    async def get_videos_details(self, video_ids, lean=False):
+        await self._track()
+        if self.fail_video in video_ids:
+            raise RuntimeError("boom")
+        resp = VideosListResponse.model_validate({
+            "kind": "youtube#videoListResponse", "etag": "etag",
+            "items": [video_item(vid, self.published.get(vid, DEFAULT_PUBLISHED)) for vid in video_ids],
+            "pageInfo": {},
+        })
+        return {item.id: item for item in resp.items}
+
+    async def iter_comment_threads(self, video_id, max_pages=None, max_threads=None, since=None, lean=False):
+        await self._track()
+        self.since[video_id] = since
+        if video_id in self.fail_comments:
+            raise RuntimeError("comments boom")
+        resp = CommentThreadsListResponse.model_validate({
+            "items": [thread_item(video_id, f"{video_id}-c1", replies=[f"{video_id}-c1-r1"],
+                                  total_replies=self.total_replies)],
+        })
+        yield resp.items
+
+    async def iter_comment_replies(self, parent_id, lean=False):
+        await self._track()
+        resp = CommentsListResponse.model_validate({
+            "items": [
+                {"kind": "youtube#comment", "etag": "etag", "id": f"{parent_id}-r{i}", "snippet": comment_snippet()}
+                for i in range(1, self.total_replies + 1)
+            ],
+        })
+        yield resp.items
+
+
+class FakeTx:
+    def __init__(self):
+        self.videos = []
+        self.comments = []
+        self.bulk_loads = []
+        self.skip_stale = []
+
+    async def insert_youtube_videos_bulk(self, videos_data, skip_stale=False):
+        self.skip_stale.append(skip_stale)
+        self.videos += videos_data
+        return len(videos_data)
+
+    async def insert_youtube_comments_bulk(self, comments_data):
+        # 댓글은 영상 row 가 먼저 저장되어 있어야 함 (FK)
+        saved = {v["video_id"] for v in self.videos}
+        assert all(c["video_id"] in saved for c in comments_data)
+        self.comments += comments_data
+        return len(comments_data)
+
+    async def bulk_load_comments(self, comments_data):
+        self.bulk_loads.append(len(comments_data))
+        return await self.insert_youtube_comments_bulk(comments_data)
+
+
+class FakeSearch:
+    def __init__(self, latest):
+        self.latest = latest
+
+    async def get_latest_comment_published_at(self, video_id):
+        return self.latest.get(video_id)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ingests_all_pages():
+    business = FakeBusiness([["v1", "v2"], ["v3"]])
+    tx = FakeTx()
+    pipeline = IngestionPipeline(business, tx, IngestionSettings(queue_size=1))
+
+    stats = await pipeline.run("UU123", page_limit=5)
+
+    assert sorted(v["video_id"] for v in tx.videos) == ["v1", "v2", "v3"]
+    assert stats.videos == 3
+    assert stats.comments == 6
+    assert not stats.failures
+
+@pytest.mark.asyncio
+async def test_pipeline_expands_missing_replies():
+    business = FakeBusiness([["v1", "v2"]], total_replies=3)
+    tx = FakeTx()
+
+    await IngestionPipeline(business, tx).run("UU123", page_limit=1)
+
+    replies = {c["comment_id"] for c in tx.comments if c["parent_comment_id"] == "v1-c1"}
+    assert replies == {"v1-c1-r1", "v1-c1-r2", "v1-c1-r3"}
+
+@pytest.mark.asyncio
+async def test_pipeline_respects_page_limit():
+    business = FakeBusiness([["v1"], ["v2"], ["v3"]])
+    tx = FakeTx()
+
+    stats = await IngestionPipeline(business, tx).run("UU123", page_limit=2)
+
+    assert stats.videos == 2
+
+@pytest.mark.asyncio
+async def test_pipeline_isolates_failures():
+    business = FakeBusiness([["v1"], ["bad", "v2"], ["v3"]], fail_video="bad")
+    tx = FakeTx()
+
+    stats = await IngestionPipeline(business, tx).run("UU123", page_limit=3)
+
+    assert stats.videos == 2
+    assert [(f.stage, f.item) for f in stats.failures] == [("metadata", "bad,v2")]
+
+@pytest.mark.asyncio
+async def test_pipeline_records_api_client_errors_as_failures(monkeypatch):
+    # 실제 YouTubeBusinessService: 4xx 오류 응답이 빈 결과로 파싱되지 않고 failures 에 기록되어야 함
+    business = YouTubeBusinessService()
+    async def fake_get(path, params=None):
+        if path == "/playlistItems":
+            return httpx.Response(200, json={"items": [{"contentDetails": {"videoId": v}} for v in ("v1", "v2", "v3")]})
+        if path == "/videos":
+            return httpx.Response(200, json={"items": [video_item(v) for v in params["id"].split(",")]})
+        reason = {"v1": (404, "videoNotFound"), "v2": (400, "badRequest"), "v3": (403, "commentsDisabled")}
+        status_code, error = reason[params["videoId"]]
+        return httpx.Response(status_code, json={"error": {"code": status_code, "errors": [{"reason": error}]}})
+    monkeypatch.setattr(business.client, 'get', fake_get)
+    tx = FakeTx()
+
+    try:
+        stats = await IngestionPipeline(business, tx).run("UU123", page_limit=1)
+    finally:
+        await business.close()
+
+    assert stats.videos == 3
+    assert stats.comments == 0
+    assert sorted((f.stage, f.item, f.error) for f in stats.failures) == [
+        ("comments", "v1", "404: videoNotFound"),
+        ("comments", "v2", "400: badRequest"),
+    ]
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_stage_workers_concurrently():
+    business = FakeBusiness([[f"v{i}" for i in range(20)]], delay=0.01)
+    tx = FakeTx()
+    settings = IngestionSettings(metadata_workers=4, comment_workers=4)
+
+    await IngestionPipeline(business, tx, settings).run("UU123", page_limit=1)
+
+    assert business.max_in_flight > 1
+
+@pytest.mark.asyncio
+async def test_pipeline_stops_at_watermark():
+    published = {
+        "v5": "2025-04-05T00:00:00Z", "v4": "2025-04-04T00:00:00Z",
+        "v3": "2025-04-03T00:00:00Z", "v2": "2025-04-02T00:00:00Z",
+    }
+    business = FakeBusiness([["v5", "v4"], ["v3", "v2"], ["v1"]], published=published)
+    tx = FakeTx()
+    watermark = YoutubeChannelSync(
+        channel_id="UC123", last_video_id="v3", last_published_at=datetime.datetime(2025, 4, 3),
+    )
+
+    stats = await IngestionPipeline(business, tx).run("UU123", page_limit=5, watermark=watermark)
+
+    assert sorted(v["video_id"] for v in tx.videos) == ["v4", "v5"]
+    assert business.playlist_calls == 2
+    assert stats.reached_watermark
+    assert stats.newest_video_id == "v5"
+    assert stats.newest_published_at == datetime.datetime(2025, 4, 5)
+
+@pytest.mark.asyncio
+async def test_watermark_is_kept_when_page_limit_stops_before_it():
+    published = {"v5": "2025-04-05T00:00:00Z", "v4": "2025-04-04T00:00:00Z", "v3": "2025-04-03T00:00:00Z"}
+    business = FakeBusiness([["v5"], ["v4"], ["v3"]], published=published)
+    state = YoutubeChannelSync(
+        channel_id="UC123", last_video_id="v3", last_published_at=datetime.datetime(2025, 4, 3),
+    )
+
+    stats = await IngestionPipeline(business, FakeTx()).run("UU123", page_limit=1, watermark=state)
+    assert not stats.reached_watermark and not stats.reached_end
+
+    # v4 를 아직 못 봤으므로 watermark 를 v5 로 올리면 v4 는 영영 수집되지 않음
+    kept = YouTubeEndPointService._next_sync_state("UC123", "@ch", state, stats)
+    assert (kept["last_video_id"], kept["last_published_at"]) == ("v3", datetime.datetime(2025, 4, 3))
+
+    stats = await IngestionPipeline(business, FakeTx()).run("UU123", page_limit=5, watermark=state)
+    moved = YouTubeEndPointService._next_sync_state("UC123", "@ch", state, stats)
+    assert moved["last_video_id"] == "v5"
+
+@pytest.mark.asyncio
+async def test_polls_resume_paging_until_the_watermark_is_reached():
+    published = {
+        "v6": "2025-04-06T00:00:00Z", "v5": "2025-04-05T00:00:00Z",
+        "v4": "2025-04-04T00:00:00Z", "v3": "2025-04-03T00:00:00Z",
+    }
+    business = FakeBusiness([["v6"], ["v5"], ["v4"], ["v3"]], published=published)
+    state = YoutubeChannelSync(
+        channel_id="UC123", last_video_id="v3", last_published_at=datetime.datetime(2025, 4, 3),
+    )
+    tx = FakeTx()
+
+    # page_limit=1 로 매번 한 페이지씩: 멈춘 페이지 토큰부터 이어서 내려가고, watermark 는 끝까지 내려간 뒤에 이동
+    for expected_token in ("1", "2", "3"):
+        stats = await IngestionPipeline(business, tx).run(
+            "UU123", page_limit=1, watermark=state, page_token=state.resume_page_token,
+        )
+        state = YoutubeChannelSync(**YouTubeEndPointService._next_sync_state("UC123", "@ch", state, stats))
+        assert (state.last_video_id, state.resume_page_token, state.pending_video_id) == ("v3", expected_token, "v6")
+
+    stats = await IngestionPipeline(business, tx).run(
+        "UU123", page_limit=1, watermark=state, page_token=state.resume_page_token,
+    )
+    assert stats.reached_watermark
+    state = YoutubeChannelSync(**YouTubeEndPointService._next_sync_state("UC123", "@ch", state, stats))
+    assert (state.last_video_id, state.last_published_at) == ("v6", datetime.datetime(2025, 4, 6))
+    assert (state.resume_page_token, state.pending_video_id) == (None, None)
+    assert [v["video_id"] for v in tx.videos] == ["v6", "v5", "v4"]
+
+@pytest.mark.asyncio
+async def test_playlist_failure_drops_the_resume_token():
+    business = FakeBusiness([["v1"]])
+    async def expired(*args, **kwargs):
+        raise HTTPException(status_code=400, detail="invalid page token")
+    business.get_playlist_items = expired
+    state = YoutubeChannelSync(
+        channel_id="UC123", last_video_id="v0", last_published_at=datetime.datetime(2025, 4, 1),
+        resume_page_token="stale", pending_video_id="v9", pending_published_at=datetime.datetime(2025, 4, 9),
+    )
+
+    stats = await IngestionPipeline(business, FakeTx()).run(
+        "UU123", page_limit=1, watermark=state, page_token=state.resume_page_token,
+    )
+    state = YoutubeChannelSync(**YouTubeEndPointService._next_sync_state("UC123", "@ch", state, stats))
+    assert (state.last_video_id, state.resume_page_token, state.pending_video_id) == ("v0", None, "v9")
+
+@pytest.mark.asyncio
+async def test_comment_failure_is_retried_after_watermark_moves_past_it():
+    published = {"v5": "2025-04-05T00:00:00Z", "v4": "2025-04-04T00:00:00Z", "v3": "2025-04-03T00:00:00Z"}
+    business = FakeBusiness([["v5", "v4", "v3"]], published=published, fail_comments={"v4"})
+    state = YoutubeChannelSync(
+        channel_id="UC123", last_video_id="v3", last_published_at=datetime.datetime(2025, 4, 3),
+    )
+
+    stats = await IngestionPipeline(business, FakeTx()).run("UU123", page_limit=1, watermark=state)
+    assert [(f.stage, f.video_ids) for f in stats.failures] == [("comments", ["v4"])]
+
+    # 영상은 모두 저장되었으므로 watermark 는 v5 로 올리고, v4 는 따로 기록
+    state = YoutubeChannelSync(**YouTubeEndPointService._next_sync_state("UC123", "@ch", state, stats))
+    assert (state.last_video_id, state.retry_video_ids) == ("v5", "v4")
+
+    # 다음 실행: v4 는 watermark 아래지만 다시 수집, 성공하면 목록에서 빠짐
+    business.fail_comments.clear()
+    tx = FakeTx()
+    stats = await IngestionPipeline(business, tx).run(
+        "UU123", page_limit=1, watermark=state, refresh_video_ids=YouTubeEndPointService._retry_video_ids(state),
+    )
+    assert [v["video_id"] for v in tx.videos] == ["v4"]
+    assert {c["video_id"] for c in tx.comments} == {"v4"}
+    state = YoutubeChannelSync(**YouTubeEndPointService._next_sync_state("UC123", "@ch", state, stats))
+    assert (state.last_video_id, state.retry_video_ids) == ("v5", None)
+
+@pytest.mark.asyncio
+async def test_full_resync_pages_past_watermark_and_records_it():
+    published = {"v5": "2025-04-05T00:00:00Z", "v4": "2025-04-04T00:00:00Z", "v3": "2025-04-03T00:00:00Z"}
+    business = FakeBusiness([["v5", "v4"], ["v3"], ["v2"]], published=published)
+    state = YoutubeChannelSync(
+        channel_id="UC123", last_video_id="v4", last_published_at=datetime.datetime(2025, 4, 4),
+    )
+    tx = FakeTx()
+
+    stats = await IngestionPipeline(business, tx).run("UU123", page_limit=2, watermark=state, full_resync=True)
+
+    assert sorted(v["video_id"] for v in tx.videos) == ["v3", "v4", "v5"]
+    assert stats.reached_watermark and not stats.reached_end
+
+@pytest.mark.asyncio
+async def test_pipeline_delta_syncs_comments_since_latest_stored():
+    latest = datetime.datetime(2025, 4, 20)
+    business = FakeBusiness([["v1", "v2"]])
+    search = FakeSearch({"v1": latest})
+
+    await IngestionPipeline(business, FakeTx(), search=search).run("UU123", page_limit=1)
+    assert business.since == {"v1": latest, "v2": None}
+
+    # full_resync 도 저장된 댓글 이후만 (전체 댓글 재수집은 comment_delta_sync=False)
+    await IngestionPipeline(business, FakeTx(), search=search).run("UU123", page_limit=1, full_resync=True)
+    assert business.since == {"v1": latest, "v2": None}
+
+    no_delta = IngestionSettings(comment_delta_sync=False)
+    await IngestionPipeline(business, FakeTx(), no_delta, search=search).run("UU123", page_limit=1)
+    assert business.since == {"v1": None, "v2": None}
+
+@pytest.mark.asyncio
+async def test_refreshing_a_stored_video_pages_only_new_comments(monkeypatch):
+    # 실제 YouTubeBusinessService: watermark 아래의 저장된 영상을 다시 수집하면 저장된 최신 댓글에서 paging 을 멈춤
+    business = YouTubeBusinessService()
+    thread_pages = []
+    async def fake_get(path, params=None):
+        if path == "/playlistItems":
+            return httpx.Response(200, json={"items": [{"contentDetails": {
+                "videoId": "v1", "videoPublishedAt": DEFAULT_PUBLISHED}}]})
+        if path == "/videos":
+            return httpx.Response(200, json={"items": [video_item(v) for v in params["id"].split(",")]})
+        thread_pages.append(params.get("pageToken"))
+        page = {"items": [thread_item("v1", "new"), thread_item("v1", "stored")], "nextPageToken": "p2"}
+        page["items"][0]["snippet"]["topLevelComment"]["snippet"]["publishedAt"] = "2025-04-26T00:00:00Z"
+        return httpx.Response(200, json=page)
+    monkeypatch.setattr(business.client, 'get', fake_get)
+    state = YoutubeChannelSync(
+        channel_id="UC123", last_video_id="v1", last_published_at=datetime.datetime(2025, 4, 25, 4, 0, 44),
+    )
+    search = FakeSearch({"v1": datetime.datetime(2025, 4, 25, 4, 0, 44)})
+    tx = FakeTx()
+
+    try:
+        stats = await IngestionPipeline(business, tx, search=search).run(
+            "UU123", page_limit=1, watermark=state, refresh_video_ids=["v1"],
+        )
+    finally:
+        await business.close()
+
+    assert stats.reached_watermark and not stats.failures
+    assert [v["video_id"] for v in tx.videos] == ["v1"]
+    assert [c["comment_id"] for c in tx.comments] == ["new"]
+    assert thread_pages == [None]
+
+@pytest.mark.asyncio
+async def test_pipeline_switches_to_bulk_load_above_threshold():
+    business = FakeBusiness([[f"v{i}" for i in range(10)]], total_replies=3)
+
+    small = FakeTx()
+    await IngestionPipeline(business, small).run("UU123", page_limit=1)
+    assert small.bulk_loads == []
+
+    large = FakeTx()
+    stats = await IngestionPipeline(business, large, IngestionSettings(bulk_load_threshold=4)).run(
+        "UU123", page_limit=1
+    )
+    # 작은 batch 들을 모아서 threshold 이상이 되면 COPY 경로 사용
+    assert large.bulk_loads and all(n >= 4 for n in large.bulk_loads)
+    assert stats.comments == len(large.comments) == 50
+
+@pytest.mark.asyncio
+async def test_coalesced_comment_write_failure_is_recorded_for_every_video():
+    video_ids = [f"v{i}" for i in range(10)]
+    business = FakeBusiness([video_ids], total_replies=3)
+
+    class FailingTx(FakeTx):
+        async def insert_youtube_comments_bulk(self, comments_data):
+            raise RuntimeError("db down")
+
+    tx = FailingTx()
+    stats = await IngestionPipeline(business, tx, IngestionSettings(bulk_load_threshold=4)).run(
+        "UU123", page_limit=1
+    )
+
+    # 여러 영상의 batch 를 모아서 저장했어도 실패는 모든 영상에 기록되어 다음 실행에서 다시 수집
+    assert tx.bulk_loads and any(len(f.video_ids) > 1 for f in stats.failures)
+    assert sorted(stats.failed_video_ids()) == sorted(video_ids)
+    assert all(f.item == ",".join(f.video_ids) for f in stats.failures)
+
+@pytest.mark.asyncio
+async def test_empty_comment_pages_are_not_sent_to_the_writer():
+    business = FakeBusiness([["v1", "v2"]])
+    async def no_threads(video_id, **kwargs):
+        yield []
+    business.iter_comment_threads = no_threads
+
+    class RecordingTx(FakeTx):
+        def __init__(self):
+            super().__init__()
+            self.writes = []
+
+        async def insert_youtube_comments_bulk(self, comments_data):
+            self.writes.append(len(comments_data))
+            return await super().insert_youtube_comments_bulk(comments_data)
+
+    tx = RecordingTx()
+    stats = await IngestionPipeline(business, tx).run("UU123", page_limit=1)
+
+    assert stats.failures == [] and stats.comments == 0
+    assert [v["video_id"] for v in tx.videos] == ["v1", "v2"]
+    assert tx.writes == []
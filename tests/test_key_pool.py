@@ -0,0 +1,71 @@
+"""
+Tests for ApiKeyPool and key rotation in YouTubeBusinessService
+Author: sg.kim
+Date: 2026-10-17
+"""
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.service.business.youtube import YouTubeBusinessService
+from app.utils.key_pool import ApiKeyPool
+from app.utils.rate_limit import QuotaExhaustedError
+
+
+def quota_error():
+    return httpx.Response(403, json={"error": {"code": 403, "errors": [{"reason": "quotaExceeded"}]}})
+
+def empty_videos():
+    return httpx.Response(200, json={"kind": "youtube#videoListResponse", "etag": "etag", "items": [], "pageInfo": {}})
+
+
+def test_acquire_spreads_usage_across_keys():
+    pool = ApiKeyPool(["key-a", "key-b"], daily_budget_per_key=10)
+    picked = [pool.acquire() for _ in range(4)]
+    assert sorted(picked) == ["key-a", "key-a", "key-b", "key-b"]
+
+def test_acquire_skips_keys_without_budget():
+    pool = ApiKeyPool(["key-a", "key-b"], daily_budget_per_key=2)
+    pool.acquire(2)
+    assert pool.acquire(1) == "key-b"
+    pool.acquire(1)
+    with pytest.raises(QuotaExhaustedError):
+        pool.acquire(1)
+
+def test_quota_error_takes_key_out_of_rotation():
+    pool = ApiKeyPool(["key-a", "key-b"], daily_budget_per_key=100)
+    pool.report_error("key-a", quota_exceeded=True)
+    assert {pool.acquire() for _ in range(3)} == {"key-b"}
+
+    report = pool.snapshot()
+    assert [r["errors"] for r in report] == [1, 0]
+    assert [r["exhausted"] for r in report] == [True, False]
+    assert [r["requests"] for r in report] == [0, 3]
+
+@pytest.mark.asyncio
+async def test_service_rotates_key_on_quota_error(monkeypatch):
+    pool = ApiKeyPool(["first-key-0001", "second-key-0002"], daily_budget_per_key=100)
+    svc = YouTubeBusinessService(key_pool=pool)
+    used_keys = []
+    async def fake_get(path, params=None):
+        used_keys.append(params["key"])
+        return quota_error() if params["key"] == "first-key-0001" else empty_videos()
+    monkeypatch.setattr(svc.client, 'get', fake_get)
+
+    await svc.get_video_details("VID123")
+    await svc.get_video_details("VID123")
+
+    assert used_keys == ["first-key-0001", "second-key-0002", "second-key-0002"]
+    await svc.close()
+
+@pytest.mark.asyncio
+async def test_service_raises_429_when_every_key_is_exhausted(monkeypatch):
+    svc = YouTubeBusinessService(key_pool=ApiKeyPool(["only-key-0001"], daily_budget_per_key=100))
+    async def fake_get(path, params=None):
+        return quota_error()
+    monkeypatch.setattr(svc.client, 'get', fake_get)
+
+    with pytest.raises(HTTPException) as exc:
+        await svc.get_video_details("VID123")
+    assert exc.value.status_code == 429
+    await svc.close()
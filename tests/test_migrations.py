@@ -0,0 +1,165 @@
+"""
+Tests for schema migrations and work-queue query plans
+Author: sg.kim
+Date: 2026-10-17
+"""
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import make_url, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.migrations import MIGRATIONS, upgrade
+from app.database.migrations.data import unescape_text
+from app.database.migrations.runner import _apply
+from app.database.partitions import partition_month
+from app.schema.public import metadata
+from app.service.business.search import SearchBusinessService
+
+
+def test_migration_versions_are_unique_and_ordered():
+    versions = [m.version for m in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+
+def test_migrations_cover_every_table_and_index_in_the_models():
+    # 모델에 테이블 / index 를 추가했으면 migration 도 추가해야 함
+    sql = "\n".join(s for m in MIGRATIONS for s in m.statements)
+    for table in metadata.sorted_tables:
+        assert f"public.{table.name} (" in sql, table.name
+        for index in table.indexes:
+            assert index.name in sql, index.name
+
+
+class FakeConnection:
+    """SELECT 는 테이블별로 준비한 row 를 한 번 돌려주고, 실행한 문장 / 파라미터를 기록"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((str(stmt), params))
+        rows = []
+        if str(stmt).startswith("SELECT"):
+            table_name = next(t for t in self.rows if f"public.{t}" in str(stmt))
+            rows, self.rows[table_name] = self.rows[table_name], []
+        return FakeResult(rows)
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+@pytest.mark.asyncio
+async def test_utf8_text_migration_converts_only_escaped_values():
+    published = datetime(2025, 4, 1)
+    conn = FakeConnection({
+        "youtube_video": [("v1", "\\ud55c\\uad6d", "plain \\ backslash")],
+        "youtube_comment": [("c1", published, "line\\nbreak"), ("c2", published, "이미 UTF-8 \\n")],
+    })
+
+    await unescape_text(conn)
+
+    updates = [params for sql, params in conn.executed if sql.startswith("UPDATE")]
+    assert updates == [
+        [{"b_video_id": "v1", "b_title": "한국", "b_description": "plain \\ backslash"}],
+        [{"b_comment_id": "c1", "b_published_at": published, "b_text_display": "line\nbreak"}],
+    ]
+
+@pytest.mark.asyncio
+async def test_data_migration_runs_before_its_version_is_recorded():
+    calls = []
+    async def run(conn):
+        calls.append("run")
+    conn = FakeConnection({})
+    migration = MIGRATIONS[0].model_copy(update={"statements": [], "run": run})
+
+    await _apply(conn, migration)
+
+    assert calls == ["run"]
+    assert "schema_migrations" in conn.executed[-1][0]
+    assert next(m for m in MIGRATIONS if m.name == "utf8_text").run is unescape_text
+
+@pytest_asyncio.fixture
+async def engine():
+    """
+    TEST_DATABASE_URL 서버에 일회용 database 를 만들어 migration 적용 → 테스트 후 삭제
+    (앱 DB 에는 절대 접속하지 않음, migration 이 public 스키마에 고정이라 스키마 대신 database 단위로 분리)
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    server_url = make_url(url)
+    name = f"ytc_test_{uuid.uuid4().hex[:12]}"
+
+    admin = create_async_engine(server_url, isolation_level="AUTOCOMMIT")
+    try:
+        async with asyncio.timeout(3):
+            async with admin.connect() as conn:
+                await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    except Exception:
+        await admin.dispose()
+        pytest.skip("PostgreSQL at TEST_DATABASE_URL is not reachable")
+
+    engine = create_async_engine(server_url.set(database=name))
+    try:
+        await upgrade(engine)
+        yield engine
+    finally:
+        await engine.dispose()
+        async with admin.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        await admin.dispose()
+
+async def plan_scans(engine, stmt):
+    """EXPLAIN (seq scan 을 최대한 피하도록 설정) → (노드 종류, 테이블) 목록"""
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+
+    scans, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if "Relation Name" in node:
+            scans.append((node["Node Type"], node["Relation Name"]))
+        stack += node.get("Plans", [])
+    return scans
+
+
+@pytest.mark.asyncio
+async def test_upgrade_is_idempotent(engine):
+    assert await upgrade(engine) == []
+
+@pytest.mark.asyncio
+async def test_pending_videos_query_uses_partial_index(engine):
+    scans = await plan_scans(engine, SearchBusinessService.pending_videos_query("v0", 50))
+    assert ("Seq Scan", "youtube_video") not in scans
+
+@pytest.mark.asyncio
+async def test_pending_comments_query_uses_indexes(engine):
+    scans = await plan_scans(engine, SearchBusinessService.pending_comments_query("c0", 50))
+    assert not [s for s in scans if s[0] == "Seq Scan"], scans
+
+@pytest.mark.asyncio
+async def test_video_velocity_query_uses_brin_range_scan(engine):
+    since = datetime(2026, 10, 1)
+    scans = await plan_scans(engine, SearchBusinessService.video_velocity_query(since, 50))
+    assert ("Seq Scan", "youtube_video_stats") not in scans
+
+@pytest.mark.asyncio
+async def test_pending_comments_query_prunes_old_partitions(engine):
+    since = datetime(2026, 10, 1)
+    scans = await plan_scans(engine, SearchBusinessService.pending_comments_query("c0", 50, since))
+    months = [partition_month(table) for _, table in scans if table.startswith("youtube_comment_")]
+    assert all(m is None or m >= since.date() for m in months), scans
@@ -0,0 +1,147 @@
+"""
+Tests for youtube_comment partition maintenance (DB 없이 fake engine 으로 SQL 만 확인)
+Author: sg.kim
+Date: 2026-10-17
+"""
+from datetime import date
+
+import pytest
+
+from app.database.partitions import (
+    PartitionMaintenance,
+    add_months,
+    partition_month,
+    partition_name,
+    retention_cutoff,
+)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+    def all(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "pg_inherits" in sql:
+            return FakeResult(list(self.engine.partitions))
+        self.engine.log.append(sql)
+        if sql.startswith("SELECT count(*) FROM public.youtube_comment_default"):
+            month = sql.split("published_at >= '")[1][:10]
+            return FakeResult([self.engine.default_rows.get(month, 0)])
+        if sql.startswith("CREATE TABLE") and any(m in sql for m in self.engine.failing):
+            raise RuntimeError("lock timeout")
+        return FakeResult([])
+
+
+class FakeEngine:
+    def __init__(self, partitions, default_rows=None, failing=()):
+        self.partitions = partitions
+        # default partition 에 들어가 있는 달별 row 수 ('2026-11-01' → 3)
+        self.default_rows = default_rows or {}
+        self.failing = failing
+        self.log = []
+
+    def connect(self):
+        return FakeConnection(self)
+
+    def begin(self):
+        return FakeConnection(self)
+
+
+def test_partition_names_round_trip():
+    assert partition_name(date(2026, 1, 1)) == "youtube_comment_y2026m01"
+    assert partition_month("youtube_comment_y2026m01") == date(2026, 1, 1)
+    assert partition_month("youtube_comment_default") is None
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+@pytest.mark.asyncio
+async def test_creates_only_missing_future_partitions():
+    engine = FakeEngine(["youtube_comment_default", "youtube_comment_y2026m10"])
+    result = await PartitionMaintenance(engine, months_ahead=2).run_once(today=date(2026, 10, 17))
+
+    assert result == {"created": ["youtube_comment_y2026m11", "youtube_comment_y2026m12"]}
+    assert (
+        "CREATE TABLE IF NOT EXISTS public.youtube_comment_y2026m11 PARTITION OF public.youtube_comment "
+        "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')"
+    ) in engine.log
+
+@pytest.mark.asyncio
+async def test_retention_detaches_old_partitions_without_delete():
+    engine = FakeEngine([
+        "youtube_comment_default",
+        "youtube_comment_y2026m07",
+        "youtube_comment_y2026m08",
+        "youtube_comment_y2026m09",
+        "youtube_comment_y2026m10",
+    ])
+    maintenance = PartitionMaintenance(engine, months_ahead=0, retention_months=2)
+    result = await maintenance.run_once(today=date(2026, 10, 17))
+
+    assert result == {"created": [], "detached": ["youtube_comment_y2026m07", "youtube_comment_y2026m08"]}
+    assert "ALTER TABLE public.youtube_comment DETACH PARTITION public.youtube_comment_y2026m07" in engine.log
+    assert not [sql for sql in engine.log if "DELETE" in sql or "DROP" in sql]
+
+@pytest.mark.asyncio
+async def test_retention_can_drop_detached_partitions():
+    engine = FakeEngine(["youtube_comment_y2026m08", "youtube_comment_y2026m10"])
+    result = await PartitionMaintenance(engine, months_ahead=0, retention_months=1, drop=True).run_once(
+        today=date(2026, 10, 17)
+    )
+
+    assert result["dropped"] == ["youtube_comment_y2026m08"]
+    assert "DROP TABLE public.youtube_comment_y2026m08" in engine.log
+
+@pytest.mark.asyncio
+async def test_unpartitioned_table_is_left_alone():
+    engine = FakeEngine([])
+    assert await PartitionMaintenance(engine).run_once(today=date(2026, 10, 17)) == {"created": []}
+    assert engine.log == []
+
+@pytest.mark.asyncio
+async def test_rows_in_default_partition_are_moved_into_the_new_partition():
+    engine = FakeEngine(
+        ["youtube_comment_default", "youtube_comment_y2026m10"], default_rows={"2026-11-01": 3},
+    )
+    result = await PartitionMaintenance(engine, months_ahead=2).run_once(today=date(2026, 10, 17))
+
+    assert result == {"created": ["youtube_comment_y2026m11", "youtube_comment_y2026m12"]}
+    in_month = "published_at >= '2026-11-01' AND published_at < '2026-12-01'"
+    november, december = engine.log[:6], engine.log[6:]
+    assert [sql.split(" ")[0] for sql in november] == ["SET", "SELECT", "CREATE", "DELETE", "CREATE", "INSERT"]
+    assert f"DELETE FROM public.youtube_comment_default WHERE {in_month}" in november
+    assert november[-1] == "INSERT INTO public.youtube_comment_y2026m11 SELECT * FROM moving_youtube_comment_y2026m11"
+    # default 에 row 가 없는 달은 옮기지 않음
+    assert [sql.split(" ")[0] for sql in december] == ["SET", "SELECT", "CREATE"]
+
+@pytest.mark.asyncio
+async def test_failed_partition_is_skipped_not_raised():
+    engine = FakeEngine(["youtube_comment_y2026m10"], failing=("youtube_comment_y2026m11",))
+    result = await PartitionMaintenance(engine, months_ahead=2).run_once(today=date(2026, 10, 17))
+
+    assert result == {"created": ["youtube_comment_y2026m12"]}
+
+def test_retention_cutoff():
+    assert retention_cutoff(None, date(2026, 10, 17)) is None
+    assert retention_cutoff(1, date(2026, 10, 17)) == date(2026, 10, 1)
+    assert retention_cutoff(3, date(2026, 1, 5)) == date(2025, 11, 1)
@@ -0,0 +1,108 @@
+"""
+Tests for the adaptive polling scheduler
+Author: sg.kim
+Date: 2026-10-17
+"""
+import datetime
+
+import pytest
+
+from app.config import PollingSettings
+from app.schema.public import YoutubeChannel
+from app.service.end_point.batch import BatchJob, ChannelProgress, run_batch
+from app.service.end_point.scheduler import PollingScheduler, compute_poll_interval
+
+SETTINGS = PollingSettings(
+    min_interval=900, max_interval=86400, video_target=1, comment_target=200,
+    video_window_days=30, comment_window_days=7,
+)
+
+
+def test_quiet_channels_are_polled_rarely():
+    assert compute_poll_interval(0, 0, SETTINGS) == 86400
+    # 한 달에 영상 3개, 댓글 거의 없음 → 상한
+    assert compute_poll_interval(3, 5, SETTINGS) == 86400
+
+def test_busy_channels_are_polled_often():
+    # 하루 영상 1개 → 하루
+    assert compute_poll_interval(30, 0, SETTINGS) == 86400
+    # 일주일 댓글 200 * 7 * 24 개 → 시간당 200개 → 1시간
+    assert compute_poll_interval(0, 200 * 7 * 24, SETTINGS) == 3600
+    # 폭주 채널도 하한 아래로는 내려가지 않음
+    assert compute_poll_interval(3000, 10 ** 7, SETTINGS) == 900
+
+
+class FakeEndpoint:
+    def __init__(self, failing=(), unfinished=()):
+        self.failing = set(failing)
+        self.unfinished = set(unfinished)
+        self.jobs = []
+
+    def new_batch_job(self, handles, video_page_limit, full_resync=False):
+        job = BatchJob(page_limit=video_page_limit, channels=[ChannelProgress(handle=h.lower()) for h in handles])
+        self.jobs.append(job)
+        return job
+
+    async def run_batch_ingestion(self, job):
+        async def ingest(handle, stats):
+            if handle in self.failing:
+                raise RuntimeError("boom")
+            if handle in self.unfinished:
+                stats.next_page_token = "page-2"
+        return await run_batch(job, ingest, workers=2)
+
+
+class FakeStore:
+    def __init__(self, channels, activity):
+        self.channels = channels
+        self.activity = activity
+        self.schedule = {}
+
+    async def get_due_channels(self, now, limit):
+        return [
+            c for c in self.channels
+            if c.channel_id not in self.schedule or self.schedule[c.channel_id][0] <= now
+        ][:limit]
+
+    async def get_channel_activity(self, channel_id, videos_since, comments_since):
+        return self.activity[channel_id]
+
+    async def update_poll_schedule(self, channel_id, handle, next_poll_at, poll_interval):
+        self.schedule[channel_id] = (next_poll_at, poll_interval)
+
+
+@pytest.mark.asyncio
+async def test_run_once_polls_due_channels_and_persists_schedule():
+    channels = [
+        YoutubeChannel(channel_id="UC1", handle="@busy", watch_yn="Y"),
+        YoutubeChannel(channel_id="UC2", handle="@quiet", watch_yn="Y"),
+        YoutubeChannel(channel_id="UC3", handle="@broken", watch_yn="Y"),
+    ]
+    store = FakeStore(channels, {"UC1": (30, 200 * 7 * 24), "UC2": (0, 0)})
+    endpoint = FakeEndpoint(failing={"@broken"})
+    scheduler = PollingScheduler(endpoint, store, store, SETTINGS.model_copy(update={"failure_retry": 1800}))
+
+    job = await scheduler.run_once()
+
+    assert [c.handle for c in job.channels] == ["@busy", "@quiet", "@broken"]
+    assert {cid: interval for cid, (_, interval) in store.schedule.items()} == {
+        "UC1": 3600, "UC2": 86400, "UC3": 1800,
+    }
+    # 다음 실행에서는 아직 시각이 안 된 채널을 다시 수집하지 않음
+    assert await scheduler.run_once() is None
+    assert len(endpoint.jobs) == 1
+
+    store.schedule["UC2"] = (datetime.datetime(2000, 1, 1), 86400)
+    job = await scheduler.run_once()
+    assert [c.handle for c in job.channels] == ["@quiet"]
+
+@pytest.mark.asyncio
+async def test_unfinished_walk_is_polled_again_soon():
+    channels = [YoutubeChannel(channel_id="UC1", handle="@backlog", watch_yn="Y")]
+    store = FakeStore(channels, {"UC1": (0, 0)})
+    scheduler = PollingScheduler(FakeEndpoint(unfinished={"@backlog"}), store, store, SETTINGS)
+
+    await scheduler.run_once()
+
+    # 조용한 채널이라도 watermark 까지 남은 페이지가 있으면 하한 주기로 이어서 수집
+    assert store.schedule["UC1"][1] == SETTINGS.min_interval
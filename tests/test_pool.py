@@ -0,0 +1,66 @@
+"""
+Tests for engine options and connection pool metrics (DB 없이 실행)
+Author: sg.kim
+Date: 2026-10-17
+"""
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.util import greenlet_spawn
+
+from app.config import DatabaseSettings
+from app.database.pool import InstrumentedAsyncPool, pool_status
+
+
+class FakeConnection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_pool(**kwargs):
+    return InstrumentedAsyncPool(FakeConnection, pool_size=1, max_overflow=1, timeout=0.05, **kwargs)
+
+
+def test_engine_options_come_from_settings():
+    settings = DatabaseSettings(pool_size=3, max_overflow=0, prepared_statement_cache_size=0, statement_timeout=5000)
+    options = settings.get_engine_options()
+
+    assert options["echo"] is False
+    assert options["pool_size"] == 3 and options["max_overflow"] == 0
+    assert options["connect_args"] == {
+        "prepared_statement_cache_size": 0,
+        "server_settings": {"statement_timeout": "5000"},
+    }
+
+@pytest.mark.asyncio
+async def test_pool_counts_checkouts_and_overflow():
+    pool = make_pool()
+    first = await greenlet_spawn(pool.connect)
+    second = await greenlet_spawn(pool.connect)
+
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost/db", pool=pool)
+    status = pool_status(engine)
+    assert status["checked_out"] == 2
+    assert status["overflow"] == 1
+    assert status["checkouts"] == 2
+
+    first.close()
+    second.close()
+    assert pool_status(engine)["checked_out"] == 0
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_pool_records_checkout_timeouts():
+    pool = make_pool()
+    held = [await greenlet_spawn(pool.connect) for _ in range(2)]
+
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+
+    assert pool.stats.timeouts == 1
+    assert pool.stats.checkouts == 2
+    for conn in held:
+        conn.close()
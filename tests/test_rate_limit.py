@@ -0,0 +1,64 @@
+"""
+Tests for QuotaRateLimiter
+Author: sg.kim
+Date: 2026-10-17
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.utils.rate_limit import QuotaRateLimiter, QuotaExhaustedError
+
+
+def limiter(rate=1000.0, burst=10, daily_budget=100):
+    return QuotaRateLimiter(
+        rate=rate,
+        burst=burst,
+        daily_budget=daily_budget,
+        costs={"/videos": 1, "/search": 100},
+    )
+
+@pytest.mark.asyncio
+async def test_daily_budget_is_enforced_per_cost():
+    rl = limiter(daily_budget=102)
+
+    await rl.acquire("/search")
+    await rl.acquire("/videos")
+    await rl.acquire("/videos")
+    with pytest.raises(QuotaExhaustedError):
+        await rl.acquire("/videos")
+
+    snap = rl.snapshot()
+    assert snap["remaining"] == 0
+    assert snap["used_by_endpoint"] == {"/search": 100, "/videos": 2}
+
+@pytest.mark.asyncio
+async def test_unknown_endpoint_uses_default_cost():
+    rl = limiter()
+    assert await rl.acquire("/unknown") == 1
+    assert rl.remaining == 99
+
+@pytest.mark.asyncio
+async def test_rate_is_limited_after_burst():
+    rl = limiter(rate=50.0, burst=2)
+
+    started = time.monotonic()
+    for _ in range(7):
+        await rl.acquire("/videos")
+    elapsed = time.monotonic() - started
+
+    # burst 2개 이후 5개는 초당 50개 속도 → 약 0.1초
+    assert elapsed >= 0.09
+
+@pytest.mark.asyncio
+async def test_callers_are_served_in_order():
+    rl = limiter(rate=100.0, burst=1)
+    order = []
+
+    async def call(i):
+        await rl.acquire("/videos")
+        order.append(i)
+
+    await asyncio.gather(*(call(i) for i in range(5)))
+    assert order == [0, 1, 2, 3, 4]
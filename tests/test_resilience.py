@@ -0,0 +1,159 @@
+"""
+Tests for the resilience layer (retries, timeouts, hedging, circuit breaker)
+Author: sg.kim
+Date: 2026-10-17
+"""
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.model.youtube.response import VideosListResponse
+from app.service.business.youtube import YouTubeBusinessService, create_http_client, settings
+from app.utils.resilience import CircuitBreaker, ResilientCaller, parse_retry_after
+
+EMPTY_VIDEOS = {"kind": "youtube#videoListResponse", "etag": "etag", "items": [], "pageInfo": {}}
+
+
+def make_service(**kwargs):
+    options = {"base_delay": 0, "max_attempts": 3, "breaker": CircuitBreaker(failure_threshold=5, reset_timeout=60)}
+    options.update(kwargs)
+    return YouTubeBusinessService(resilience=ResilientCaller(**options))
+
+@pytest_asyncio.fixture
+async def service():
+    svc = make_service()
+    yield svc
+    await svc.close()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("garbage") is None
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors(monkeypatch, service):
+    responses = [
+        httpx.Response(503, json={"error": {"errors": [{"reason": "backendError"}]}}),
+        httpx.Response(403, json={"error": {"errors": [{"reason": "rateLimitExceeded"}]}}),
+        httpx.Response(200, json=EMPTY_VIDEOS),
+    ]
+    async def fake_get(path, params=None):
+        return responses.pop(0)
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    resp = await service.get_video_details("VID123")
+
+    assert isinstance(resp, VideosListResponse)
+    counters = service.resilience_status()["counters"]
+    assert counters["retries"] == 2
+    assert counters["status_503"] == counters["status_403"] == 1
+
+@pytest.mark.asyncio
+async def test_honours_retry_after(monkeypatch, service):
+    slept = []
+    real_sleep = asyncio.sleep
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        await real_sleep(0)
+    monkeypatch.setattr("app.utils.resilience.asyncio.sleep", fake_sleep)
+
+    responses = [httpx.Response(429, headers={"Retry-After": "7"}), httpx.Response(200, json=EMPTY_VIDEOS)]
+    async def fake_get(path, params=None):
+        return responses.pop(0)
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    await service.get_video_details("VID123")
+    assert slept == [7.0]
+
+@pytest.mark.asyncio
+async def test_gives_up_with_upstream_status(monkeypatch, service):
+    async def fake_get(path, params=None):
+        return httpx.Response(502)
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_video_details("VID123")
+    assert exc.value.status_code == 502
+    assert service.resilience_status()["counters"]["attempts"] == 3
+
+@pytest.mark.asyncio
+async def test_endpoint_timeout_is_retried(monkeypatch):
+    service = make_service(timeouts={"/videos": 0.01})
+    calls = []
+    async def fake_get(path, params=None):
+        calls.append(path)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json=EMPTY_VIDEOS)
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    await service.get_video_details("VID123")
+
+    assert len(calls) == 2
+    assert service.resilience_status()["counters"]["timeouts"] == 1
+    await service.close()
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast(monkeypatch):
+    service = make_service(max_attempts=1, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    calls = []
+    async def fake_get(path, params=None):
+        calls.append(path)
+        raise httpx.ConnectError("down")
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    for expected in (504, 504, 503):
+        with pytest.raises(HTTPException) as exc:
+            await service.get_video_details("VID123")
+        assert exc.value.status_code == expected
+
+    assert len(calls) == 2
+    status = service.resilience_status()
+    assert status["circuit"] == "open"
+    assert status["counters"]["circuit_rejected"] == 1
+    await service.close()
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    caller = ResilientCaller(max_attempts=1, breaker=breaker)
+
+    async def fail():
+        raise httpx.ConnectError("down")
+    async def ok():
+        return "ok"
+
+    with pytest.raises(httpx.ConnectError):
+        await caller.call("/videos", fail)
+    assert breaker.state == "open"
+    assert await caller.call("/videos", ok) == "ok"
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_hedges_slow_requests():
+    caller = ResilientCaller(hedge=True, hedge_quantile=0.95, hedge_min_samples=5)
+    for _ in range(5):
+        caller.latency.record("/commentThreads", 0.01)
+
+    calls = 0
+    async def attempt():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(1 if calls == 1 else 0)
+        return calls
+
+    assert await caller.call("/commentThreads", attempt) == 2
+    assert caller.counters["hedges"] == caller.counters["hedge_wins"] == 1
+
+@pytest.mark.asyncio
+async def test_client_read_timeout_covers_longest_endpoint_timeout():
+    client = create_http_client()
+    try:
+        assert client.timeout.read >= max(settings.endpoint_timeouts.values(), default=settings.http_timeout)
+    finally:
+        await client.aclose()
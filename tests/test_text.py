@@ -0,0 +1,39 @@
+"""
+Tests for TextUtils UTF-8 storage helpers
+Author: sg.kim
+Date: 2026-10-17
+"""
+import pytest
+
+from app.model.youtube.lean import LeanCommentThreadItem, LeanVideoItem
+from app.service.end_point.pipeline import map_comment_thread, map_video
+from app.utils.text import TextUtils
+from tests.test_ingestion_pipeline import thread_item, video_item
+
+
+def test_sanitize_text_keeps_utf8_and_strips_unstorable_chars():
+    assert TextUtils.sanitize_text("한류 🎵\n줄바꿈") == "한류 🎵\n줄바꿈"
+    assert TextUtils.sanitize_text("a\x00b") == "ab"
+    assert TextUtils.sanitize_text("a\ud83db") == "a\ufffdb"
+    assert TextUtils.sanitize_text("") == ""
+    assert TextUtils.sanitize_text(None) is None
+
+@pytest.mark.parametrize("original", ["안녕하세요\n반가워요", "tab\there", "C:\\new", "🎵 \x7f"])
+def test_escaped_text_round_trips_to_utf8(original):
+    stored = original.encode("unicode_escape").decode("ascii")
+    assert TextUtils.is_escaped_text(stored)
+    assert TextUtils.unescape_control_chars(stored) == original
+
+def test_is_escaped_text_ignores_plain_and_utf8_text():
+    assert not TextUtils.is_escaped_text("plain ascii")
+    assert not TextUtils.is_escaped_text("이미 UTF-8 \\n")
+    assert not TextUtils.is_escaped_text(None)
+
+def test_mapping_stores_native_utf8():
+    item = video_item("VID1")
+    item["snippet"]["title"] = "제목\x00"
+    row = map_video(LeanVideoItem.model_validate(item))
+    assert (row["title"], row["description"]) == ("제목", "설명")
+
+    [top] = map_comment_thread(LeanCommentThreadItem.model_validate(thread_item("VID1", "C1")))
+    assert top["text_display"] == "댓글"
@@ -0,0 +1,265 @@
+"""
+Tests for TransactionBusinessService set-based upserts (SQL 만 확인, DB 없이 실행)
+Author: sg.kim
+Date: 2026-10-17
+"""
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.service.business.transaction import POSTGRES_MAX_PARAMS, TransactionBusinessService, _chunks
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+class FakeSession:
+    def __init__(self, log, selected=()):
+        self.log = log
+        # SELECT 결과 (youtube_video_stats 최신 snapshot 조회 등)
+        self.selected = list(selected)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.log.append((str(compiled), compiled.params))
+        if str(compiled).startswith("SELECT"):
+            return FakeResult(self.selected)
+        # RETURNING: VALUES 에 들어간 row 수만큼 돌려줌
+        returning = re.search(r"RETURNING \S+\.(\w+)$", str(compiled))
+        if returning is None or str(compiled).startswith("UPDATE"):
+            return FakeResult([])
+        if " SELECT " in str(compiled):
+            return FakeResult(self.log[-2][1]["records"])
+        return FakeResult([k for k in compiled.params if re.fullmatch(rf"{returning.group(1)}_m\d+", k)])
+
+    async def commit(self):
+        self.log.append(("COMMIT", {}))
+
+    async def connection(self):
+        return self
+
+    async def get_raw_connection(self):
+        return self
+
+    @property
+    def driver_connection(self):
+        return self
+
+    async def copy_records_to_table(self, table_name, records, columns):
+        self.log.append((f"COPY {table_name}", {"records": records, "columns": columns}))
+
+
+@pytest.fixture
+def tx():
+    service = TransactionBusinessService(chunk_rows=2)
+    service.log = []
+    service.selected = []
+    service._session_factory = lambda: FakeSession(service.log, service.selected)
+    return service
+
+
+PUBLISHED_AT = datetime(2026, 10, 1, 9, 0)
+
+def comment(cid, text="댓글", etag="e1"):
+    return {
+        "comment_id": cid, "video_id": "VID1", "parent_comment_id": None, "etag": etag, "text_display": text,
+        "published_at": PUBLISHED_AT,
+    }
+
+
+@pytest.mark.asyncio
+async def test_comments_upsert_is_one_statement_per_chunk(tx):
+    written = await tx.insert_youtube_comments_bulk(
+        [comment("C1"), comment("C2"), comment("C3"), comment("C1", etag="e2")]
+    )
+
+    assert written == 3
+
+    statements = [sql for sql, _ in tx.log if sql != "COMMIT"]
+    assert len(statements) == 2
+    assert tx.log[-1][0] == "COMMIT"
+    sql, params = tx.log[0]
+    assert "ON CONFLICT (comment_id, published_at) DO UPDATE" in sql
+    assert "published_at = excluded.published_at" not in sql
+    assert "WHERE (public.youtube_comment.etag IS NULL OR public.youtube_comment.etag IS DISTINCT FROM excluded.etag)" in sql
+    assert "extract_yn = CASE WHEN (public.youtube_comment.text_display IS DISTINCT FROM excluded.text_display)" in sql
+    assert "RETURNING public.youtube_comment.comment_id" in sql
+    # batch 안의 중복 comment_id 는 마지막 값
+    assert params["etag_m0"] == "e2"
+
+@pytest.mark.asyncio
+async def test_video_upsert_skips_unchanged_rows_and_keeps_other_columns(tx):
+    await tx.insert_youtube_videos_bulk([{"video_id": "VID1", "title": "제목", "view_count": 1}])
+
+    sql, _ = tx.log[0]
+    assert "ON CONFLICT (video_id) DO UPDATE SET title = excluded.title, view_count = excluded.view_count" in sql
+    assert "(public.youtube_video.title, public.youtube_video.view_count) IS DISTINCT FROM" in sql
+    assert "korean_wave_yn" not in sql
+
+@pytest.mark.asyncio
+async def test_empty_batch_does_not_touch_the_database(tx):
+    assert await tx.insert_youtube_comments_bulk([]) == 0
+    assert tx.log == []
+
+@pytest.mark.asyncio
+async def test_bulk_load_copies_into_staging_then_upserts_once(tx):
+    written = await tx.bulk_load_comments([comment(f"C{i}") for i in range(5)] + [comment("C0", etag="e2")])
+
+    assert written == 5
+    create, copy, upsert, commit = [sql for sql, _ in tx.log]
+    assert create.startswith("CREATE TEMP TABLE IF NOT EXISTS stage_youtube_comment ON COMMIT DELETE ROWS")
+    assert copy == "COPY stage_youtube_comment"
+    records = tx.log[1][1]["records"]
+    assert tx.log[1][1]["columns"] == ["comment_id", "video_id", "parent_comment_id", "etag", "text_display", "published_at"]
+    assert records[0] == ("C0", "VID1", None, "e2", "댓글", PUBLISHED_AT)
+    assert "FROM stage_youtube_comment ON CONFLICT (comment_id, published_at) DO UPDATE" in upsert
+    assert commit == "COMMIT"
+
+@pytest.mark.asyncio
+async def test_nlp_write_back_is_one_update_from_values_returning_ids(tx):
+    tx.chunk_rows = 100
+    await tx.update_sentiment_for_comments([
+        {"comment_id": "C1", "sentiment": "positive", "keywords": "kpop"},
+        {"comment_id": "C2", "sentiment": "negative", "keywords": "drama"},
+        {"sentiment": "neutral"},
+    ])
+
+    [(sql, params), commit] = tx.log
+    assert sql.startswith("UPDATE public.youtube_comment SET sentiment=v.sentiment, key_words=v.key_words, extract_yn=v.extract_yn FROM (VALUES")
+    assert "AS v (comment_id, sentiment, key_words, extract_yn) WHERE public.youtube_comment.comment_id = v.comment_id" in sql
+    assert sql.endswith("RETURNING public.youtube_comment.comment_id")
+    assert list(params.values()) == ["C1", "positive", "kpop", "Y", "C2", "negative", "drama", "Y"]
+
+@pytest.mark.asyncio
+async def test_korean_wave_write_back_groups_rows_by_columns(tx):
+    tx.chunk_rows = 100
+    await tx.update_korean_wave_status([
+        {"video_id": "V1", "korean_wave_yn": "Y", "reason": "K-pop"},
+        {"video_id": "V2", "korean_wave_yn": "N"},
+        {"video_id": "V3", "korean_wave_yn": "N", "reason": "해외 콘텐츠"},
+    ])
+
+    statements = [sql for sql, _ in tx.log if sql != "COMMIT"]
+    assert len(statements) == 2
+    assert "identify_reason=v.identify_reason" in statements[0]
+    assert "identify_reason" not in statements[1]
+
+def test_chunk_respects_bind_parameter_limit():
+    rows = [{f"c{i}": i for i in range(10)}] * 10000
+    chunks = list(_chunks(rows, 5000))
+    assert max(len(c) for c in chunks) * 10 <= POSTGRES_MAX_PARAMS
+    assert sum(len(c) for c in chunks) == len(rows)
+
+@pytest.mark.asyncio
+async def test_video_upsert_appends_stats_snapshot_in_same_transaction(tx):
+    captured_at = datetime(2026, 10, 1, 12, 0)
+    await tx.insert_youtube_videos_bulk([
+        {"video_id": "VID1", "title": "제목", "view_count": 10, "like_count": 2, "captured_at": captured_at},
+        {"video_id": "VID2", "title": "통계 없음"},
+    ])
+
+    upsert, (snapshot, params), commit = tx.log
+    assert "captured_at" not in upsert[0]
+    assert snapshot.startswith("INSERT INTO public.youtube_video_stats (video_id, captured_at, view_count, like_count, comment_count)")
+    assert snapshot.endswith("ON CONFLICT DO NOTHING")
+    assert list(params.values()) == ["VID1", captured_at, 10, 2, None]
+    assert commit[0] == "COMMIT"
+
+@pytest.mark.asyncio
+async def test_nlp_write_back_matches_partition_key_when_given(tx):
+    await tx.update_sentiment_for_comments([
+        {"comment_id": "C1", "published_at": PUBLISHED_AT, "sentiment": "positive", "keywords": "kpop"},
+    ])
+
+    sql, params = tx.log[0]
+    assert "WHERE public.youtube_comment.comment_id = v.comment_id AND public.youtube_comment.published_at = v.published_at" in sql
+    assert "published_at=v.published_at" not in sql
+    assert list(params.values()) == ["C1", PUBLISHED_AT, "positive", "kpop", "Y"]
+
+@pytest.mark.asyncio
+async def test_channel_upserts_are_insert_on_conflict(tx):
+    await tx.upsert_channel({"channel_id": "UC1", "handle": "@ch", "uploads_playlist_id": "UU1"})
+    await tx.update_poll_schedule("UC1", "@ch", PUBLISHED_AT, 900)
+
+    (clear_handle, _), (channel, _), _, (sync, params), _ = tx.log
+    assert clear_handle.startswith("UPDATE public.youtube_channel SET handle=")
+    assert channel.startswith("INSERT INTO public.youtube_channel (channel_id, handle, uploads_playlist_id, watch_yn)")
+    # watch_yn 은 새 채널에만 기본값, 저장된 채널은 유지
+    assert channel.endswith(
+        "ON CONFLICT (channel_id) DO UPDATE SET handle = excluded.handle, uploads_playlist_id = excluded.uploads_playlist_id"
+    )
+    assert sync.startswith("INSERT INTO public.youtube_channel_sync (channel_id, handle, next_poll_at, poll_interval)")
+    assert sync.endswith(
+        "ON CONFLICT (channel_id) DO UPDATE SET handle = excluded.handle, "
+        "next_poll_at = excluded.next_poll_at, poll_interval = excluded.poll_interval"
+    )
+    assert list(params.values()) == ["UC1", "@ch", PUBLISHED_AT, 900]
+
+
+@pytest.mark.asyncio
+async def test_comment_upsert_never_overwrites_a_newer_edit(tx):
+    await tx.insert_youtube_comments_bulk([comment("C1")])
+
+    sql, _ = tx.log[0]
+    assert "excluded.updated_at >= public.youtube_comment.updated_at" in sql
+
+@pytest.mark.asyncio
+async def test_skip_stale_keeps_newer_video_rows_but_records_the_snapshot(tx):
+    archived_at = datetime(2026, 10, 1, 12, 0)
+    # VID1 은 archive 이후에 다시 수집됨, VID2 는 archive 가 최신
+    tx.selected += [("VID1", datetime(2026, 10, 5)), ("VID2", datetime(2026, 9, 1))]
+
+    written = await tx.insert_youtube_videos_bulk([
+        {"video_id": "VID1", "title": "예전 제목", "view_count": 1, "captured_at": archived_at},
+        {"video_id": "VID2", "title": "제목", "view_count": 5, "captured_at": archived_at},
+    ], skip_stale=True)
+
+    select_sql, upsert, (snapshot, params), commit = tx.log
+    assert select_sql[0].startswith("SELECT public.youtube_video_stats.video_id, max(public.youtube_video_stats.captured_at)")
+    assert written == 1
+    assert "VID1" not in upsert[1].values() and "VID2" in upsert[1].values()
+    # 예전 snapshot 도 통계 이력으로는 남김
+    assert [v for k, v in params.items() if k.startswith("video_id")] == ["VID1", "VID2"]
+    assert commit[0] == "COMMIT"
+
+@pytest.mark.asyncio
+async def test_bulk_load_with_only_stale_videos_skips_the_copy(tx):
+    tx.selected.append(("VID1", datetime(2026, 10, 5)))
+
+    written = await tx.bulk_load_videos(
+        [{"video_id": "VID1", "title": "예전 제목", "view_count": 1, "captured_at": datetime(2026, 10, 1)}],
+        skip_stale=True,
+    )
+
+    assert written == 0
+    assert [sql.split(" ")[0] for sql, _ in tx.log] == ["CREATE", "SELECT", "INSERT", "COMMIT"]
+
+@pytest.mark.asyncio
+async def test_comments_older_than_retention_are_not_written(tx):
+    tx.comment_retention_months = 1
+    now = datetime.now()
+    old = {**comment("OLD"), "published_at": datetime(2000, 1, 1)}
+
+    written = await tx.insert_youtube_comments_bulk([old, {**comment("NEW"), "published_at": now}])
+    assert written == 1
+    assert "OLD" not in tx.log[0][1].values() and "NEW" in tx.log[0][1].values()
+
+    tx.log.clear()
+    assert await tx.bulk_load_comments([old]) == 0
+    assert tx.log == []
@@ -3,11 +3,21 @@ Tests for YouTube Router endpoints
 Author: sg.kim
 Date: 2025-04-24
 """
+import datetime
+
+import httpx
 import pytest
 
 import pytest_asyncio
 from fastapi import HTTPException
-from app.service.business.youtube import YouTubeBusinessService
+from app.service.business.youtube import YouTubeBusinessService, create_http_client
+from app.model.youtube.lean import (
+    COMMENT_THREADS_FIELDS,
+    VIDEOS_FIELDS,
+    VIDEOS_PART,
+    LeanCommentThreadItem,
+    LeanVideoItem,
+)
 from app.model.youtube.response import (
     ChannelItem,
     PlaylistItemsListResponse,
@@ -16,11 +26,9 @@ from app.model.youtube.response import (
 )
 
 # Helper to create a dummy Response-like object
-class FakeResponse:
-    def __init__(self, data):
-        self._data = data
-    def json(self):
-        return self._data
+class FakeResponse(httpx.Response):
+    def __init__(self, data, status_code=200):
+        super().__init__(status_code, json=data)
 
 
 @pytest_asyncio.fixture
@@ -121,6 +129,28 @@ async def test_get_video_details(monkeypatch, service):
     assert isinstance(resp, VideosListResponse)
     assert resp.pageInfo["totalResults"] == 0
 
+@pytest.mark.asyncio
+async def test_get_videos_details_batches_ids(monkeypatch, service):
+    requested = []
+    async def fake_get(path, params=None):
+        ids = params["id"].split(",")
+        requested.append(ids)
+        items = [
+            {"kind": "youtube#video", "etag": "etag", "id": vid, "snippet": {
+                "publishedAt": "2023-01-01T00:00:00Z", "channelId": "UC123", "title": vid,
+                "description": "", "thumbnails": {}, "channelTitle": "Test"}}
+            for vid in ids if vid != "VID7"
+        ]
+        return FakeResponse({"kind": "youtube#videoListResponse", "etag": "etag", "items": items, "pageInfo": {}})
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    video_ids = [f"VID{i}" for i in range(120)]
+    resp = await service.get_videos_details(video_ids)
+    assert [len(ids) for ids in requested] == [50, 50, 20]
+    assert len(resp) == 119
+    assert "VID7" not in resp
+    assert resp["VID42"].snippet.title == "VID42"
+
 @pytest.mark.asyncio
 async def test_get_comment_threads(monkeypatch, service):
     fake_data = {"kind": "youtube#commentThreadListResponse", "etag": "etag", "items": [], "nextPageToken": None, "prevPageToken": None, "pageInfo": {"totalResults": 0, "resultsPerPage": 0}}
@@ -132,7 +162,104 @@ async def test_get_comment_threads(monkeypatch, service):
     assert isinstance(resp, CommentThreadsListResponse)
     assert resp.pageInfo["resultsPerPage"] == 0
 
+def api_error(status_code, reason):
+    return FakeResponse({"error": {"code": status_code, "errors": [{"reason": reason}]}}, status_code=status_code)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status_code, reason", [(400, "badRequest"), (404, "videoNotFound")])
+async def test_client_error_raises_instead_of_decoding_empty_result(monkeypatch, service, status_code, reason):
+    async def fake_get(path, params=None):
+        return api_error(status_code, reason)
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_comment_threads("VID123")
+    assert exc.value.status_code == status_code
+    assert exc.value.detail == reason
+
+@pytest.mark.asyncio
+async def test_comments_disabled_yields_no_threads(monkeypatch, service):
+    async def fake_get(path, params=None):
+        return api_error(403, "commentsDisabled")
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    assert [page async for page in service.iter_comment_threads("VID123")] == []
+
+def comment_thread_page(ids, published_at, next_token=None):
+    snippet = {
+        "authorDisplayName": "user", "authorProfileImageUrl": "", "authorChannelId": {"value": "UCa"},
+        "textDisplay": "hi", "publishedAt": published_at, "updatedAt": published_at,
+    }
+    return {
+        "kind": "youtube#commentThreadListResponse",
+        "etag": "etag",
+        "items": [
+            {"kind": "youtube#commentThread", "etag": "etag", "id": cid, "snippet": {
+                "videoId": "VID123", "canReply": True, "totalReplyCount": 0, "isPublic": True,
+                "topLevelComment": {"kind": "youtube#comment", "etag": "etag", "id": cid, "snippet": snippet}}}
+            for cid in ids
+        ],
+        "nextPageToken": next_token,
+    }
+
+@pytest.mark.asyncio
+async def test_iter_comment_threads_follows_pages(monkeypatch, service):
+    pages = {
+        None: comment_thread_page(["c1", "c2"], "2025-04-03T00:00:00Z", "p2"),
+        "p2": comment_thread_page(["c3"], "2025-04-02T00:00:00Z", "p3"),
+        "p3": comment_thread_page(["c4"], "2025-04-01T00:00:00Z"),
+    }
+    async def fake_get(path, params=None):
+        return FakeResponse(pages[params.get("pageToken")])
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    batches = [[t.id for t in page] async for page in service.iter_comment_threads("VID123")]
+    assert batches == [["c1", "c2"], ["c3"], ["c4"]]
+
+    capped = [[t.id for t in page] async for page in service.iter_comment_threads("VID123", max_threads=3)]
+    assert capped == [["c1", "c2"], ["c3"]]
+
+    since = datetime.datetime(2025, 4, 2)
+    newer = [[t.id for t in page] async for page in service.iter_comment_threads("VID123", since=since)]
+    assert newer == [["c1", "c2"]]
+
 @pytest.mark.asyncio
 async def test_close():
     svc = YouTubeBusinessService()
     await svc.close()
+
+@pytest.mark.asyncio
+async def test_close_keeps_shared_client_open():
+    client = create_http_client()
+    svc = YouTubeBusinessService(client=client)
+    await svc.close()
+    assert not client.is_closed
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_lean_requests_send_fields_and_decode_slim_models(monkeypatch, service):
+    sent = []
+    async def fake_get(path, params=None):
+        sent.append((path, params.get("part"), params.get("fields")))
+        if path == "/commentThreads":
+            # fields= 로 줄어든 응답 (kind / authorProfileImageUrl / canReply 등 없음)
+            page = comment_thread_page(["c1"], "2025-04-03T00:00:00Z")
+            item = page["items"][0]
+            page.pop("kind"), item.pop("kind")
+            del item["snippet"]["canReply"], item["snippet"]["isPublic"]
+            del item["snippet"]["topLevelComment"]["snippet"]["authorProfileImageUrl"]
+            return FakeResponse(page)
+        return FakeResponse({"items": [{"id": "VID1", "snippet": {
+            "publishedAt": "2023-01-01T00:00:00Z", "channelId": "UC123", "title": "t"}}]})
+    monkeypatch.setattr(service.client, 'get', fake_get)
+
+    threads = [t async for page in service.iter_comment_threads("VID123", lean=True) for t in page]
+    videos = await service.get_videos_details(["VID1"], lean=True)
+
+    assert isinstance(threads[0], LeanCommentThreadItem)
+    assert threads[0].snippet.topLevelComment.snippet.textDisplay == "hi"
+    assert isinstance(videos["VID1"], LeanVideoItem)
+    assert sent == [
+        ("/commentThreads", "snippet,replies", COMMENT_THREADS_FIELDS),
+        ("/videos", VIDEOS_PART, VIDEOS_FIELDS),
+    ]